@@ -0,0 +1,87 @@
+"""Cold-start cost of importing the API, measured in fresh interpreters.
+
+Each repeat runs ``python -X importtime -c "import <module>"`` in a new
+process, so nothing is cached in ``sys.modules``. Reports the best and
+median total import time plus the slowest top-level packages from the
+best run, and the heavy optional dependencies that were (wrongly)
+pulled in at import. ``--max-ms`` exits non-zero when the best run is
+slower, for tracking start-up in CI.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_import_time.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_MODULE = "chroma_knowledge_search.backend.app.main"
+# Should only be imported on first use, never at start-up
+DEFERRED = ("chromadb", "openai", "docx", "pdfminer", "onnxruntime")
+
+
+def run_once(module: str) -> dict[str, int]:
+    """Import ``module`` in a new interpreter.
+
+    Returns:
+        dict[str, int]: Cumulative microseconds per imported module
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line.split("|")
+        if cum.strip().isdigit():
+            cumulative[name.strip()] = int(cum)
+    return cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default=APP_MODULE)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="Fail above this")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    runs = [run_once(args.module) for _ in range(args.repeats)]
+    totals = [run[args.module] / 1000 for run in runs]
+    best = runs[totals.index(min(totals))]
+    top_level = {
+        name: us for name, us in best.items() if "." not in name.lstrip()
+    }
+    results = {
+        "module": args.module,
+        "best_ms": round(min(totals), 1),
+        "median_ms": round(statistics.median(totals), 1),
+        "slowest": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(
+                top_level.items(), key=lambda item: -item[1]
+            )[: args.top]
+        },
+        "deferred_loaded": [name for name in DEFERRED if name in best],
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.max_ms is not None and results["best_ms"] > args.max_ms:
+        sys.exit(f"Import took {results['best_ms']}ms > {args.max_ms}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Concurrent upload-metadata writes against the metadata store.
+
+Each writer inserts ``Document`` rows and commits one at a time, as the
+upload endpoint does, while readers keep listing documents. The same
+workload runs against a fresh SQLite file with SQLAlchemy's default
+engine (rollback journal, full sync, no busy timeout), with the app's
+tuned engine from ``db.build_engine``, and with the tuned engine behind
+the ``GroupCommitWriter`` the upload endpoint uses, which commits
+concurrent writes together. Pass ``--db-url`` to run it against another
+database, such as Postgres, instead.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_metadata_writes.py \\
+        --writers 16 --writes 200 --readers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from chroma_knowledge_search.backend.app.db import build_engine
+from chroma_knowledge_search.backend.app.group_commit import GroupCommitWriter
+from chroma_knowledge_search.backend.app.migrations import migrate
+from chroma_knowledge_search.backend.app.models import Document
+
+
+def percentiles(latencies: list[float]) -> dict:
+    ordered = sorted(latencies) or [0.0]
+
+    def rank(p):
+        index = max(0, min(len(ordered) - 1, round(p * len(ordered)) - 1))
+        return round(ordered[index] * 1000, 2)
+
+    return {"p50_ms": rank(0.50), "p95_ms": rank(0.95), "p99_ms": rank(0.99)}
+
+
+async def run(
+    engine, writers: int, writes: int, readers: int, group: bool
+) -> dict:
+    async with engine.begin() as conn:
+        await conn.run_sync(migrate)
+    session_local = sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    group_writer = GroupCommitWriter(session_local) if group else None
+    latencies, errors, reads = [], 0, 0
+    done = asyncio.Event()
+
+    async def commit_one(doc: Document):
+        if group_writer is not None:
+            await group_writer.write(doc)
+            return
+        async with session_local() as session:
+            session.add(doc)
+            await session.commit()
+
+    async def writer(worker: int):
+        nonlocal errors
+        for i in range(writes):
+            started = time.perf_counter()
+            try:
+                await commit_one(
+                    Document(
+                        id=str(uuid.uuid4()),
+                        owner_key=f"owner-{worker % 4}",
+                        filename=f"doc-{worker}-{i}.txt",
+                        text_preview="x" * 1000,
+                    )
+                )
+            except OperationalError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    async def reader():
+        nonlocal reads
+        while not done.is_set():
+            try:
+                async with session_local() as session:
+                    await session.scalar(
+                        select(func.count()).select_from(Document)
+                    )
+                reads += 1
+            except OperationalError:
+                pass
+            await asyncio.sleep(0)
+
+    reader_tasks = [asyncio.create_task(reader()) for _ in range(readers)]
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(w) for w in range(writers)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await asyncio.gather(*reader_tasks)
+    stats = {}
+    if group_writer is not None:
+        await group_writer.close()
+        stats = {"commits": group_writer.stats()["commits"]}
+    await engine.dispose()
+    return {
+        "writes_per_s": round(len(latencies) / elapsed, 1),
+        "reads_per_s": round(reads / elapsed, 1),
+        "errors": errors,
+        **percentiles(latencies),
+        **stats,
+    }
+
+
+async def main_async(args) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in ("default", "tuned", "group-commit"):
+            url = args.db_url or (
+                f"sqlite+aiosqlite:///{os.path.join(workdir, name)}.db"
+            )
+            engine = (
+                create_async_engine(url)
+                if name == "default"
+                else build_engine(url)
+            )
+            results[name] = await run(
+                engine,
+                args.writers,
+                args.writes,
+                args.readers,
+                group=name == "group-commit",
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=100)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--db-url", help="Benchmark this database instead")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    for name, row in results.items():
+        print(name, "  ".join(f"{k}={v}" for k, v in row.items()))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""End-to-end upload and query benchmarks, runnable offline.
+
+Starts the fake OpenAI server from ``fake_openai.py`` and points the app
+at it. Chroma runs as the in-process local client and SQLite as a
+temporary file. The app is called in-process through
+``httpx.ASGITransport``. Three scenarios run:
+
+- upload: documents/s, chunks/s and MB/s over a synthetic
+  TXT/PDF/DOCX corpus, plus upload latency percentiles
+- query: p50/p95/p99 latency and throughput of ``/api/query`` at a
+  given concurrency
+- memory: resident memory growth per indexed chunk
+
+Results are printed and can be saved with ``--json``. Pass an earlier
+results file as ``--compare`` to print the change in each metric between
+commits.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_pipeline.py \\
+        --documents 60 --queries 400 --concurrency 16 --json out.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from corpus import generate_corpus, make_queries
+from fake_openai import FakeOpenAIServer
+
+API_KEY = "bench-api-key"
+
+
+def rss_bytes() -> int:
+    """Current resident set size, or peak RSS where /proc is missing."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentiles(samples: list[float]) -> dict:
+    """Nearest-rank p50/p95/p99 and max, in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def rank(p):
+        index = max(0, min(len(ordered) - 1, round(p * len(ordered)) - 1))
+        return round(ordered[index] * 1000, 2)
+
+    return {
+        "p50_ms": rank(0.50),
+        "p95_ms": rank(0.95),
+        "p99_ms": rank(0.99),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def configure_env(base_url: str, workdir: str, args) -> None:
+    """Point the app at the fake API, local Chroma and a temp SQLite."""
+    os.environ.update(
+        {
+            "EMBEDDING_PROVIDER": args.embedding_provider,
+            "OPENAI_BASE_URL": base_url,
+            "OPENAI_API_KEY": "bench-openai-key",
+            "OPENAI_EMBED_MODEL": "text-embedding-3-small",
+            "OPENAI_CHAT_MODEL": "gpt-4o-mini",
+            "API_KEY": API_KEY,
+            "DB_URL": f"sqlite+aiosqlite:///{workdir}/bench.db",
+            # Fresh per run, so answers are never replayed from a past one
+            "GENERATION_CACHE_PATH": f"{workdir}/generation_cache.db",
+            "CHROMA_COLLECTION": "bench",
+            "CHROMA_API_KEY": "",
+            "LOG_FORMAT": "text",
+            # One key drives all the load, so quotas would only measure 429s
+            "API_KEY_RPM": "0",
+            "API_KEY_UPLOAD_MB_PER_MIN": "0",
+            "API_KEY_MAX_CONCURRENT_UPLOADS": "0",
+            "ANONYMIZED_TELEMETRY": "False",
+        }
+    )
+    if args.dimensions:
+        os.environ["OPENAI_EMBED_DIMENSIONS"] = str(args.dimensions)
+
+
+async def run_uploads(client, corpus, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, chunks, errors = [], 0, 0
+
+    async def upload(name, content, content_type):
+        nonlocal chunks, errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/upload",
+                files={"file": (name, content, content_type)},
+                headers={"x-api-key": API_KEY},
+            )
+            latencies.append(time.perf_counter() - started)
+        if response.status_code == 200:
+            chunks += response.json()["chunks_indexed"]
+        else:
+            errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(upload(*doc) for doc in corpus))
+    elapsed = time.perf_counter() - started
+    total_bytes = sum(len(content) for _, content, _ in corpus)
+    return {
+        "documents": len(corpus),
+        "chunks": chunks,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "documents_per_s": round(len(corpus) / elapsed, 2),
+        "chunks_per_s": round(chunks / elapsed, 2),
+        "mb_per_s": round(total_bytes / elapsed / 1e6, 3),
+        **percentiles(latencies),
+    }
+
+
+async def run_queries(client, queries, concurrency: int, top_k: int) -> dict:
+    pending = iter(queries)
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        for query in pending:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/query",
+                json={"query": query, "top_k": top_k},
+                headers={"x-api-key": API_KEY},
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(queries),
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_s": round(len(queries) / elapsed, 2),
+        **percentiles(latencies),
+    }
+
+
+async def run(args, server) -> dict:
+    import httpx
+
+    from chroma_knowledge_search.backend.app.db import init_db
+    from chroma_knowledge_search.backend.app.main import app
+
+    # Keep app logs from interleaving with the printed results
+    logging.getLogger().setLevel(args.log_level)
+    await init_db()
+    corpus = generate_corpus(
+        args.documents, pages=args.pages, words_per_page=args.words_per_page
+    )
+    queries = make_queries(args.queries)
+    # Count app failures (e.g. exhausted 429 retries) as errors, not crashes
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=120
+    ) as client:
+        # Warm imports, the collection and the DB connection pool
+        await run_uploads(client, corpus[:1], 1)
+        rss_before = rss_bytes()
+        upload = await run_uploads(client, corpus[1:], args.concurrency)
+        rss_after = rss_bytes()
+        query = await run_queries(
+            client, queries, args.concurrency, args.top_k
+        )
+
+    return {
+        "upload": upload,
+        "query": query,
+        "memory": {
+            "rss_before_mb": round(rss_before / 1e6, 1),
+            "rss_after_mb": round(rss_after / 1e6, 1),
+            "rss_bytes_per_chunk": round(
+                (rss_after - rss_before) / max(1, upload["chunks"])
+            ),
+        },
+        "openai": server.stats,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict, prefix: str = "") -> list[str]:
+    """Lines describing the relative change of every numeric metric."""
+    lines = []
+    for key, value in current.items():
+        old = baseline.get(key)
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and isinstance(old, dict):
+            lines.extend(compare(value, old, f"{name}."))
+        elif isinstance(value, (int, float)) and isinstance(old, (int, float)):
+            change = (value - old) / old * 100 if old else 0.0
+            lines.append(f"{name}: {old} -> {value} ({change:+.1f}%)")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--documents", type=int, default=30)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--words-per-page", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument(
+        "--embedding-provider",
+        choices=("openai", "local", "hashing"),
+        default="openai",
+    )
+    parser.add_argument("--dimensions", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--per-item-ms", type=float, default=0.1)
+    parser.add_argument("--rpm", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Earlier results file to diff")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        per_item_ms=args.per_item_ms,
+        rpm=args.rpm,
+    ).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            configure_env(server.base_url, workdir, args)
+            results = asyncio.run(run(args, server))
+    finally:
+        server.stop()
+
+    results["meta"] = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "settings": vars(args),
+    }
+    print(json.dumps(results, indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for section in ("upload", "query", "memory"):
+            for line in compare(results[section], baseline.get(section, {})):
+                print(f"{section}.{line}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
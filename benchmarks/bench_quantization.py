@@ -0,0 +1,118 @@
+"""Memory and recall@k of reduced-dimension and quantized embeddings.
+
+Runs offline on synthetic vectors shaped like ``text-embedding-3``
+output: variance concentrated in the leading dimensions, so truncating
+and re-normalizing behaves like requesting fewer ``dimensions``.
+
+For each dtype it reports recall of a scan over the quantized vectors
+alone, and of that scan's top ``k * rerank-factor`` candidates re-scored
+against the full-precision vectors.
+
+Usage:
+    python benchmarks/bench_quantization.py [--chunks N]
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from quantization import (
+    QUANTIZED_DTYPES,
+    bytes_per_vector,
+    dequantize,
+    quantize,
+)
+
+FULL_DIMENSIONS = 1536
+DIMENSION_SETTINGS = (1536, 512, 256)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def synthetic_corpus(n_chunks: int, n_queries: int, seed: int = 0):
+    """Clustered unit vectors with a decaying per-dimension variance."""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.sqrt(1.0 + np.arange(FULL_DIMENSIONS) / 64.0)
+    centers = rng.normal(size=(max(1, n_chunks // 20), FULL_DIMENSIONS))
+    assign = rng.integers(0, len(centers), size=n_chunks)
+    docs = centers[assign] + 0.6 * rng.normal(size=(n_chunks, FULL_DIMENSIONS))
+    docs = normalize((docs * weights).astype(np.float32))
+    picks = rng.integers(0, n_chunks, size=n_queries)
+    queries = docs[picks] + 0.03 * rng.normal(
+        size=(n_queries, FULL_DIMENSIONS)
+    )
+    return docs, normalize(queries.astype(np.float32))
+
+
+def top_k(queries: np.ndarray, docs: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ docs.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def run(n_chunks: int, n_queries: int, k: int, factor: int) -> list[dict]:
+    docs, queries = synthetic_corpus(n_chunks, n_queries)
+    truth = top_k(queries, docs, k)
+    results = []
+    for dims in DIMENSION_SETTINGS:
+        docs_d = normalize(docs[:, :dims])
+        queries_d = normalize(queries[:, :dims])
+        for dtype in QUANTIZED_DTYPES:
+            stored = _round_trip(docs_d, dtype)
+            # Candidates from a symmetric scan over quantized vectors
+            candidates = top_k(
+                _round_trip(queries_d, dtype), stored, k * factor
+            )
+            rescored = []
+            for q, cand in zip(queries_d, candidates):
+                scores = docs_d[cand] @ q
+                rescored.append(cand[np.argsort(-scores)[:k]])
+            results.append(
+                {
+                    "dimensions": dims,
+                    "dtype": dtype,
+                    "bytes_per_chunk": bytes_per_vector(dims, dtype),
+                    "mb_per_million_chunks": round(
+                        bytes_per_vector(dims, dtype) * 1_000_000 / 2**20, 1
+                    ),
+                    f"recall@{k}_quantized": round(
+                        recall(candidates[:, :k], truth), 4
+                    ),
+                    f"recall@{k}_rescored": round(
+                        recall(np.array(rescored), truth), 4
+                    ),
+                }
+            )
+    return results
+
+
+def _round_trip(vectors: np.ndarray, dtype: str) -> np.ndarray:
+    return dequantize(*quantize(vectors, dtype))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.chunks, args.queries, args.k, args.rerank_factor)
+    for row in results:
+        print("  ".join(f"{key}={value}" for key, value in row.items()))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
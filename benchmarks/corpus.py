@@ -0,0 +1,156 @@
+"""Synthetic TXT, PDF and DOCX documents for the benchmarks.
+
+Documents are built from a fixed vocabulary with a seeded RNG, so a
+given seed always yields the same bytes. Each document has markdown
+headings and several pages, which exercises page and section
+annotation, and :func:`make_queries` draws questions from the same
+vocabulary so retrieval finds matches.
+"""
+
+import io
+import random
+
+import docx
+
+TOPICS = (
+    "billing invoice payment refund subscription renewal discount tax",
+    "network latency bandwidth router firewall packet gateway proxy",
+    "storage backup snapshot replica volume archive retention disk",
+    "security password token certificate audit encryption access role",
+    "deployment release rollback container cluster node scaling image",
+    "database index query schema migration transaction table column",
+    "support ticket escalation customer response priority agent queue",
+    "analytics report dashboard metric trend forecast segment export",
+)
+FILLER = (
+    "the a of to and in for with on by from is are was be this that "
+    "when after before each every our your their must should can will"
+).split()
+CONTENT_TYPES = {
+    "txt": "text/plain",
+    "pdf": "application/pdf",
+    "docx": (
+        "application/vnd.openxmlformats-officedocument"
+        ".wordprocessingml.document"
+    ),
+}
+
+
+def make_pages(
+    rng: random.Random, pages: int, words_per_page: int
+) -> list[tuple[str, list[str]]]:
+    """Return ``(heading, lines)`` per page, about 12 words a line."""
+    result = []
+    for page in range(pages):
+        topic = rng.choice(TOPICS).split()
+        heading = f"{topic[0].title()} notes {page + 1}"
+        words = [
+            rng.choice(topic) if rng.random() < 0.4 else rng.choice(FILLER)
+            for _ in range(words_per_page)
+        ]
+        lines = [
+            " ".join(words[i : i + 12]) + "." for i in range(0, len(words), 12)
+        ]
+        result.append((heading, lines))
+    return result
+
+
+def make_txt(pages) -> bytes:
+    return "\f".join(
+        f"# {heading}\n" + "\n".join(lines) for heading, lines in pages
+    ).encode("utf-8")
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages) -> bytes:
+    """Minimal multi-page PDF with Helvetica text, no dependencies."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for heading, lines in pages:
+        ops = ["BT", "/F1 11 Tf", "14 TL", "72 760 Td"]
+        for line in [heading, *lines]:
+            ops.append(f"({_pdf_escape(line)}) '")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % content_id
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        " ".join(f"{k} 0 R" for k in kids).encode(),
+        len(kids),
+    )
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(
+        b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, xref)
+    )
+    return out.getvalue()
+
+
+def make_docx(pages) -> bytes:
+    document = docx.Document()
+    for heading, lines in pages:
+        document.add_heading(heading, level=1)
+        document.add_paragraph(" ".join(lines))
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+BUILDERS = {"txt": make_txt, "pdf": make_pdf, "docx": make_docx}
+
+
+def generate_corpus(
+    count: int,
+    kinds=("txt", "pdf", "docx"),
+    pages: int = 3,
+    words_per_page: int = 300,
+    seed: int = 0,
+) -> list[tuple[str, bytes, str]]:
+    """Build ``count`` documents cycling through ``kinds``.
+
+    Returns:
+        list[tuple[str, bytes, str]]: ``(filename, content, content_type)``
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        content = BUILDERS[kind](make_pages(rng, pages, words_per_page))
+        corpus.append((f"doc-{i:05d}.{kind}", content, CONTENT_TYPES[kind]))
+    return corpus
+
+
+def make_queries(count: int, seed: int = 1) -> list[str]:
+    """Distinct short questions over the corpus vocabulary."""
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        topic = rng.choice(TOPICS).split()
+        terms = " ".join(rng.sample(topic, 3))
+        queries.append(f"What do the notes say about {terms}? ({i})")
+    return queries
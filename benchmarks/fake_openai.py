@@ -0,0 +1,274 @@
+"""Local stand-in for the OpenAI HTTP API used by the benchmarks.
+
+Serves ``/v1/embeddings``, ``/v1/chat/completions`` and
+``/v1/moderations`` with configurable latency and a requests-per-minute
+limit that answers 429 with ``Retry-After`` like the real API.
+Embeddings are deterministic feature-hashed bag-of-words vectors, so
+texts that share words are close and retrieval behaves sensibly.
+
+Point the app at it with ``OPENAI_BASE_URL=http://127.0.0.1:<port>/v1``.
+
+Usage:
+    python benchmarks/fake_openai.py --port 8100 --latency-ms 50
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+")
+DEFAULT_DIMENSIONS = 1536
+
+
+def embed_text(text: str, dimensions: int = DEFAULT_DIMENSIONS) -> list:
+    """Deterministic unit vector for a text via signed feature hashing."""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for token in TOKEN_RE.findall(text.lower()):
+        digest = int.from_bytes(
+            hashlib.blake2b(token.encode(), digest_size=8).digest(), "little"
+        )
+        vector[digest % dimensions] += 1.0 if digest >> 63 else -1.0
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        vector[0], norm = 1.0, 1.0
+    return (vector / norm).tolist()
+
+
+def count_tokens(text: str) -> int:
+    return len(TOKEN_RE.findall(text))
+
+
+class RateLimiter:
+    """Token bucket refilled at ``rpm`` per minute; 0 disables it."""
+
+    def __init__(self, rpm: int, burst: int | None = None):
+        self.rate = rpm / 60.0
+        self.capacity = float(burst or max(1, rpm // 10))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token; return 0, or seconds to wait when limited."""
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the fake API's settings and stats."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address=("127.0.0.1", 0),
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        per_item_ms: float = 0.0,
+        rpm: int = 0,
+        seed: int = 0,
+    ):
+        super().__init__(address, FakeOpenAIHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.per_item_ms = per_item_ms
+        self.limiter = RateLimiter(rpm)
+        self.random = random.Random(seed)
+        self.stats = {"requests": {}, "rate_limited": 0, "items": 0}
+        self.stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        """Serve from a daemon thread and return self."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def delay(self, items: int) -> None:
+        with self.stats_lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        seconds = (self.latency_ms + jitter + self.per_item_ms * items) / 1e3
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def record(self, route: str, items: int = 0, limited: bool = False):
+        with self.stats_lock:
+            if limited:
+                self.stats["rate_limited"] += 1
+                return
+            requests = self.stats["requests"]
+            requests[route] = requests.get(route, 0) + 1
+            self.stats["items"] += items
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        route = self.path.rstrip("/").rsplit("/", 1)[-1]
+        handler = {
+            "embeddings": self.embeddings,
+            "completions": self.chat,
+            "moderations": self.moderations,
+        }.get(route)
+        if handler is None:
+            self.send_json(404, {"error": {"message": "Unknown route"}})
+            return
+
+        wait = self.server.limiter.acquire()
+        if wait:
+            self.server.record(route, limited=True)
+            self.send_json(
+                429,
+                {
+                    "error": {
+                        "message": "Rate limit reached",
+                        "type": "requests",
+                        "code": "rate_limit_exceeded",
+                    }
+                },
+                {"Retry-After": f"{wait:.3f}"},
+            )
+            return
+        handler(body)
+
+    def inputs(self, body) -> list:
+        value = body.get("input", "")
+        return [value] if isinstance(value, str) else list(value)
+
+    def embeddings(self, body):
+        texts = self.inputs(body)
+        dimensions = int(body.get("dimensions") or DEFAULT_DIMENSIONS)
+        self.server.delay(len(texts))
+        tokens = sum(count_tokens(t) for t in texts)
+        self.server.record("embeddings", len(texts))
+        self.send_json(
+            200,
+            {
+                "object": "list",
+                "model": body.get("model"),
+                "data": [
+                    {
+                        "object": "embedding",
+                        "index": i,
+                        "embedding": embed_text(text, dimensions),
+                    }
+                    for i, text in enumerate(texts)
+                ],
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            },
+        )
+
+    def chat(self, body):
+        messages = body.get("messages", [])
+        prompt = sum(count_tokens(str(m.get("content", ""))) for m in messages)
+        answer = "Based on the context [Chunk 1], here is a short answer."
+        completion = count_tokens(answer)
+        self.server.delay(1)
+        self.server.record("completions", 1)
+        self.send_json(
+            200,
+            {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": answer},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt,
+                    "completion_tokens": completion,
+                    "total_tokens": prompt + completion,
+                },
+            },
+        )
+
+    def moderations(self, body):
+        texts = self.inputs(body)
+        self.server.delay(len(texts))
+        self.server.record("moderations", len(texts))
+        self.send_json(
+            200,
+            {
+                "id": "modr-fake",
+                "model": body.get("model"),
+                "results": [
+                    {"flagged": False, "categories": {}, "category_scores": {}}
+                    for _ in texts
+                ],
+            },
+        )
+
+    def send_json(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--per-item-ms", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        (args.host, args.port),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        per_item_ms=args.per_item_ms,
+        rpm=args.rpm,
+    )
+    print(f"Fake OpenAI API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Embedding quantization helpers for the quantization benchmark.
+
+Vectors are stored as float16 or as int8 with a per-vector scale, and
+dequantized back to float32 to score them.
+"""
+
+import numpy as np
+
+QUANTIZED_DTYPES = ("float32", "float16", "int8")
+INT8_MAX = 127.0
+
+
+def quantize(vectors, dtype: str) -> tuple[np.ndarray, np.ndarray | None]:
+    """Quantize embedding vectors for compact storage.
+
+    int8 uses symmetric per-vector scaling, so each row keeps its own
+    float32 scale factor.
+
+    Args:
+        vectors: 2-D array-like of float embeddings
+        dtype (str): One of ``float32``, ``float16`` or ``int8``
+
+    Returns:
+        tuple[np.ndarray, np.ndarray | None]: Quantized values and per-row
+        scales (``None`` unless dtype is ``int8``)
+
+    Raises:
+        ValueError: If dtype is not supported
+    """
+    arr = np.asarray(vectors, dtype=np.float32)
+    if dtype == "float32":
+        return arr, None
+    if dtype == "float16":
+        return arr.astype(np.float16), None
+    if dtype == "int8":
+        scales = np.abs(arr).max(axis=1) / INT8_MAX
+        scales[scales == 0] = 1.0
+        values = np.rint(arr / scales[:, None]).astype(np.int8)
+        return values, scales.astype(np.float32)
+    raise ValueError(f"Unsupported quantization dtype: {dtype}")
+
+
+def dequantize(values: np.ndarray, scales: np.ndarray | None) -> np.ndarray:
+    """Restore float32 vectors from quantized values.
+
+    Args:
+        values (np.ndarray): Quantized values
+        scales (np.ndarray | None): Per-row scales for int8 values
+
+    Returns:
+        np.ndarray: float32 vectors
+    """
+    arr = values.astype(np.float32)
+    if scales is not None:
+        arr *= scales[:, None]
+    return arr
+
+
+def bytes_per_vector(dimensions: int, dtype: str) -> int:
+    """Bytes needed to store one quantized vector.
+
+    Args:
+        dimensions (int): Embedding dimensions
+        dtype (str): Quantization dtype
+
+    Returns:
+        int: Storage size in bytes, including the int8 scale
+    """
+    itemsize = np.dtype(dtype).itemsize
+    scale = np.dtype(np.float32).itemsize if dtype == "int8" else 0
+    return dimensions * itemsize + scale
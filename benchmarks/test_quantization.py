@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from quantization import (
+    bytes_per_vector,
+    dequantize,
+    quantize,
+)
+
+
+class TestQuantization:
+    """Test embedding quantization helpers."""
+
+    def test_int8_round_trip(self):
+        """Test int8 quantization error stays within one step."""
+        vectors = np.random.default_rng(0).normal(size=(4, 64))
+
+        values, scales = quantize(vectors, "int8")
+        restored = dequantize(values, scales)
+
+        assert values.dtype == np.int8
+        assert np.all(np.abs(restored - vectors) <= scales[:, None])
+
+    def test_float16_round_trip(self):
+        """Test float16 quantization keeps values close."""
+        vectors = np.random.default_rng(1).normal(size=(2, 32))
+
+        values, scales = quantize(vectors, "float16")
+
+        assert scales is None
+        assert np.allclose(dequantize(values, None), vectors, atol=1e-2)
+
+    def test_unsupported_dtype(self):
+        """Test unsupported dtype is rejected."""
+        with pytest.raises(ValueError):
+            quantize([[0.1, 0.2]], "int4")
+
+    def test_bytes_per_vector(self):
+        """Test storage size includes the int8 scale."""
+        assert bytes_per_vector(1536, "float32") == 6144
+        assert bytes_per_vector(1536, "float16") == 3072
+        assert bytes_per_vector(1536, "int8") == 1540
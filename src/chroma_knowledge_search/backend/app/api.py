@@ -1,46 +1,224 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import mimetypes
+import time
 import uuid
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    UploadFile,
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from chroma_knowledge_search.backend.app.auth import require_api_key
+from chroma_knowledge_search.backend.app.auth import (
+    mint_key,
+    require_admin_key,
+    require_api_key,
+    revoke_key,
+)
 from chroma_knowledge_search.backend.app.chroma_client import (
     query as chroma_query,
 )
-from chroma_knowledge_search.backend.app.chroma_client import upsert_chunks
+from chroma_knowledge_search.backend.app.chroma_writer import write_chunks
+from chroma_knowledge_search.backend.app.chunks import chunk_rows, get_chunks
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.context import (
+    retrieve_context,
+    retrieve_context_batch,
+)
 from chroma_knowledge_search.backend.app.db import get_db
-from chroma_knowledge_search.backend.app.embeddings import get_embeddings
+from chroma_knowledge_search.backend.app.embeddings import (
+    embed_queries,
+    embed_query,
+    get_embeddings,
+    normalize_query,
+)
+from chroma_knowledge_search.backend.app.group_commit import (
+    write as write_metadata,
+)
+from chroma_knowledge_search.backend.app.hot_queries import (
+    corpus_changed,
+    get_hot_queries,
+)
+from chroma_knowledge_search.backend.app.lexical import lexical_retrieve
+from chroma_knowledge_search.backend.app.lexical import (
+    supports as lexical_supports,
+)
 from chroma_knowledge_search.backend.app.logging_config import get_logger
-from chroma_knowledge_search.backend.app.models import Document
+from chroma_knowledge_search.backend.app.metrics import (
+    RETRIEVALS,
+    UPLOAD_BYTES,
+    UPLOADS,
+    timed,
+)
+from chroma_knowledge_search.backend.app.models import Document, Upload
 from chroma_knowledge_search.backend.app.rag import generate_answer
 from chroma_knowledge_search.backend.app.schemas import (
+    ApiKeyCreate,
+    ApiKeyCreated,
+    BatchQueryItem,
+    BatchQueryRequest,
+    BatchQueryResult,
+    ChunkListResponse,
+    ChunkRecord,
+    QueryFilters,
     QueryRequest,
     QueryResult,
+    SearchHit,
+    SearchRequest,
+    SearchResponse,
     UploadResponse,
 )
+from chroma_knowledge_search.backend.app.singleflight import SingleFlight
+from chroma_knowledge_search.backend.app.tracing import set_attributes
+from chroma_knowledge_search.backend.app.uploads import (
+    as_utc,
+    complete,
+    document_id_for,
+    get_upload,
+    record_progress,
+    upload_hash,
+)
 from chroma_knowledge_search.backend.app.utils import (
+    annotate_chunks,
     chunk_text,
     extract_text_from_file,
 )
 
-logger = get_logger(__name__)
+logger = get_logger(__name__, rate_limited=True)
+
+settings = get_settings()
+
+NO_CONTEXT_ANSWER = "I couldn't find relevant context for your question."
 
 router = APIRouter()
 
+# Identical concurrent queries share one upstream call per stage
+embed_flight = SingleFlight("embed")
+retrieve_flight = SingleFlight("retrieve")
+generate_flight = SingleFlight("generate")
+upload_flight = SingleFlight("upload")
+
+
+def _unique_sources(metadatas: list) -> list[str]:
+    """Collect document IDs from chunk metadata, deduplicated in order."""
+    sources = [
+        m.get("document_id")
+        for m in metadatas
+        if isinstance(m, dict) and "document_id" in m
+    ]
+    return list(dict.fromkeys(sources))
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def _search_fingerprint(req: SearchRequest) -> str:
+    """Hash the query and filters a search cursor is valid for."""
+    filters = req.filters.model_dump_json() if req.filters else ""
+    raw = f"{normalize_query(req.query)}\x00{filters}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _encode_cursor(offset: int, fingerprint: str) -> str:
+    raw = json.dumps({"o": offset, "f": fingerprint}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str, fingerprint: str) -> int:
+    """Return the offset stored in a cursor issued for the same search.
+
+    Raises:
+        HTTPException: If the cursor is malformed or belongs to another search
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        offset = int(data["o"])
+        valid = data["f"] == fingerprint and offset >= 0
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
+
+
+async def _embed_within_deadline(embed, filters: QueryFilters | None):
+    """Await query embeddings, or return None if they are late or fail.
+
+    Only queries that lexical search can serve get a deadline, and only
+    they survive an embedding error, such as a shed or failed provider
+    call; other queries see the error. A late embedding keeps running
+    and lands in the query embedding cache for the next ask.
+
+    Args:
+        embed: Awaitable giving the query embedding(s)
+        filters (QueryFilters, optional): Filters of the query
+    """
+    if not lexical_supports(filters):
+        return await embed
+    deadline = settings.query_embed_deadline_s
+    try:
+        if deadline <= 0:
+            return await embed
+        return await asyncio.wait_for(embed, deadline)
+    except asyncio.TimeoutError:
+        logger.warning(
+            "Query embedding missed its %.1fs deadline, "
+            "falling back to lexical retrieval",
+            deadline,
+        )
+    except Exception as e:
+        logger.warning(
+            "Query embedding failed, falling back to lexical retrieval: %r",
+            e,
+        )
+    return None
+
+
+async def _generate(
+    owner_key: str, question: str, docs: list[str], fresh: bool
+) -> str:
+    """Answer a normalized question, sharing identical in-flight calls."""
+    return await generate_flight.do(
+        (owner_key, question, tuple(docs), fresh),
+        asyncio.to_thread,
+        generate_answer,
+        docs,
+        question,
+        fresh,
+    )
+
 
 @router.post("/upload", response_model=UploadResponse)
 async def upload(
     file: UploadFile = File(...),
+    idempotency_key: str | None = Header(None, min_length=1, max_length=255),
     db: AsyncSession = Depends(get_db),
     owner_key: str = Depends(require_api_key),
 ):
     """Upload and process a document for knowledge search.
 
     Extracts text from uploaded file, chunks it, generates embeddings,
-    stores in vector database and saves metadata.
+    stores in vector database and saves metadata. With an
+    ``Idempotency-Key`` header, a retry resumes a failed attempt after
+    its last stored embedding batch, and a retry of a finished upload
+    returns the original result.
 
     Args:
         file (UploadFile): File to upload and process
+        idempotency_key (str, optional): Client key identifying retries
+            of one upload
         db (AsyncSession): Database session
         owner_key (str): API key for authentication
 
@@ -48,68 +226,205 @@ async def upload(
         UploadResponse: Document ID and number of chunks indexed
 
     Raises:
-        HTTPException: If file too large, no text found, or processing fails
+        HTTPException: If file too large, no text found, the key was
+            used for a different file, or processing fails
     """
-
-    # Size validation
-    MAX_FILE_SIZE_MB = 15
-    CHUNK_SIZE = 800
-    CHUNK_OVERLAP = 200
     content = await file.read()
-    logger.info(f"Processing upload: {file.filename} ({len(content)} bytes)")
-    if len(content) > MAX_FILE_SIZE_MB * 1024 * 1024:
+    logger.info(
+        "Processing upload: %s (%d bytes)", file.filename, len(content)
+    )
+    if len(content) > settings.max_file_size_mb * 1024 * 1024:
         logger.warning(
-            f"File too large: {file.filename} ({len(content)} bytes)"
+            "File too large: %s (%d bytes)", file.filename, len(content)
         )
         raise HTTPException(status_code=413, detail="File too large")
+    content_type = (
+        mimetypes.guess_type(file.filename)[0]
+        or file.content_type
+        or "text/plain"
+    )
+    UPLOADS.labels(content_type=content_type).inc()
+    UPLOAD_BYTES.labels(content_type=content_type).inc(len(content))
+    set_attributes(
+        {"upload.bytes": len(content), "upload.content_type": content_type}
+    )
+    if idempotency_key is None:
+        return await _ingest(content, file.filename, content_type, owner_key)
+    digest = upload_hash(content)
+    # Concurrent retries of one upload share a single ingestion
+    return await upload_flight.do(
+        (owner_key, idempotency_key, digest),
+        _ingest_idempotent,
+        db,
+        content,
+        file.filename,
+        content_type,
+        owner_key,
+        idempotency_key,
+        digest,
+    )
+
+
+async def _ingest_idempotent(
+    db: AsyncSession,
+    content: bytes,
+    filename: str,
+    content_type: str,
+    owner_key: str,
+    idempotency_key: str,
+    digest: str,
+) -> UploadResponse:
+    """Ingest an upload under a checkpoint kept for its idempotency key."""
+    checkpoint = await get_upload(db, owner_key, idempotency_key)
+    if checkpoint is None:
+        checkpoint = Upload(
+            owner_key=owner_key,
+            idempotency_key=idempotency_key,
+            document_id=document_id_for(owner_key, idempotency_key),
+            content_hash=digest,
+            filename=filename,
+            uploaded_at=datetime.now(timezone.utc),
+            chunk_size=settings.chunk_size,
+            chunk_overlap=settings.chunk_overlap,
+            chunks_done=0,
+        )
+        try:
+            await write_metadata(checkpoint)
+        except IntegrityError:
+            # Another worker took the key between the read and the insert
+            raise HTTPException(
+                status_code=409,
+                detail="An upload with this Idempotency-Key is in progress",
+            )
+    elif checkpoint.content_hash != digest:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used for a different file",
+        )
+    elif checkpoint.completed_at is not None:
+        logger.info("Replaying completed upload %s", checkpoint.document_id)
+        return UploadResponse(
+            document_id=checkpoint.document_id,
+            chunks_indexed=checkpoint.chunks_total,
+        )
+    return await _ingest(
+        content, filename, content_type, owner_key, checkpoint
+    )
+
+
+async def _ingest(
+    content: bytes,
+    filename: str,
+    content_type: str,
+    owner_key: str,
+    checkpoint: Upload | None = None,
+) -> UploadResponse:
+    """Extract, chunk, embed and store one upload.
+
+    Embeddings are computed and stored ``UPLOAD_EMBED_BATCH_SIZE``
+    chunks at a time. With a checkpoint, each stored batch is recorded
+    and a resumed attempt starts after the last one; chunking reuses the
+    checkpoint's settings so ordinals line up with the earlier attempt.
+
+    Args:
+        content (bytes): Uploaded file
+        filename (str): Name of the uploaded file
+        content_type (str): MIME type of the file
+        owner_key (str): Owner of the document
+        checkpoint (Upload, optional): Progress of an idempotent upload
+
+    Returns:
+        UploadResponse: Document ID and number of chunks indexed
+    """
+    if checkpoint is None:
+        document_id = str(uuid.uuid4())
+        uploaded_at = datetime.now(timezone.utc)
+        chunk_size, chunk_overlap = settings.chunk_size, settings.chunk_overlap
+    else:
+        document_id = checkpoint.document_id
+        uploaded_at = as_utc(checkpoint.uploaded_at)
+        chunk_size = checkpoint.chunk_size
+        chunk_overlap = checkpoint.chunk_overlap
 
     # Extract text
-    text = await extract_text_from_file(content, file.filename)
+    with timed("extract"):
+        text = await extract_text_from_file(content, filename)
     if not text or not text.strip():
-        logger.error(f"No readable text found in {file.filename}")
+        logger.error("No readable text found in %s", filename)
         raise HTTPException(status_code=400, detail="No readable text found")
-    logger.debug(f"Extracted {len(text)} characters from {file.filename}")
+    logger.debug("Extracted %d characters from %s", len(text), filename)
 
     # Chunking
-    chunks = chunk_text(text, CHUNK_SIZE, CHUNK_OVERLAP)
+    with timed("chunk"):
+        chunks = chunk_text(text, chunk_size, chunk_overlap)
     chunks = [c for c in chunks if c["text"].strip()]  # ✅ remove empty chunks
     if not chunks:
-        logger.error(f"No valid text chunks extracted from {file.filename}")
+        logger.error("No valid text chunks extracted from %s", filename)
         raise HTTPException(
             status_code=400, detail="No valid text chunks extracted"
         )
-    logger.info(f"Created {len(chunks)} text chunks")
+    annotate_chunks(text, chunks)
+    set_attributes({"upload.chunks": len(chunks)})
+    logger.info("Created %d text chunks", len(chunks))
 
-    # Embeddings
-    texts = [c["text"] for c in chunks]
-    embeddings = get_embeddings(texts)
-
-    if len(embeddings) != len(chunks):
-        raise HTTPException(
-            status_code=500,
-            detail=f"Embedding mismatch: {len(chunks)} chunks vs {len(embeddings)} embeddings",
+    start = 0
+    if checkpoint is not None and checkpoint.chunks_total == len(chunks):
+        start = checkpoint.chunks_done
+        if start:
+            logger.info(
+                "Resuming upload %s at chunk %d of %d",
+                document_id,
+                start,
+                len(chunks),
+            )
+    metadata = {
+        "filename": filename,
+        "uploaded_at": int(uploaded_at.timestamp()),
+        "content_type": content_type,
+    }
+    batch_size = settings.upload_embed_batch_size
+    for begin in range(start, len(chunks), batch_size):
+        batch = chunks[begin : begin + batch_size]
+        # Off the event loop: the call may queue behind the OpenAI limiter
+        embeddings = await asyncio.to_thread(
+            get_embeddings, [c["text"] for c in batch]
         )
+        if len(embeddings) != len(batch):
+            raise HTTPException(
+                status_code=500,
+                detail=f"Embedding mismatch: {len(batch)} chunks vs {len(embeddings)} embeddings",
+            )
+        for c, emb in zip(batch, embeddings):
+            c["embedding"] = emb
 
-    # Attach embeddings
-    for c, emb in zip(chunks, embeddings):
-        c["embedding"] = emb
-
-    # Store vectors in Chroma
-    document_id = str(uuid.uuid4())
-    upsert_chunks(document_id, chunks, owner_key=owner_key)
+        # Store vectors in Chroma; batched with concurrent uploads
+        await write_chunks(
+            document_id, batch, owner_key, metadata=metadata, start=begin
+        )
+        if checkpoint is not None:
+            await write_metadata(
+                record_progress(checkpoint, begin + len(batch), len(chunks))
+            )
 
-    # Store doc metadata
+    # Store doc and chunk metadata; committed with concurrent uploads
     doc = Document(
         id=document_id,
         owner_key=owner_key,
-        filename=file.filename,
+        filename=filename,
+        uploaded_at=uploaded_at,
         text_preview=text[:1000],
     )
-    db.add(doc)
-    await db.commit()
+    ops = [doc, *chunk_rows(document_id, chunks)]
+    if checkpoint is not None:
+        ops.append(complete(checkpoint))
+    await write_metadata(*ops)
+    corpus_changed(owner_key)
 
     logger.info(
-        f"Successfully processed {file.filename}: {document_id} with {len(chunks)} chunks"
+        "Successfully processed %s: %s with %d chunks",
+        filename,
+        document_id,
+        len(chunks),
     )
     return UploadResponse(document_id=document_id, chunks_indexed=len(chunks))
 
@@ -123,42 +438,382 @@ async def query_docs(
     """Query documents using semantic search and generate AI answer.
 
     Converts query to embedding, searches vector database for relevant chunks,
-    and generates contextual answer using retrieved documents.
+    widens the hits with neighboring chunks up to a token budget, and
+    generates contextual answer from the resulting passages. Concurrent
+    duplicate queries share each stage's in-flight computation, and
+    frequent unfiltered queries reuse a precomputed embedding and
+    retrieval (see ``hot_queries``). If the query embedding fails or
+    misses ``QUERY_EMBED_DEADLINE_S``, chunks are found by BM25 over the
+    relational chunk store instead.
 
     Args:
-        req (QueryRequest): Query request with text and optional top_k
+        req (QueryRequest): Query request with text, optional top_k,
+            metadata filters and ``fresh`` to bypass the generation cache
         db (AsyncSession): Database session
         owner_key (str): API key for authentication
 
     Returns:
-        QueryResult: Generated answer and source document IDs
+        QueryResult: Generated answer, source document IDs and the
+        retrieval path that served them
     """
 
-    logger.info(f"Processing query: '{req.query}' with top_k={req.top_k}")
-    qemb = get_embeddings([req.query])[0]
-    res = chroma_query(qemb, top_k=req.top_k, owner_key=owner_key)
+    # Query text is user content; keep it out of INFO logs
+    logger.info(
+        "Processing query of %d characters with top_k=%d",
+        len(req.query),
+        req.top_k,
+    )
+    logger.debug("Query text: %r", req.query)
+    set_attributes(
+        {"query.top_k": req.top_k, "query.filtered": req.filters is not None}
+    )
+    normalized = normalize_query(req.query)
+    filters_key = req.filters.model_dump_json() if req.filters else None
+
+    # Unfiltered recurring queries may already be embedded and retrieved
+    hot_queries = get_hot_queries()
+    qemb = results = None
+    if req.filters is None:
+        hot_queries.record(owner_key, normalized, req.top_k)
+        qemb, results = hot_queries.lookup(owner_key, normalized, req.top_k)
+    set_attributes({"query.hot": results is not None})
 
-    docs = res.get("documents", [[]])[0]
-    metadatas = res.get("metadatas", [[]])[0]
+    retrieval = "vector"
+    if results is None:
+        generation = hot_queries.generation(owner_key)
+        if qemb is None:
+            # Embeddings do not depend on the owner, so tenants share them
+            qemb = await _embed_within_deadline(
+                embed_flight.do(
+                    normalized, asyncio.to_thread, embed_query, normalized
+                ),
+                req.filters,
+            )
+        if qemb is None:
+            retrieval = "lexical"
+            results = await lexical_retrieve(
+                db, owner_key, normalized, req.top_k, req.filters
+            )
+        else:
+            results = await retrieve_flight.do(
+                (owner_key, normalized, req.top_k, filters_key),
+                asyncio.to_thread,
+                retrieve_context,
+                qemb,
+                req.top_k,
+                owner_key,
+                req.filters,
+            )
+            if req.filters is None:
+                hot_queries.offer(
+                    owner_key, normalized, req.top_k, qemb, results, generation
+                )
+    docs, metadatas = results
+    RETRIEVALS.labels(path=retrieval).inc()
+    set_attributes({"query.retrieval": retrieval})
 
     if not docs:
         logger.info("No relevant documents found for query")
         return QueryResult(
-            answer="I couldn't find relevant context for your question.",
-            sources=[],
+            answer=NO_CONTEXT_ANSWER, sources=[], retrieval=retrieval
         )
 
-    answer = generate_answer(docs, req.query)
-    sources = [
-        m.get("document_id")
-        for m in metadatas
-        if isinstance(m, dict) and "document_id" in m
-    ]
+    answer = await _generate(owner_key, normalized, docs, req.fresh)
+    sources = _unique_sources(metadatas)
+
+    logger.info(
+        "Generated answer from %d passages, %d unique sources via %s",
+        len(docs),
+        len(sources),
+        retrieval,
+    )
+    return QueryResult(answer=answer, sources=sources, retrieval=retrieval)
+
+
+@router.post("/query/batch", response_model=BatchQueryResult)
+async def query_docs_batch(
+    req: BatchQueryRequest,
+    db: AsyncSession = Depends(get_db),
+    owner_key: str = Depends(require_api_key),
+):
+    """Answer many queries with one embedding call and one Chroma search.
+
+    Each query takes the ``/query`` path: it is normalized, served from
+    the hot-query store when recurring, otherwise retrieved and widened
+    with neighboring chunks, or found lexically if the embeddings fail
+    or miss ``QUERY_EMBED_DEADLINE_S``. Only the embedding and vector search are
+    shared by the batch. Answers are generated concurrently, at most
+    ``BATCH_GENERATION_CONCURRENCY`` at a time. With ``retrieval_only``
+    the LLM is skipped and only sources and contexts are returned.
 
-    # Deduplicate while preserving order
-    sources = list(dict.fromkeys(sources))
+    Args:
+        req (BatchQueryRequest): Queries with shared top_k and filters
+        db (AsyncSession): Database session
+        owner_key (str): API key for authentication
 
+    Returns:
+        BatchQueryResult: Per-query results and batch-level timings
+    """
     logger.info(
-        f"Generated answer from {len(docs)} documents, {len(sources)} unique sources"
+        "Processing batch of %d queries with top_k=%d, retrieval_only=%s",
+        len(req.queries),
+        req.top_k,
+        req.retrieval_only,
+    )
+    started = time.perf_counter()
+    normalized = [normalize_query(q) for q in req.queries]
+
+    # Unfiltered recurring queries may already be embedded and retrieved
+    hot_queries = get_hot_queries()
+    qembs = [None] * len(normalized)
+    results = [None] * len(normalized)
+    if req.filters is None:
+        for i, question in enumerate(normalized):
+            hot_queries.record(owner_key, question, req.top_k)
+            qembs[i], results[i] = hot_queries.lookup(
+                owner_key, question, req.top_k
+            )
+    generation = hot_queries.generation(owner_key)
+
+    pending = [i for i, r in enumerate(results) if r is None]
+    unembedded = [i for i in pending if qembs[i] is None]
+    if unembedded:
+        embedded = await _embed_within_deadline(
+            asyncio.to_thread(
+                embed_queries, [normalized[i] for i in unembedded]
+            ),
+            req.filters,
+        )
+        for i, qemb in zip(unembedded, embedded or []):
+            qembs[i] = qemb
+    embed_ms = _elapsed_ms(started)
+
+    retrieve_started = time.perf_counter()
+    retrievals = ["vector"] * len(normalized)
+    vector = [i for i in pending if qembs[i] is not None]
+    if vector:
+        retrieved = await asyncio.to_thread(
+            retrieve_context_batch,
+            [qembs[i] for i in vector],
+            req.top_k,
+            owner_key,
+            req.filters,
+        )
+        for i, result in zip(vector, retrieved):
+            results[i] = result
+            if req.filters is None:
+                hot_queries.offer(
+                    owner_key,
+                    normalized[i],
+                    req.top_k,
+                    qembs[i],
+                    result,
+                    generation,
+                )
+    for i in pending:
+        if results[i] is None:
+            retrievals[i] = "lexical"
+            results[i] = await lexical_retrieve(
+                db, owner_key, normalized[i], req.top_k, req.filters
+            )
+    for retrieval in retrievals:
+        RETRIEVALS.labels(path=retrieval).inc()
+    retrieve_ms = _elapsed_ms(retrieve_started)
+
+    semaphore = asyncio.Semaphore(settings.batch_generation_concurrency)
+
+    async def answer_one(i: int) -> BatchQueryItem:
+        docs, metadatas = results[i]
+        timings = {}
+        answer = None
+        if not req.retrieval_only:
+            if docs:
+                async with semaphore:
+                    generate_started = time.perf_counter()
+                    answer = await _generate(
+                        owner_key, normalized[i], docs, req.fresh
+                    )
+                    timings["generate_ms"] = _elapsed_ms(generate_started)
+            else:
+                answer = NO_CONTEXT_ANSWER
+        return BatchQueryItem(
+            query=req.queries[i],
+            answer=answer,
+            sources=_unique_sources(metadatas),
+            contexts=docs,
+            retrieval=retrievals[i],
+            timings=timings,
+        )
+
+    items = await asyncio.gather(
+        *(answer_one(i) for i in range(len(normalized)))
+    )
+    timings = {
+        "embed_ms": embed_ms,
+        "retrieve_ms": retrieve_ms,
+        "total_ms": _elapsed_ms(started),
+    }
+    logger.info("Batch of %d queries done: %s", len(items), timings)
+    return BatchQueryResult(results=items, timings=timings)
+
+
+@router.post("/search", response_model=SearchResponse)
+async def search(
+    req: SearchRequest,
+    owner_key: str = Depends(require_api_key),
+):
+    """Return ranked chunks for a query without generating an answer.
+
+    Skips moderation and the chat model entirely. Query embeddings are
+    cached, so paging and search-as-you-type reuse them. Pages are
+    addressed by an opaque cursor and go at most ``SEARCH_MAX_RESULTS``
+    deep.
+
+    Args:
+        req (SearchRequest): Query text, page size, cursor and filters
+        owner_key (str): API key for authentication
+
+    Returns:
+        SearchResponse: Ranked hits and the cursor for the next page
+
+    Raises:
+        HTTPException: If the cursor is invalid or past the maximum depth
+    """
+    fingerprint = _search_fingerprint(req)
+    offset = _decode_cursor(req.cursor, fingerprint) if req.cursor else 0
+    if offset >= settings.search_max_results:
+        raise HTTPException(status_code=400, detail="Cursor out of range")
+    limit = min(req.limit, settings.search_max_results - offset)
+
+    # Off the event loop: both calls block, embedding possibly behind
+    # the OpenAI limiter
+    qemb = await asyncio.to_thread(embed_query, req.query)
+    # Fetch one extra result to learn whether another page exists
+    res = await asyncio.to_thread(
+        chroma_query,
+        qemb,
+        top_k=offset + limit + 1,
+        owner_key=owner_key,
+        filters=req.filters,
     )
-    return QueryResult(answer=answer, sources=sources)
+    ids = (res.get("ids") or [[]])[0]
+    docs = (res.get("documents") or [[]])[0]
+    metadatas = (res.get("metadatas") or [[]])[0]
+    distances = (res.get("distances") or [[]])[0] or [None] * len(ids)
+
+    hits = []
+    for chunk_id, text, meta, distance in list(
+        zip(ids, docs, metadatas, distances)
+    )[offset : offset + limit]:
+        meta = meta or {}
+        hits.append(
+            SearchHit(
+                id=chunk_id,
+                document_id=meta.get("document_id", ""),
+                text=text,
+                distance=distance,
+                filename=meta.get("filename"),
+                ordinal=meta.get("ordinal"),
+                char_start=meta.get("char_start"),
+                char_end=meta.get("char_end"),
+                page=meta.get("page"),
+            )
+        )
+
+    next_offset = offset + limit
+    next_cursor = None
+    if len(ids) > next_offset and next_offset < settings.search_max_results:
+        next_cursor = _encode_cursor(next_offset, fingerprint)
+    logger.debug("Search returned %d hits at offset %d", len(hits), offset)
+    return SearchResponse(hits=hits, next_cursor=next_cursor)
+
+
+@router.get(
+    "/documents/{document_id}/chunks", response_model=ChunkListResponse
+)
+async def list_chunks(
+    document_id: str,
+    start: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    owner_key: str = Depends(require_api_key),
+):
+    """List a document's chunks with their offsets and text.
+
+    Served from the relational store, so showing a source passage
+    needs no vector store round trip.
+
+    Args:
+        document_id (str): Document to read
+        start (int): First chunk ordinal to return
+        limit (int): Maximum number of chunks
+        db (AsyncSession): Database session
+        owner_key (str): API key for authentication
+
+    Returns:
+        ChunkListResponse: Chunks in ordinal order
+
+    Raises:
+        HTTPException: If the caller has no such document
+    """
+    rows = await get_chunks(db, document_id, owner_key, start, limit)
+    if rows is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return ChunkListResponse(
+        document_id=document_id,
+        chunks=[
+            ChunkRecord(
+                ordinal=row.ordinal,
+                char_start=row.char_start,
+                char_end=row.char_end,
+                page=row.page,
+                token_count=row.token_count,
+                content_hash=row.content_hash,
+                text=row.text,
+            )
+            for row in rows
+        ],
+    )
+
+
+@router.post(
+    "/admin/keys",
+    response_model=ApiKeyCreated,
+    status_code=201,
+    dependencies=[Depends(require_admin_key)],
+)
+async def create_api_key(
+    req: ApiKeyCreate, db: AsyncSession = Depends(get_db)
+):
+    """Mint an API key, optionally for an existing owner.
+
+    Args:
+        req (ApiKeyCreate): Key label and optional owner key
+        db (AsyncSession): Database session
+
+    Returns:
+        ApiKeyCreated: The key, shown only in this response
+    """
+    row, api_key = await mint_key(db, name=req.name, owner_key=req.owner_key)
+    return ApiKeyCreated(
+        key_id=row.id, api_key=api_key, owner_key=row.owner_key, name=row.name
+    )
+
+
+@router.delete(
+    "/admin/keys/{key_id}",
+    status_code=204,
+    dependencies=[Depends(require_admin_key)],
+)
+async def delete_api_key(key_id: str, db: AsyncSession = Depends(get_db)):
+    """Revoke an API key.
+
+    Args:
+        key_id (str): ID of the key to revoke
+        db (AsyncSession): Database session
+
+    Raises:
+        HTTPException: If no active key has that ID
+    """
+    if not await revoke_key(db, key_id):
+        raise HTTPException(status_code=404, detail="API key not found")
@@ -1,6 +1,145 @@
 import hashlib
-import os
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
 from fastapi import Header, HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.db import get_engine
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+from chroma_knowledge_search.backend.app.metrics import record_cache
+from chroma_knowledge_search.backend.app.models import ApiKey
+
+logger = get_logger(__name__, rate_limited=True)
+
+settings = get_settings()
+# Minted keys look like ``cks_<key id>_<secret>``
+KEY_PREFIX = "cks"
+
+# sha256 of a presented key -> (key id, owner key, expiry); a None
+# owner key caches a rejection
+_cache: OrderedDict[str, tuple[str | None, str | None, float]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _digest(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def _hash_secret(secret: str, salt: str) -> str:
+    # Minted secrets carry 256 bits of entropy, so a salted HMAC is
+    # enough; a slow KDF would only make cache misses expensive
+    return hmac.new(
+        bytes.fromhex(salt), secret.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+
+
+def _parse_key(api_key: str) -> tuple[str, str] | None:
+    """Split a minted key into (key id, secret), or None if malformed."""
+    parts = api_key.split("_", 2)
+    if len(parts) != 3 or parts[0] != KEY_PREFIX or not parts[2]:
+        return None
+    return parts[1], parts[2]
+
+
+def _cache_get(digest: str) -> tuple | None:
+    with _cache_lock:
+        entry = _cache.get(digest)
+        if entry is not None:
+            if entry[2] > time.monotonic():
+                _cache.move_to_end(digest)
+            else:
+                del _cache[digest]
+                entry = None
+    record_cache("api_key", entry is not None)
+    return entry
+
+
+def _cache_put(digest: str, key_id: str | None, owner_key: str | None) -> None:
+    # Revocations reach other workers' caches within the TTL; rejections
+    # expire sooner, so they cannot outlive a key's creation for long
+    if owner_key is None:
+        ttl = settings.auth_negative_cache_ttl_s
+    else:
+        ttl = settings.auth_cache_ttl_s
+    expires = time.monotonic() + ttl
+    with _cache_lock:
+        _cache[digest] = (key_id, owner_key, expires)
+        _cache.move_to_end(digest)
+        while len(_cache) > settings.auth_cache_size:
+            _cache.popitem(last=False)
+
+
+def clear_cache(key_id: str | None = None) -> None:
+    """Drop cached verifications, only those of ``key_id`` if given."""
+    with _cache_lock:
+        if key_id is None:
+            _cache.clear()
+            return
+        for digest, entry in list(_cache.items()):
+            if entry[0] == key_id:
+                del _cache[digest]
+
+
+async def _lookup(key_id: str) -> ApiKey | None:
+    _, session_local = get_engine()
+    async with session_local() as session:
+        result = await session.execute(
+            select(ApiKey).where(
+                ApiKey.id == key_id, ApiKey.revoked_at.is_(None)
+            )
+        )
+        return result.scalar_one_or_none()
+
+
+async def owner_key_for(api_key: str | None) -> str | None:
+    """Owner hash for a valid API key, or None if it is not valid.
+
+    Verified keys are cached for ``AUTH_CACHE_TTL_S`` seconds, so only
+    the first request with a key reads the key table. Rejected keys are
+    cached for ``AUTH_NEGATIVE_CACHE_TTL_S``, so a client repeating a
+    bad key does not cost a lookup on every request. The deployment's
+    ``API_KEY`` is still accepted and keeps its original owner hash.
+
+    Args:
+        api_key (str | None): API key from the request
+
+    Returns:
+        str | None: Owner key used for isolation
+    """
+    if not api_key:
+        return None
+    digest = _digest(api_key)
+    entry = _cache_get(digest)
+    if entry is not None:
+        return entry[1]
+
+    static_key = settings.api_key
+    if static_key and hmac.compare_digest(
+        api_key.encode("utf-8"), static_key.encode("utf-8")
+    ):
+        _cache_put(digest, None, digest)
+        return digest
+
+    parsed = _parse_key(api_key)
+    if parsed is None:
+        _cache_put(digest, None, None)
+        return None
+    key_id, secret = parsed
+    row = await _lookup(key_id)
+    if row is None or not hmac.compare_digest(
+        _hash_secret(secret, row.salt), row.key_hash
+    ):
+        _cache_put(digest, key_id, None)
+        return None
+    _cache_put(digest, key_id, row.owner_key)
+    return row.owner_key
 
 
 async def require_api_key(x_api_key: str = Header(None)) -> str:
@@ -10,7 +149,7 @@ async def require_api_key(x_api_key: str = Header(None)) -> str:
         x_api_key (str): API key from request header
 
     Returns:
-        str: SHA256 hash of the API key for owner isolation
+        str: Owner key of the API key for owner isolation
 
     Raises:
         HTTPException: If API key is missing or invalid
@@ -19,11 +158,82 @@ async def require_api_key(x_api_key: str = Header(None)) -> str:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing API key"
         )
-    api_key = os.environ.get("API_KEY")
-    if x_api_key != api_key:
-        # Optionally use constant-time compare
+    owner_key = await owner_key_for(x_api_key)
+    if owner_key is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Invalid API key"
         )
-    # Per-key isolation tag
-    return hashlib.sha256(x_api_key.encode("utf-8")).hexdigest()
+    return owner_key
+
+
+async def require_admin_key(x_admin_key: str = Header(None)) -> None:
+    """Allow key management only with the ``ADMIN_API_KEY``.
+
+    Raises:
+        HTTPException: If the admin key is missing, unset or wrong
+    """
+    admin_key = settings.admin_api_key
+    if not x_admin_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing admin key",
+        )
+    if not admin_key or not hmac.compare_digest(
+        x_admin_key.encode("utf-8"), admin_key.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin key"
+        )
+
+
+async def mint_key(
+    db: AsyncSession, name: str | None = None, owner_key: str | None = None
+) -> tuple[ApiKey, str]:
+    """Create an API key; only its salted hash is stored.
+
+    Args:
+        db (AsyncSession): Database session
+        name (str, optional): Label for the key
+        owner_key (str, optional): Existing owner to add the key to, so
+            keys can be rotated without losing access to documents
+
+    Returns:
+        tuple[ApiKey, str]: Stored key row and the plaintext key, which
+            cannot be recovered later
+    """
+    key_id = secrets.token_hex(8)
+    secret = secrets.token_urlsafe(32)
+    salt = secrets.token_hex(16)
+    row = ApiKey(
+        id=key_id,
+        owner_key=owner_key or secrets.token_hex(32),
+        name=name,
+        salt=salt,
+        key_hash=_hash_secret(secret, salt),
+    )
+    db.add(row)
+    await db.commit()
+    logger.info("Minted API key %s", key_id)
+    return row, f"{KEY_PREFIX}_{key_id}_{secret}"
+
+
+async def revoke_key(db: AsyncSession, key_id: str) -> bool:
+    """Revoke an API key and drop it from this worker's cache.
+
+    Args:
+        db (AsyncSession): Database session
+        key_id (str): ID of the key to revoke
+
+    Returns:
+        bool: False if no active key has that ID
+    """
+    result = await db.execute(
+        update(ApiKey)
+        .where(ApiKey.id == key_id, ApiKey.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+    clear_cache(key_id)
+    if result.rowcount:
+        logger.info("Revoked API key %s", key_id)
+    return bool(result.rowcount)
@@ -0,0 +1,127 @@
+import asyncio
+from abc import ABC, abstractmethod
+
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+
+logger = get_logger(__name__, rate_limited=True)
+
+
+class Pending:
+    """One caller's item waiting for a shared batch."""
+
+    __slots__ = ("item", "future")
+
+    def __init__(self, item, future: asyncio.Future):
+        self.item = item
+        self.future = future
+
+    def settle(self, error: Exception | None = None) -> None:
+        """Wake the caller, unless an earlier attempt already did."""
+        if self.future.done():
+            return
+        if error is None:
+            self.future.set_result(None)
+        else:
+            self.future.set_exception(error)
+
+
+class BatchWriter(ABC):
+    """Funnel writes from concurrent callers into shared batches.
+
+    Callers queue items and wait for the batch that stores them. A
+    background task, started on first use in each event loop, groups
+    what is queued as the subclass decides and writes the group at
+    once. If a group fails, its items are retried one caller at a time
+    so a bad item only fails its own request.
+
+    Args:
+        queue_size (int): Items queued before callers wait for room;
+            0 never makes them wait
+    """
+
+    #: Names the write in logs, e.g. "Group commit"
+    label = "Batch write"
+
+    def __init__(self, queue_size: int = 0):
+        self.queue_size = queue_size
+        self._loop = None
+        self._queue = None
+        self._task = None
+        self._stats = {"retried": 0}
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task and not self._task.done():
+            return
+        # A new event loop (tests, a restarted worker) gets a fresh queue
+        self._loop = loop
+        self._queue = asyncio.Queue(self.queue_size)
+        self._reset()
+        self._task = loop.create_task(self._run())
+
+    async def _submit(self, items: list) -> None:
+        """Queue a caller's items and wait until all are written."""
+        self._ensure_running()
+        futures = []
+        for item in items:
+            pending = Pending(item, self._loop.create_future())
+            await self._queue.put(pending)
+            self._queued(pending)
+            futures.append(pending.future)
+        # A cancelled caller does not withdraw items already queued
+        await asyncio.shield(asyncio.gather(*futures))
+
+    async def close(self) -> None:
+        """Write whatever is queued and stop the background task."""
+        if self._task is None or self._loop is not asyncio.get_running_loop():
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write_group(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_group(self, batch: list[Pending]) -> None:
+        try:
+            await self._write(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].settle(e)
+                return
+            logger.warning(
+                "%s of %d items failed, retrying singly: %s",
+                self.label,
+                len(batch),
+                e,
+            )
+            self._stats["retried"] += len(batch)
+            for pending in batch:
+                await self._write_group([pending])
+            return
+        for pending in batch:
+            pending.settle()
+
+    def _reset(self) -> None:
+        """Clear per-loop state when a fresh queue is made."""
+
+    def _queued(self, pending: Pending) -> None:
+        """Note an item just added to the queue."""
+
+    @abstractmethod
+    async def _next_batch(self) -> list[Pending]:
+        """Wait for queued items and take the next group to write."""
+
+    @abstractmethod
+    async def _write(self, batch: list[Pending]) -> None:
+        """Write a group at once, raising if any of it failed."""
@@ -1,23 +1,42 @@
+import logging
 import os
-import chromadb
+
+import numpy as np
 
 from chroma_knowledge_search.backend.app.logging_config import get_logger
-from chroma_knowledge_search.backend.app.config import load_config
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.embeddings import (
+    EmbeddingProvider,
+    get_provider,
+)
+from chroma_knowledge_search.backend.app.metrics import CHUNKS, timed
+from chroma_knowledge_search.backend.app.tracing import set_attributes
+from chroma_knowledge_search.backend.app.schemas import QueryFilters
 
-logger = get_logger(__name__)
+logger = get_logger(__name__, rate_limited=True)
 _client = None
+_max_batch_size = None
 
 # Load configuration
-load_config()
-chroma_api_key = os.getenv("CHROMA_API_KEY")
-chroma_tenant = os.getenv("CHROMA_TENANT")
-chroma_database = os.getenv("CHROMA_DATABASE")
+settings = get_settings()
+
+# Per-chunk keys copied from chunk dicts into Chroma metadata
+CHUNK_METADATA_KEYS = ("char_start", "char_end", "page", "section")
+# Records per add when the client does not report its own limit
+DEFAULT_MAX_BATCH_SIZE = 5000
+
+
+class EmbeddingMismatchError(ValueError):
+    """A collection was built with a different embedding provider."""
 
 
 def get_client():
     """Get ChromaDB client instance."""
     global _client
     if _client is None:
+        # Deferred: chromadb is the slowest import in the app
+        import chromadb
+
         # Use local client in test environment
         if os.getenv("PYTEST_CURRENT_TEST") or "pytest" in os.environ.get(
             "_", ""
@@ -27,19 +46,25 @@ def get_client():
         else:
             # Use Chroma Cloud if credentials are available
             try:
-                if chroma_api_key and chroma_tenant and chroma_database:
+                if (
+                    settings.chroma_api_key
+                    and settings.chroma_tenant
+                    and settings.chroma_database
+                ):
                     logger.info("Using ChromaDB Cloud client")
                     _client = chromadb.CloudClient(
-                        api_key=chroma_api_key,
-                        tenant=chroma_tenant,
-                        database=chroma_database,
+                        api_key=settings.chroma_api_key,
+                        tenant=settings.chroma_tenant,
+                        database=settings.chroma_database,
                     )
                 else:
                     logger.info("Using local ChromaDB client")
                     _client = chromadb.Client()
             except Exception as e:
                 logger.warning(
-                    f"Failed to connect to ChromaDB Cloud, using local client: {e}"
+                    "Failed to connect to ChromaDB Cloud, using local "
+                    "client: %s",
+                    e,
                 )
                 _client = chromadb.Client()
     return _client
@@ -52,64 +77,376 @@ def get_or_create_collection():
         Collection: ChromaDB collection instance
     """
     client = get_client()
-    collection_name = os.getenv("CHROMA_COLLECTION")
+    collection_name = settings.chroma_collection
+    provider = get_provider()
     try:
         collection = client.get_collection(collection_name)
-        logger.debug(f"Retrieved existing collection: {collection_name}")
-        return collection
+        logger.debug("Retrieved existing collection: %s", collection_name)
     except Exception as e:
-        logger.info(f"Creating new collection: {collection_name}")
-        return client.create_collection(
-            collection_name,
-            metadata={"description": "Knowledge search collection"},
+        logger.info("Creating new collection: %s", collection_name)
+        metadata = {
+            "description": "Knowledge search collection",
+            "embedding_provider": provider.signature,
+        }
+        if provider.dimensions:
+            metadata["embedding_dimensions"] = provider.dimensions
+        return client.create_collection(collection_name, metadata=metadata)
+    check_embedding_space(collection, provider)
+    return collection
+
+
+def check_embedding_space(collection, provider: EmbeddingProvider) -> None:
+    """Refuse a collection built with a different embedding space.
+
+    Collections created before providers were recorded carry no
+    provider metadata and are accepted as they are.
+
+    Args:
+        collection (Collection): ChromaDB collection
+        provider (EmbeddingProvider): Provider about to read or write it
+
+    Raises:
+        EmbeddingMismatchError: If the recorded provider or dimensions
+            differ from ``provider``
+    """
+    metadata = getattr(collection, "metadata", None)
+    if not isinstance(metadata, dict):
+        return
+    recorded = metadata.get("embedding_provider")
+    if recorded is not None and recorded != provider.signature:
+        raise EmbeddingMismatchError(
+            f"Collection {collection.name} was built with {recorded}, "
+            f"not {provider.signature}"
         )
+    dimensions = metadata.get("embedding_dimensions")
+    if (
+        dimensions
+        and provider.dimensions
+        and (dimensions != provider.dimensions)
+    ):
+        raise EmbeddingMismatchError(
+            f"Collection {collection.name} holds {dimensions}-dimensional "
+            f"vectors, {provider.signature} produces {provider.dimensions}"
+        )
+
+
+def max_batch_size() -> int:
+    """Largest number of records the client accepts in one ``add``.
+
+    Clients that do not report a limit get ``DEFAULT_MAX_BATCH_SIZE``.
+    """
+    global _max_batch_size
+    client = get_client()
+    if _max_batch_size is None or _max_batch_size[0] is not client:
+        reported = None
+        try:
+            reported = client.get_max_batch_size()
+        except Exception as e:
+            logger.debug("Client reports no max batch size: %s", e)
+        if not isinstance(reported, int) or reported < 1:
+            reported = DEFAULT_MAX_BATCH_SIZE
+        _max_batch_size = (client, reported)
+    return _max_batch_size[1]
+
+
+def chunk_records(
+    document_id: str,
+    chunks: list[dict],
+    owner_key: str,
+    metadata: dict | None = None,
+    start: int = 0,
+) -> dict:
+    """Build the Chroma records for a document's chunks.
+
+    Args:
+        document_id (str): Unique document identifier
+        chunks (list[dict]): Text chunks with embeddings
+        owner_key (str): Owner key for access control
+        metadata (dict, optional): Document-level metadata (filename,
+            uploaded_at, content_type) copied onto every chunk
+        start (int): Ordinal of the first chunk, when storing a
+            document in several parts
+
+    Returns:
+        dict: ``ids``, ``embeddings``, ``metadatas`` and ``documents``
+        lists, as ``Collection.add`` takes them
+    """
+    return {
+        "ids": [f"{document_id}-{i}" for i, _ in enumerate(chunks, start)],
+        "embeddings": [c["embedding"] for c in chunks],
+        "metadatas": [
+            _chunk_metadata(document_id, owner_key, i, c, metadata)
+            for i, c in enumerate(chunks, start)
+        ],
+        "documents": [c["text"] for c in chunks],
+    }
+
 
+def split_records(records: dict, size: int) -> list[dict]:
+    """Split records into consecutive slices of at most ``size``."""
+    count = len(records["ids"])
+    return [
+        {key: values[start : start + size] for key, values in records.items()}
+        for start in range(0, count, size)
+    ]
+
+
+def add_records(records: dict) -> int:
+    """Add records in as few calls as the client's batch limit allows.
 
-def upsert_chunks(document_id: str, chunks: list[dict], owner_key: str):
+    Args:
+        records (dict): Records as built by ``chunk_records``
+
+    Returns:
+        int: Number of ``add`` calls made
+    """
+    col = get_or_create_collection()
+    batches = split_records(records, max_batch_size())
+    for batch in batches:
+        col.add(**batch)
+    CHUNKS.inc(len(records["ids"]))
+    return len(batches)
+
+
+@timed("upsert")
+def upsert_chunks(
+    document_id: str,
+    chunks: list[dict],
+    owner_key: str,
+    metadata: dict | None = None,
+):
     """Store document chunks with embeddings in vector database.
 
     Args:
         document_id (str): Unique document identifier
         chunks (list[dict]): Text chunks with embeddings
         owner_key (str): Owner key for access control
+        metadata (dict, optional): Document-level metadata (filename,
+            uploaded_at, content_type) copied onto every chunk
+    """
+    logger.info(
+        "Upserting %d chunks for document %s", len(chunks), document_id
+    )
+    set_attributes({"chunk.count": len(chunks), "document.id": document_id})
+    add_records(chunk_records(document_id, chunks, owner_key, metadata))
+    logger.debug("Successfully stored %d chunks", len(chunks))
+
+
+def _chunk_metadata(
+    document_id: str,
+    owner_key: str,
+    ordinal: int,
+    chunk: dict,
+    metadata: dict | None,
+) -> dict:
+    """Build the Chroma metadata for one chunk, dropping empty values."""
+    meta = {"document_id": document_id, "owner_key": owner_key}
+    meta.update(metadata or {})
+    meta["ordinal"] = ordinal
+    for key in CHUNK_METADATA_KEYS:
+        meta[key] = chunk.get(key)
+    return {k: v for k, v in meta.items() if v is not None}
+
+
+def build_where(
+    owner_key: str | None, filters: QueryFilters | None = None
+) -> dict | None:
+    """Translate owner isolation and query filters into a Chroma where clause.
+
+    Args:
+        owner_key (str, optional): Filter by owner key
+        filters (QueryFilters, optional): Metadata filters from the request
+
+    Returns:
+        dict | None: Chroma ``where`` clause
+    """
+    clauses = []
+    if owner_key:
+        clauses.append({"owner_key": owner_key})
+    if filters is not None:
+        if filters.document_ids:
+            clauses.append({"document_id": {"$in": filters.document_ids}})
+        if filters.filenames:
+            clauses.append({"filename": {"$in": filters.filenames}})
+        if filters.content_types:
+            clauses.append({"content_type": {"$in": filters.content_types}})
+        if filters.uploaded_after:
+            after = int(filters.uploaded_after.timestamp())
+            clauses.append({"uploaded_at": {"$gte": after}})
+        if filters.uploaded_before:
+            before = int(filters.uploaded_before.timestamp())
+            clauses.append({"uploaded_at": {"$lte": before}})
+        if filters.pages:
+            clauses.append({"page": {"$in": filters.pages}})
+        if filters.section:
+            clauses.append({"section": filters.section})
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+def build_where_document(filters: QueryFilters | None = None) -> dict | None:
+    """Translate full-text filters into a Chroma where_document clause.
+
+    Args:
+        filters (QueryFilters, optional): Metadata filters from the request
+
+    Returns:
+        dict | None: Chroma ``where_document`` clause
+    """
+    if filters is None or not filters.contains:
+        return None
+    return {"$contains": filters.contains}
+
+
+@timed("fetch")
+def get_by_ids(ids: list[str], owner_key: str | None = None) -> dict:
+    """Fetch chunks by ID in one call, skipping IDs that do not exist.
+
+    Args:
+        ids (list[str]): Chunk IDs (``<document_id>-<ordinal>``)
+        owner_key (str, optional): Filter by owner key
+
+    Returns:
+        dict: ``ids``, ``documents`` and ``metadatas`` of found chunks
     """
-    logger.info(f"Upserting {len(chunks)} chunks for document {document_id}")
     col = get_or_create_collection()
-    ids = [f"{document_id}-{i}" for i, _ in enumerate(chunks)]
-    metadatas = [
-        {"document_id": document_id, "owner_key": owner_key} for _ in chunks
-    ]
-    embeddings = [c["embedding"] for c in chunks]
-    documents = [c["text"] for c in chunks]
-    col.add(
+    return col.get(
         ids=ids,
-        embeddings=embeddings,
-        metadatas=metadatas,
-        documents=documents,
+        where=build_where(owner_key),
+        include=["documents", "metadatas"],
     )
-    logger.debug(f"Successfully stored {len(chunks)} chunks")
 
 
-def query(query_embedding, top_k=5, owner_key: str | None = None):
+def query(
+    query_embedding,
+    top_k=5,
+    owner_key: str | None = None,
+    filters: QueryFilters | None = None,
+):
     """Search for similar chunks using vector similarity.
 
+    When filters name specific documents and they match at most
+    ``EXACT_SCAN_THRESHOLD`` chunks, the candidates are scored exactly
+    instead of through the ANN index, whose recall drops sharply under
+    selective filters. Other filters skip the candidate count, which
+    would cost an extra round-trip for sets that are rarely small.
+
     Args:
         query_embedding: Query vector embedding
         top_k (int): Number of results to return
         owner_key (str, optional): Filter by owner key
+        filters (QueryFilters, optional): Metadata and full-text filters
 
     Returns:
         dict: Query results with documents and metadata
     """
+    return query_batch(
+        [query_embedding], top_k=top_k, owner_key=owner_key, filters=filters
+    )
+
+
+@timed("retrieve")
+def query_batch(
+    query_embeddings: list,
+    top_k=5,
+    owner_key: str | None = None,
+    filters: QueryFilters | None = None,
+):
+    """Search for several query vectors in a single Chroma call.
+
+    Args:
+        query_embeddings (list): Query vector embeddings
+        top_k (int): Number of results to return per query
+        owner_key (str, optional): Filter by owner key
+        filters (QueryFilters, optional): Metadata and full-text filters
+
+    Returns:
+        dict: Query results with one row per query embedding
+    """
     logger.debug(
-        f"Querying ChromaDB with top_k={top_k}, owner_key={'set' if owner_key else 'none'}"
+        "Querying ChromaDB with %d embeddings, top_k=%d, owner_key=%s",
+        len(query_embeddings),
+        top_k,
+        "set" if owner_key else "none",
     )
     col = get_or_create_collection()
-    where = {"owner_key": owner_key} if owner_key else None
-    results = col.query(
-        query_embeddings=[query_embedding], n_results=top_k, where=where
+    where = build_where(owner_key, filters)
+    where_document = build_where_document(filters)
+    kwargs = {"where": where}
+    if where_document is not None:
+        kwargs["where_document"] = where_document
+
+    set_attributes(
+        {
+            "retrieve.top_k": top_k,
+            "retrieve.queries": len(query_embeddings),
+            "retrieve.filtered": filters is not None,
+        }
     )
-    logger.debug(
-        f"Query returned {len(results.get('documents', [[]])[0])} results"
+    if filters is not None and filters.is_selective():
+        candidates = col.get(
+            include=[], limit=settings.exact_scan_threshold + 1, **kwargs
+        )
+        candidate_ids = candidates.get("ids") or []
+        if len(candidate_ids) <= settings.exact_scan_threshold:
+            logger.debug(
+                "Exact scan over %d filtered candidates", len(candidate_ids)
+            )
+            set_attributes({"retrieve.exact_scan": True})
+            return _exact_query(col, candidate_ids, query_embeddings, top_k)
+
+    results = col.query(
+        query_embeddings=query_embeddings, n_results=top_k, **kwargs
     )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Query returned %d results",
+            sum(len(d) for d in results.get("documents") or []),
+        )
     return results
+
+
+def _exact_query(col, ids: list[str], query_embeddings, top_k: int) -> dict:
+    """Score candidate chunks by brute-force squared L2 distance.
+
+    Args:
+        col (Collection): ChromaDB collection
+        ids (list[str]): Candidate chunk identifiers
+        query_embeddings: Query vector embeddings
+        top_k (int): Number of results to return per query
+
+    Returns:
+        dict: Results shaped like ``Collection.query`` output
+    """
+    rows = range(len(query_embeddings))
+    if not ids:
+        return {
+            key: [[] for _ in rows]
+            for key in ("ids", "documents", "metadatas", "distances")
+        }
+    got = col.get(ids=ids, include=["embeddings", "documents", "metadatas"])
+    vectors = np.asarray(got["embeddings"], dtype=np.float32)
+    queries = np.asarray(query_embeddings, dtype=np.float32)
+    # |v - q|^2 = |v|^2 - 2 v.q + |q|^2, for all queries at once
+    distances = (
+        np.sum(vectors**2, axis=1)[None, :]
+        - 2 * queries @ vectors.T
+        + np.sum(queries**2, axis=1)[:, None]
+    )
+    orders = np.argsort(distances, axis=1, kind="stable")[:, :top_k]
+    return {
+        "ids": [[got["ids"][i] for i in order] for order in orders],
+        "documents": [
+            [got["documents"][i] for i in order] for order in orders
+        ],
+        "metadatas": [
+            [got["metadatas"][i] for i in order] for order in orders
+        ],
+        "distances": [
+            [max(0.0, float(distances[r, i])) for i in order]
+            for r, order in enumerate(orders)
+        ],
+    }
@@ -0,0 +1,172 @@
+import asyncio
+import time
+
+from chroma_knowledge_search.backend.app.batching import BatchWriter, Pending
+from chroma_knowledge_search.backend.app.chroma_client import (
+    add_records,
+    chunk_records,
+    max_batch_size,
+    split_records,
+)
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+from chroma_knowledge_search.backend.app.metrics import (
+    CHROMA_WRITE_QUEUE,
+    CHROMA_WRITE_ROWS,
+    timed,
+)
+from chroma_knowledge_search.backend.app.tracing import set_attributes
+
+logger = get_logger(__name__, rate_limited=True)
+
+settings = get_settings()
+
+_writer = None
+
+RECORD_KEYS = ("ids", "embeddings", "metadatas", "documents")
+
+
+def _rows(pending: Pending) -> int:
+    return len(pending.item["ids"])
+
+
+class ChromaWriter(BatchWriter):
+    """Send chunk records from concurrent uploads to Chroma in shared adds.
+
+    Each caller's records are split into slices no larger than the
+    client's max batch size and queued. A background task drains the
+    queue, merging the slices already waiting into adds of up to that
+    size, so a large document no longer exceeds the limit and a burst
+    of small uploads shares round-trips. The queue is bounded: when
+    Chroma falls behind, callers wait for room instead of piling up
+    embeddings in memory. If a merged add fails, its slices are retried
+    one at a time so a bad record only fails its own upload.
+    """
+
+    label = "Chroma add"
+
+    def __init__(self, queue_size: int | None = None):
+        super().__init__(queue_size or settings.chroma_write_queue_size)
+        self._limit = None
+        self._carry = None
+        self._stats.update(adds=0, chunks=0, write_s=0.0)
+
+    def stats(self) -> dict:
+        """Snapshot of add counters and write throughput."""
+        stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize() if self._queue else 0
+        stats["chunks_per_s"] = (
+            stats["chunks"] / stats["write_s"] if stats["write_s"] else 0.0
+        )
+        return stats
+
+    async def add(self, records: dict) -> None:
+        """Queue records and wait until Chroma has stored them.
+
+        Waits for queue room first when the writer is behind.
+
+        Args:
+            records (dict): Records as built by ``chunk_records``
+
+        Raises:
+            Exception: Whatever Chroma raised for these records
+        """
+        if not records["ids"]:
+            return
+        self._ensure_running()
+        limit = await self._batch_limit()
+        await self._submit(split_records(records, limit))
+
+    async def _batch_limit(self) -> int:
+        # Asking the client may build it and make a round-trip, so one
+        # lookup per loop runs in a thread and concurrent callers share it
+        if self._limit is None:
+            self._limit = self._loop.create_task(
+                asyncio.to_thread(max_batch_size)
+            )
+        try:
+            return await asyncio.shield(self._limit)
+        except Exception:
+            self._limit = None
+            raise
+
+    def _reset(self) -> None:
+        self._limit = None
+        self._carry = None
+
+    def _queued(self, pending: Pending) -> None:
+        CHROMA_WRITE_QUEUE.set(self._queue.qsize())
+
+    async def _next_batch(self) -> list[Pending]:
+        first = self._carry or await self._queue.get()
+        self._carry = None
+        batch, rows = [first], _rows(first)
+        limit = self._limit.result()
+        while not self._queue.empty():
+            pending = self._queue.get_nowait()
+            if rows + _rows(pending) > limit:
+                # Opens the next add instead
+                self._carry = pending
+                break
+            batch.append(pending)
+            rows += _rows(pending)
+        CHROMA_WRITE_QUEUE.set(self._queue.qsize())
+        return batch
+
+    async def _write(self, batch: list[Pending]) -> None:
+        records = {
+            key: [value for p in batch for value in p.item[key]]
+            for key in RECORD_KEYS
+        }
+        rows = len(records["ids"])
+        started = time.perf_counter()
+        await asyncio.to_thread(add_records, records)
+        elapsed = time.perf_counter() - started
+        self._stats["adds"] += 1
+        self._stats["chunks"] += rows
+        self._stats["write_s"] += elapsed
+        CHROMA_WRITE_ROWS.observe(rows)
+        logger.debug(
+            "Stored %d chunks from %d slices in %.3fs (%.0f chunks/s)",
+            rows,
+            len(batch),
+            elapsed,
+            rows / elapsed if elapsed else 0.0,
+        )
+
+
+def get_chroma_writer() -> ChromaWriter:
+    """Get the shared Chroma writer."""
+    global _writer
+    if _writer is None:
+        _writer = ChromaWriter()
+    return _writer
+
+
+async def write_chunks(
+    document_id: str,
+    chunks: list[dict],
+    owner_key: str,
+    metadata: dict | None = None,
+    start: int = 0,
+) -> None:
+    """Store a document's chunks through the shared Chroma writer.
+
+    Args:
+        document_id (str): Unique document identifier
+        chunks (list[dict]): Text chunks with embeddings
+        owner_key (str): Owner key for access control
+        metadata (dict, optional): Document-level metadata copied onto
+            every chunk
+        start (int): Ordinal of the first chunk
+    """
+    logger.info(
+        "Upserting %d chunks for document %s", len(chunks), document_id
+    )
+    with timed("upsert"):
+        set_attributes(
+            {"chunk.count": len(chunks), "document.id": document_id}
+        )
+        await get_chroma_writer().add(
+            chunk_records(document_id, chunks, owner_key, metadata, start)
+        )
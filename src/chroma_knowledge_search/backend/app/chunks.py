@@ -0,0 +1,75 @@
+import hashlib
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chroma_knowledge_search.backend.app.models import Chunk, Document
+from chroma_knowledge_search.backend.app.ratelimit import estimate_tokens
+
+
+def content_hash(text: str) -> str:
+    """Hex SHA-256 of a chunk's text, to spot unchanged chunks."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_rows(document_id: str, chunks: list[dict]) -> list[Chunk]:
+    """Build the relational records for a document's chunks.
+
+    Ordinals match the ``ordinal`` metadata stored with each vector.
+
+    Args:
+        document_id (str): Document the chunks belong to
+        chunks (list[dict]): Annotated chunks from ``chunk_text``
+
+    Returns:
+        list[Chunk]: One unsaved row per chunk
+    """
+    return [
+        Chunk(
+            document_id=document_id,
+            ordinal=ordinal,
+            char_start=chunk["char_start"],
+            char_end=chunk["char_end"],
+            page=chunk.get("page"),
+            token_count=estimate_tokens([chunk["text"]]),
+            content_hash=content_hash(chunk["text"]),
+            text=chunk["text"],
+        )
+        for ordinal, chunk in enumerate(chunks)
+    ]
+
+
+async def get_chunks(
+    db: AsyncSession,
+    document_id: str,
+    owner_key: str,
+    start: int = 0,
+    limit: int | None = None,
+) -> list[Chunk] | None:
+    """Read a range of a document's chunks in ordinal order.
+
+    Args:
+        db (AsyncSession): Database session
+        document_id (str): Document to read
+        owner_key (str): Owner the document must belong to
+        start (int): First ordinal to return
+        limit (int, optional): Maximum number of chunks
+
+    Returns:
+        list[Chunk] | None: The chunks, or None if the owner has no
+        such document
+    """
+    owned = await db.scalar(
+        select(Document.id).where(
+            Document.id == document_id, Document.owner_key == owner_key
+        )
+    )
+    if owned is None:
+        return None
+    stmt = (
+        select(Chunk)
+        .where(Chunk.document_id == document_id, Chunk.ordinal >= start)
+        .order_by(Chunk.ordinal)
+        .limit(limit)
+    )
+    return list((await db.scalars(stmt)).all())
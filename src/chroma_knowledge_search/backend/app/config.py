@@ -1,9 +1,19 @@
+import functools
 import os
+from collections.abc import Callable
 from pathlib import Path
 
+from pydantic import Field, field_validator, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
+
+@functools.cache
 def load_config():
-    """Load configuration from TOML file or environment variables."""
+    """Load configuration from TOML file or environment variables.
+
+    Runs once per process; every module calls it at import, so later
+    calls return immediately instead of re-reading the file.
+    """
     config_file = Path(".streamlit/secrets.toml")
 
     if config_file.exists():
@@ -62,6 +72,243 @@ def load_config():
             pass
 
 
+class Settings(BaseSettings):
+    """Validated application settings, read from the environment.
+
+    Each field is set by the environment variable of the same name in
+    upper case. Fields in ``RELOADABLE`` are read on every use and can
+    be changed at runtime by :func:`reload_settings`; the rest are fixed
+    at start-up.
+    """
+
+    model_config = SettingsConfigDict(extra="ignore")
+
+    # Credentials and endpoints
+    api_key: str | None = None
+    admin_api_key: str | None = None
+    allow_origins: str = ""
+    db_url: str = "sqlite+aiosqlite:///:memory:"
+    chroma_api_key: str | None = None
+    chroma_tenant: str | None = None
+    chroma_database: str | None = None
+    chroma_collection: str | None = None
+    openai_api_key: str | None = None
+
+    # Models
+    openai_embed_model: str | None = None
+    openai_embed_dimensions: int | None = None
+    openai_chat_model: str | None = None
+    openai_moderation_model: str = "omni-moderation-latest"
+    embedding_provider: str = "openai"
+    local_embed_model: str = "all-MiniLM-L6-v2"
+    local_embed_threads: int = Field(
+        default_factory=lambda: min(4, os.cpu_count() or 1), ge=1
+    )
+    local_embed_batch_size: int = Field(32, ge=1)
+    hashing_embed_dimensions: int = Field(384, ge=1)
+
+    # Pools, batches and timeouts
+    db_pool_size: int = Field(5, ge=1)
+    db_max_overflow: int = Field(10, ge=0)
+    db_pool_timeout_s: float = Field(30.0, gt=0)
+    db_pool_recycle_s: float = Field(1800.0, gt=0)
+    sqlite_busy_timeout_ms: int = Field(5000, ge=0)
+    sqlite_mmap_size_mb: int = Field(256, ge=0)
+    openai_timeout_s: float = Field(60.0, gt=0)
+    openai_max_concurrency: int = Field(16, ge=1)
+    # Account-wide OpenAI budgets (0 = unlimited). Limiters live in each
+    # worker process, so every worker paces itself to its share: the
+    # budget divided by WEB_CONCURRENCY, which uvicorn also reads as
+    # its default --workers
+    web_concurrency: int = Field(1, ge=1)
+    openai_embed_rpm: int = Field(0, ge=0)
+    openai_embed_tpm: int = Field(0, ge=0)
+    openai_chat_rpm: int = Field(0, ge=0)
+    openai_chat_tpm: int = Field(0, ge=0)
+    openai_moderation_rpm: int = Field(0, ge=0)
+    openai_moderation_tpm: int = Field(0, ge=0)
+    # Pending vector-store adds before uploads wait for room
+    chroma_write_queue_size: int = Field(64, ge=1)
+    quota_store: str = "memory"
+    quota_db_path: str = "quotas.db"
+    # SQLite file for cached answers; empty (the default) disables it
+    generation_cache_path: str = ""
+    # Distinct queries counted per owner when finding hot ones
+    hot_query_capacity: int = Field(1000, ge=1)
+
+    # Observability
+    log_format: str = "json"
+    otel_traces_exporter: str = "none"
+    otel_traces_sampler_arg: float = Field(1.0, ge=0, le=1)
+    otel_service_name: str = "chroma-knowledge-search"
+    prewarm: bool = False
+    settings_reload_file: str = ".env"
+
+    # Reloadable tunables
+    log_level: str = "INFO"
+    log_rate_limit: float = Field(10.0, ge=0)
+    log_rate_burst: int = Field(20, ge=1)
+    max_file_size_mb: float = Field(15.0, gt=0)
+    chunk_size: int = Field(300, ge=1)
+    chunk_overlap: int = Field(50, ge=0)
+    # Chunks embedded and stored per upload checkpoint
+    upload_embed_batch_size: int = Field(256, ge=1)
+    context_neighbors: int = Field(1, ge=0)
+    context_token_budget: int = Field(4000, ge=1)
+    search_max_results: int = Field(200, ge=1)
+    batch_generation_concurrency: int = Field(4, ge=1)
+    exact_scan_threshold: int = Field(500, ge=0)
+    query_embed_cache_size: int = Field(1024, ge=0)
+    moderation_cache_ttl: float = Field(3600.0, ge=0)
+    moderation_cache_size: int = Field(10000, ge=0)
+    moderation_batch_window_ms: float = Field(2.0, ge=0)
+    moderation_max_batch: int = Field(32, ge=1)
+    db_commit_window_ms: float = Field(5.0, ge=0)
+    db_commit_max_rows: int = Field(256, ge=1)
+    auth_cache_size: int = Field(4096, ge=0)
+    auth_cache_ttl_s: float = Field(60.0, ge=0)
+    auth_negative_cache_ttl_s: float = Field(5.0, ge=0)
+    # Per-key quotas, off (0) by default; every client sharing a key,
+    # such as the frontend with its single API_KEY, shares its quota
+    api_key_rpm: float = Field(0.0, ge=0)
+    api_key_burst: float = Field(20.0, ge=0)
+    api_key_upload_mb_per_min: float = Field(0.0, ge=0)
+    api_key_max_concurrent_uploads: int = Field(0, ge=0)
+    openai_latency_target_s: float = Field(10.0, gt=0)
+    openai_max_queue_wait_s: float = Field(10.0, ge=0)
+    openai_chat_temperature: float = Field(0.2, ge=0, le=2)
+    generation_cache_ttl_s: float = Field(86400.0, ge=0)
+    generation_cache_size: int = Field(10000, ge=0)
+    generation_cache_max_temperature: float = Field(0.3, ge=0, le=2)
+    hot_query_top_n: int = Field(100, ge=0)
+    hot_query_min_count: int = Field(3, ge=1)
+    hot_query_ttl_s: float = Field(300.0, ge=0)
+    # 0 waits for the embedding however long it takes
+    query_embed_deadline_s: float = Field(1.5, ge=0)
+    lexical_index_ttl_s: float = Field(300.0, ge=0)
+
+    @field_validator(
+        "embedding_provider",
+        "quota_store",
+        "log_format",
+        "otel_traces_exporter",
+        "log_level",
+    )
+    @classmethod
+    def _lower(cls, value: str) -> str:
+        return value.lower()
+
+    @model_validator(mode="after")
+    def _check_chunking(self) -> "Settings":
+        if self.chunk_overlap >= self.chunk_size:
+            raise ValueError("CHUNK_OVERLAP must be smaller than CHUNK_SIZE")
+        return self
+
+
+# Settings that only change what happens on the next use; anything that
+# picks a model, a store or a connection needs a restart
+RELOADABLE = frozenset(
+    {
+        "log_level",
+        "log_rate_limit",
+        "log_rate_burst",
+        "max_file_size_mb",
+        "chunk_size",
+        "chunk_overlap",
+        "upload_embed_batch_size",
+        "context_neighbors",
+        "context_token_budget",
+        "search_max_results",
+        "batch_generation_concurrency",
+        "exact_scan_threshold",
+        "query_embed_cache_size",
+        "moderation_cache_ttl",
+        "moderation_cache_size",
+        "moderation_batch_window_ms",
+        "moderation_max_batch",
+        "db_commit_window_ms",
+        "db_commit_max_rows",
+        "auth_cache_size",
+        "auth_cache_ttl_s",
+        "auth_negative_cache_ttl_s",
+        "api_key_rpm",
+        "api_key_burst",
+        "api_key_upload_mb_per_min",
+        "api_key_max_concurrent_uploads",
+        "openai_latency_target_s",
+        "openai_max_queue_wait_s",
+        "openai_chat_temperature",
+        "generation_cache_ttl_s",
+        "generation_cache_size",
+        "generation_cache_max_temperature",
+        "hot_query_top_n",
+        "hot_query_min_count",
+        "hot_query_ttl_s",
+        "query_embed_deadline_s",
+        "lexical_index_ttl_s",
+    }
+)
+
+_reload_hooks: list[Callable[[Settings], None]] = []
+
+
+@functools.cache
+def get_settings() -> Settings:
+    """Get the settings, built once from the loaded configuration.
+
+    Raises:
+        pydantic.ValidationError: If a setting has an invalid value
+    """
+    load_config()
+    return Settings()
+
+
+def on_reload(hook: Callable[[Settings], None]) -> Callable:
+    """Register ``hook`` to run after settings are reloaded.
+
+    For modules that derive state from a reloadable setting when they
+    are created, such as a limiter or a log filter.
+    """
+    _reload_hooks.append(hook)
+    return hook
+
+
+def reload_settings() -> dict:
+    """Re-read ``SETTINGS_RELOAD_FILE`` and apply its reloadable values.
+
+    The new values are validated together before any is applied, so a
+    bad file leaves the running settings untouched. Settings outside
+    ``RELOADABLE`` are ignored.
+
+    Returns:
+        dict: ``{name: (old, new)}`` for every setting that changed
+
+    Raises:
+        pydantic.ValidationError: If a reloaded value is invalid
+    """
+    settings = get_settings()
+    overrides = {}
+    path = Path(settings.settings_reload_file)
+    if path.exists():
+        from dotenv import dotenv_values
+
+        for key, value in dotenv_values(path).items():
+            if key.lower() in RELOADABLE and value is not None:
+                overrides[key.lower()] = value
+    fresh = Settings(**overrides)
+
+    changed = {}
+    for name in sorted(RELOADABLE):
+        old, new = getattr(settings, name), getattr(fresh, name)
+        if old != new:
+            setattr(settings, name, new)
+            changed[name] = (old, new)
+    if changed:
+        for hook in _reload_hooks:
+            hook(settings)
+    return changed
+
+
 def get_allow_origins():
     """Get CORS allow origins as list."""
-    return os.getenv("ALLOW_ORIGINS", "").split(",")
+    return get_settings().allow_origins.split(",")
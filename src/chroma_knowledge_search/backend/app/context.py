@@ -0,0 +1,204 @@
+from collections.abc import Callable
+
+from chroma_knowledge_search.backend.app.chroma_client import (
+    get_by_ids,
+    query,
+    query_batch,
+)
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+from chroma_knowledge_search.backend.app.ratelimit import estimate_tokens
+from chroma_knowledge_search.backend.app.schemas import QueryFilters
+from chroma_knowledge_search.backend.app.tracing import set_attributes
+
+logger = get_logger(__name__, rate_limited=True)
+
+settings = get_settings()
+
+
+def _key(meta: dict | None) -> tuple[str, int] | None:
+    if meta and "document_id" in meta and "ordinal" in meta:
+        return meta["document_id"], meta["ordinal"]
+    return None
+
+
+def _join(left: tuple[str, dict], right: tuple[str, dict]) -> str:
+    """Join the texts of two consecutive chunks, dropping shared words."""
+    left_text, left_meta = left
+    right_text, right_meta = right
+    left_end = left_meta.get("char_end")
+    right_start = right_meta.get("char_start")
+    if left_end is None or right_start is None or right_start < left_end:
+        # Overlapping windows: the longest suffix of the left chunk that
+        # starts the right one is the shared part
+        a, b = left_text.split(" "), right_text.split(" ")
+        for k in range(min(len(a), len(b)), 0, -1):
+            if a[-k:] == b[:k]:
+                return " ".join(a + b[k:])
+    return f"{left_text} {right_text}"
+
+
+def expand_context(
+    docs: list[str],
+    metadatas: list[dict],
+    owner_key: str | None = None,
+    neighbors: int | None = None,
+    token_budget: int | None = None,
+    fetch: Callable[..., dict] | None = None,
+) -> tuple[list[str], list[dict]]:
+    """Widen retrieved chunks with their neighbors under a token budget.
+
+    Neighboring ordinals of every hit are fetched in one batched call.
+    Budget is spent nearest neighbor first, hit by hit in rank order,
+    and the hits themselves are always kept. Consecutive chunks of a
+    document are then merged into one passage with their overlap
+    removed, and passages are ordered by their best-ranked hit.
+
+    Args:
+        docs (list[str]): Retrieved chunk texts, best first
+        metadatas (list[dict]): Metadata aligned with docs
+        owner_key (str, optional): Owner the chunks must belong to
+        neighbors (int, optional): Chunks to add on each side of a hit
+        token_budget (int, optional): Estimated tokens for all passages
+        fetch (Callable, optional): Chunk lookup by ID, in place of the
+            vector store's ``get_by_ids``
+
+    Returns:
+        tuple[list[str], list[dict]]: Passages and, for each, the
+        metadata of its best-ranked hit
+    """
+    if neighbors is None:
+        neighbors = settings.context_neighbors
+    if token_budget is None:
+        token_budget = settings.context_token_budget
+    # Rank of each hit; hits without an ordinal (older uploads) pass
+    # through unchanged
+    rank = {}
+    chunks = {}
+    for position, (text, meta) in enumerate(zip(docs, metadatas)):
+        key = _key(meta)
+        if key is not None and key not in rank:
+            rank[key] = position
+            chunks[key] = (text, meta)
+    if neighbors <= 0 or not rank:
+        return docs, metadatas
+
+    wanted = {
+        (document_id, ordinal + delta)
+        for document_id, ordinal in rank
+        for distance in range(1, neighbors + 1)
+        for delta in (-distance, distance)
+        if ordinal + delta >= 0
+    } - chunks.keys()
+    if wanted:
+        res = (fetch or get_by_ids)(
+            [f"{document_id}-{ordinal}" for document_id, ordinal in wanted],
+            owner_key=owner_key,
+        )
+        for text, meta in zip(
+            res.get("documents") or [], res.get("metadatas") or []
+        ):
+            key = _key(meta)
+            if key is not None:
+                chunks[key] = (text, meta)
+
+    selected = set(rank)
+    used = estimate_tokens(docs)
+    for distance in range(1, neighbors + 1):
+        for document_id, ordinal in rank:
+            for step in (-1, 1):
+                key = (document_id, ordinal + step * distance)
+                inner = (document_id, ordinal + step * (distance - 1))
+                # Only grow outward from chunks already in the passage
+                if key in selected or key not in chunks:
+                    continue
+                if inner not in selected:
+                    continue
+                cost = estimate_tokens([chunks[key][0]])
+                if used + cost > token_budget:
+                    continue
+                selected.add(key)
+                used += cost
+
+    runs = []
+    for document_id, ordinal in sorted(selected):
+        if runs and runs[-1][-1] == (document_id, ordinal - 1):
+            runs[-1].append((document_id, ordinal))
+        else:
+            runs.append([(document_id, ordinal)])
+
+    passages = []
+    for run in runs:
+        text = chunks[run[0]][0]
+        for previous, key in zip(run, run[1:]):
+            text = _join((text, chunks[previous][1]), chunks[key])
+        position = min(rank[key] for key in run if key in rank)
+        passages.append((position, text, metadatas[position]))
+    passages += [
+        (position, text, meta)
+        for position, (text, meta) in enumerate(zip(docs, metadatas))
+        if _key(meta) is None
+    ]
+    passages.sort(key=lambda passage: passage[0])
+    set_attributes({"context.passages": len(passages), "context.tokens": used})
+    logger.debug(
+        "Expanded %d hits into %d passages (~%d tokens)",
+        len(docs),
+        len(passages),
+        used,
+    )
+    return [text for _, text, _ in passages], [meta for *_, meta in passages]
+
+
+def retrieve_context(
+    query_embedding,
+    top_k: int,
+    owner_key: str,
+    filters: QueryFilters | None = None,
+) -> tuple[list[str], list[dict]]:
+    """Search for the top chunks and widen them with their neighbors.
+
+    Args:
+        query_embedding: Query vector embedding
+        top_k (int): Number of chunks to retrieve
+        owner_key (str): Owner the chunks must belong to
+        filters (QueryFilters, optional): Metadata and full-text filters
+
+    Returns:
+        tuple[list[str], list[dict]]: Passages and their metadata
+    """
+    res = query(
+        query_embedding, top_k=top_k, owner_key=owner_key, filters=filters
+    )
+    docs = res.get("documents", [[]])[0]
+    metadatas = res.get("metadatas", [[]])[0]
+    return expand_context(docs, metadatas, owner_key=owner_key)
+
+
+def retrieve_context_batch(
+    query_embeddings: list,
+    top_k: int,
+    owner_key: str,
+    filters: QueryFilters | None = None,
+) -> list[tuple[list[str], list[dict]]]:
+    """Search for several queries at once and widen each one's hits.
+
+    Args:
+        query_embeddings (list): Query vector embeddings
+        top_k (int): Number of chunks to retrieve per query
+        owner_key (str): Owner the chunks must belong to
+        filters (QueryFilters, optional): Metadata and full-text filters
+
+    Returns:
+        list[tuple[list[str], list[dict]]]: Passages and their metadata,
+        one pair per query embedding
+    """
+    res = query_batch(
+        query_embeddings, top_k=top_k, owner_key=owner_key, filters=filters
+    )
+    all_docs = res.get("documents") or [[] for _ in query_embeddings]
+    all_metadatas = res.get("metadatas") or [[] for _ in query_embeddings]
+    return [
+        expand_context(docs, metadatas, owner_key=owner_key)
+        for docs, metadatas in zip(all_docs, all_metadatas)
+    ]
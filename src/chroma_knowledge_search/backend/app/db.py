@@ -1,27 +1,97 @@
-import os
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 
-from chroma_knowledge_search.backend.app.models import Base
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+from chroma_knowledge_search.backend.app.migrations import migrate
+
+logger = get_logger(__name__)
+
+settings = get_settings()
+# Workers racing to migrate a fresh SQLite file retry this many times
+MIGRATE_ATTEMPTS = 5
 
 _engine = None
 _session_local = None
 
 
+def _tune_sqlite(dbapi_connection, connection_record) -> None:
+    """Per-connection pragmas for a file-backed SQLite database.
+
+    WAL lets readers run alongside the single writer, NORMAL sync skips
+    the fsync on every commit (still safe against application crashes
+    in WAL mode), the busy timeout makes writers queue instead of
+    failing with "database is locked", and mmap serves reads from the
+    page cache.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    cursor.execute(
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}"
+    )
+    cursor.close()
+
+
+def build_engine(db_url: str) -> AsyncEngine:
+    """Create an async engine tuned for the database behind ``db_url``.
+
+    Server databases get a sized pool with pre-ping and recycling, so
+    connections dropped by the server or a proxy are replaced rather
+    than failing a request. File-backed SQLite gets WAL pragmas; an
+    in-memory database is private to each worker and only suits tests.
+
+    Args:
+        db_url (str): SQLAlchemy async database URL
+
+    Returns:
+        AsyncEngine: The engine
+    """
+    url = make_url(db_url)
+    kwargs = {}
+    in_memory = False
+    if url.get_backend_name() == "sqlite":
+        in_memory = url.database in (None, "", ":memory:")
+        if in_memory:
+            logger.warning(
+                "Using an in-memory SQLite database; each worker has its "
+                "own copy and nothing survives a restart"
+            )
+        else:
+            kwargs = {
+                "pool_size": settings.db_pool_size,
+                "max_overflow": settings.db_max_overflow,
+                "pool_timeout": settings.db_pool_timeout_s,
+            }
+    else:
+        kwargs = {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout_s,
+            "pool_recycle": settings.db_pool_recycle_s,
+            "pool_pre_ping": True,
+        }
+    engine = create_async_engine(db_url, echo=False, future=True, **kwargs)
+    if url.get_backend_name() == "sqlite" and not in_memory:
+        event.listen(engine.sync_engine, "connect", _tune_sqlite)
+    return engine
+
+
 def get_engine():
     """Get or create database engine."""
     global _engine, _session_local
     if _engine is None:
-        try:
-            from chroma_knowledge_search.backend.app.config import load_config
-
-            load_config()
-        except (ImportError, FileNotFoundError):
-            # Config loading may fail in tests or when files don't exist
-            pass
-
-        db_url = os.getenv("DB_URL", "sqlite+aiosqlite:///:memory:")
-        _engine = create_async_engine(db_url, echo=False, future=True)
+        _engine = build_engine(settings.db_url)
         _session_local = sessionmaker(
             _engine, class_=AsyncSession, expire_on_commit=False
         )
@@ -29,10 +99,20 @@ def get_engine():
 
 
 async def init_db():
-    """Initialize database tables."""
+    """Bring the database schema up to date with versioned migrations."""
     engine, _ = get_engine()
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    for attempt in range(1, MIGRATE_ATTEMPTS + 1):
+        try:
+            async with engine.begin() as conn:
+                applied = await conn.run_sync(migrate)
+            break
+        except (IntegrityError, OperationalError):
+            # Another worker migrated first; the retry sees its work
+            if attempt == MIGRATE_ATTEMPTS:
+                raise
+            await asyncio.sleep(0.1 * attempt)
+    if applied:
+        logger.info("Applied migrations %s", applied)
 
 
 async def get_db():
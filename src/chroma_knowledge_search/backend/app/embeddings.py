@@ -1,20 +1,277 @@
+import hashlib
 import os
-from openai import OpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import cached_property
+
+import numpy as np
+from tenacity import (
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 from chroma_knowledge_search.backend.app.logging_config import get_logger
-from chroma_knowledge_search.backend.app.config import load_config
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.tracing import set_attributes
+from chroma_knowledge_search.backend.app.metrics import (
+    count_retry,
+    record_cache,
+    record_tokens,
+    timed,
+)
+from chroma_knowledge_search.backend.app.ratelimit import (
+    RateLimitExceeded,
+    estimate_tokens,
+    get_limiter,
+    get_openai_client,
+    upstream_wait,
+)
+
+logger = get_logger(__name__, rate_limited=True)
+settings = get_settings()
+# Set to override the shared OpenAI client
+client = None
+
+# Native output sizes, used when OPENAI_EMBED_DIMENSIONS is not set
+OPENAI_MODEL_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+# The MiniLM model bundled with chromadb runs on onnxruntime alone
+ONNX_MINILM_MODEL = "all-MiniLM-L6-v2"
+TOKEN_RE = re.compile(r"\w+")
+
+_provider = None
+_query_cache: OrderedDict[str, list[float]] = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+
+class EmbeddingProvider(ABC):
+    """Interface for turning texts into embedding vectors.
+
+    Subclasses set ``name`` and ``model`` and implement :meth:`embed`.
+    ``signature`` identifies the vector space; collections record it so
+    vectors from different providers are never mixed.
+    """
+
+    name = ""
+    model = ""
+
+    @property
+    def dimensions(self) -> int | None:
+        """Output size, or None when the provider cannot tell upfront."""
+        return None
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}:{self.model}"
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts, returning one vector per text in order."""
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Embeddings from the OpenAI API, retried on failure."""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        model: str | None = None,
+        dimensions: int | None = None,
+    ):
+        self.model = model or settings.openai_embed_model
+        self._dimensions = dimensions
+
+    @property
+    def dimensions(self) -> int | None:
+        configured = self._dimensions or settings.openai_embed_dimensions
+        if configured:
+            return configured
+        return OPENAI_MODEL_DIMENSIONS.get(self.model)
 
-logger = get_logger(__name__)
-load_config()
-openai_api_key = os.getenv("OPENAI_API_KEY")
-openai_embedding_model = os.getenv("OPENAI_EMBED_MODEL")
-client = OpenAI(api_key=openai_api_key)
+    @retry(
+        wait=upstream_wait(wait_exponential(min=1, max=10)),
+        stop=stop_after_attempt(3),
+        retry=retry_if_not_exception_type(RateLimitExceeded),
+        before_sleep=count_retry("embed"),
+    )
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        kwargs = {}
+        configured = self._dimensions or settings.openai_embed_dimensions
+        if configured:
+            # text-embedding-3 models can return shortened vectors directly
+            kwargs["dimensions"] = configured
+        with get_limiter("embed").slot(estimate_tokens(texts)) as slot:
+            resp = (client or get_openai_client()).embeddings.create(
+                model=self.model, input=texts, **kwargs
+            )
+            usage = getattr(resp, "usage", None)
+            slot.used(getattr(usage, "total_tokens", None))
+        record_tokens("embedding", usage)
+        return [d.embedding for d in resp.data]
 
 
-@retry(wait=wait_exponential(min=1, max=10), stop=stop_after_attempt(3))
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """CPU embeddings from a local sentence-embedding model.
+
+    ``all-MiniLM-L6-v2`` runs through the ONNX build that ships with
+    chromadb. Any other model name is loaded with sentence-transformers,
+    which must be installed separately. Inference runs in batches of
+    ``batch_size`` on at most ``threads`` CPU threads.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model: str | None = None,
+        threads: int | None = None,
+        batch_size: int | None = None,
+    ):
+        self.model = model or settings.local_embed_model
+        self.threads = threads or settings.local_embed_threads
+        self.batch_size = batch_size or settings.local_embed_batch_size
+        self._lock = threading.Lock()
+
+    @cached_property
+    def _encoder(self):
+        if self.model == ONNX_MINILM_MODEL:
+            return _onnx_minilm(self.threads)
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                f"Local model {self.model} needs sentence-transformers"
+            ) from e
+        torch.set_num_threads(self.threads)
+        model = SentenceTransformer(self.model, device="cpu")
+        return lambda batch: model.encode(batch, normalize_embeddings=True)
+
+    @property
+    def dimensions(self) -> int | None:
+        if self.model == ONNX_MINILM_MODEL:
+            return 384
+        return None
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        # One inference at a time; the model already uses every thread
+        with self._lock:
+            for start in range(0, len(texts), self.batch_size):
+                batch = texts[start : start + self.batch_size]
+                vectors.extend(
+                    np.asarray(v, dtype=np.float32).tolist()
+                    for v in self._encoder(batch)
+                )
+        return vectors
+
+
+def _onnx_minilm(threads: int):
+    """chromadb's ONNX MiniLM with the session limited to ``threads``."""
+    from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import (
+        ONNXMiniLM_L6_V2,
+    )
+
+    class ThreadLimitedMiniLM(ONNXMiniLM_L6_V2):
+        @cached_property
+        def model(self):
+            options = self.ort.SessionOptions()
+            options.log_severity_level = 3
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+            return self.ort.InferenceSession(
+                os.path.join(
+                    self.DOWNLOAD_PATH,
+                    self.EXTRACTED_FOLDER_NAME,
+                    "model.onnx",
+                ),
+                providers=["CPUExecutionProvider"],
+                sess_options=options,
+            )
+
+    return ThreadLimitedMiniLM()
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Deterministic signed feature-hashing vectors.
+
+    Needs no model or network, and texts that share words land close
+    together, which is enough for tests and benchmarks.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimensions: int | None = None):
+        dimensions = dimensions or settings.hashing_embed_dimensions
+        self.model = f"blake2b-{dimensions}"
+        self._dimensions = dimensions
+
+    @property
+    def dimensions(self) -> int:
+        return self._dimensions
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        vectors = np.zeros((len(texts), self._dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in TOKEN_RE.findall(text.lower()):
+                digest = int.from_bytes(
+                    hashlib.blake2b(token.encode(), digest_size=8).digest(),
+                    "little",
+                )
+                sign = 1.0 if digest >> 63 else -1.0
+                vectors[row, digest % self._dimensions] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).tolist()
+
+
+PROVIDERS = {
+    "openai": OpenAIEmbeddingProvider,
+    "local": LocalEmbeddingProvider,
+    "hashing": HashingEmbeddingProvider,
+}
+
+
+def get_provider() -> EmbeddingProvider:
+    """Get the embedding provider selected by EMBEDDING_PROVIDER.
+
+    Raises:
+        ValueError: If EMBEDDING_PROVIDER names an unknown provider
+    """
+    global _provider
+    if _provider is None:
+        name = settings.embedding_provider
+        if name not in PROVIDERS:
+            raise ValueError(f"Unsupported EMBEDDING_PROVIDER: {name}")
+        _provider = PROVIDERS[name]()
+        logger.info("Using %s embedding provider", _provider.signature)
+    return _provider
+
+
+def set_provider(provider: EmbeddingProvider | None) -> None:
+    """Replace the embedding provider and drop cached query vectors.
+
+    Args:
+        provider (EmbeddingProvider | None): New provider, or None to
+            rebuild from EMBEDDING_PROVIDER on next use
+    """
+    global _provider
+    _provider = provider
+    with _query_cache_lock:
+        _query_cache.clear()
+
+
+@timed("embed")
 def get_embeddings(texts: list[str]) -> list[list[float]]:
-    """Generate embeddings for text using OpenAI API with retry logic.
+    """Generate embeddings for texts with the configured provider.
 
     Args:
         texts (list[str]): List of texts to embed
@@ -22,7 +279,66 @@ def get_embeddings(texts: list[str]) -> list[list[float]]:
     Returns:
         list[list[float]]: List of embedding vectors
     """
-    logger.debug(f"Generating embeddings for {len(texts)} texts")
-    resp = client.embeddings.create(model=openai_embedding_model, input=texts)
-    logger.debug(f"Generated {len(resp.data)} embeddings")
-    return [d.embedding for d in resp.data]
+    provider = get_provider()
+    logger.debug(
+        "Generating embeddings for %d texts with %s",
+        len(texts),
+        provider.name,
+    )
+    set_attributes(
+        {
+            "embedding.batch_size": len(texts),
+            "embedding.provider": provider.signature,
+        }
+    )
+    embeddings = provider.embed(texts)
+    logger.debug("Generated %d embeddings", len(embeddings))
+    return embeddings
+
+
+def normalize_query(text: str) -> str:
+    """Collapse whitespace so trivially different queries share a key."""
+    return " ".join(text.split())
+
+
+def embed_query(text: str) -> list[float]:
+    """Embed a single query, reusing recent results from an LRU cache.
+
+    Args:
+        text (str): Query text
+
+    Returns:
+        list[float]: Query embedding vector
+    """
+    return embed_queries([text])[0]
+
+
+def embed_queries(texts: list[str]) -> list[list[float]]:
+    """Embed queries, reusing cached vectors and embedding the rest at once.
+
+    Args:
+        texts (list[str]): Query texts
+
+    Returns:
+        list[list[float]]: One embedding vector per text
+    """
+    keys = [normalize_query(text) for text in texts]
+    found = {}
+    with _query_cache_lock:
+        for key in keys:
+            cached = _query_cache.get(key)
+            if cached is not None:
+                _query_cache.move_to_end(key)
+                found[key] = cached
+    for key in keys:
+        record_cache("query_embedding", key in found)
+    missing = list(dict.fromkeys(key for key in keys if key not in found))
+    if missing:
+        embeddings = get_embeddings(missing)
+        with _query_cache_lock:
+            for key, embedding in zip(missing, embeddings):
+                found[key] = _query_cache[key] = embedding
+                _query_cache.move_to_end(key)
+            while len(_query_cache) > settings.query_embed_cache_size:
+                _query_cache.popitem(last=False)
+    return [found[key] for key in keys]
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+
+logger = get_logger(__name__, rate_limited=True)
+
+settings = get_settings()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def fingerprint(model: str, temperature: float, messages: list[dict]) -> str:
+    """Hex SHA-256 identifying one chat completion request.
+
+    Args:
+        model (str): Chat model name
+        temperature (float): Sampling temperature
+        messages (list[dict]): Chat messages, in order
+
+    Returns:
+        str: The cache key
+    """
+    raw = json.dumps(
+        [model, temperature, messages],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """Chat completions cached on disk, shared by every worker.
+
+    Entries expire ``ttl`` seconds after they are written. Past
+    ``max_size`` entries, the least recently read are evicted. Like the
+    SQLite quota store, each thread keeps its own connection to a WAL
+    database, so workers on one host share hits.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float | None = None,
+        max_size: int | None = None,
+    ):
+        self.path = path
+        # None follows the (reloadable) settings
+        self.ttl = ttl
+        self.max_size = max_size
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS generation_cache (
+                key TEXT PRIMARY KEY,
+                answer TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_generation_cache_accessed
+                ON generation_cache (accessed);
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _limits(self) -> tuple[float, int]:
+        ttl = settings.generation_cache_ttl_s if self.ttl is None else self.ttl
+        max_size = self.max_size
+        if max_size is None:
+            max_size = settings.generation_cache_size
+        return ttl, max_size
+
+    def get(self, key: str) -> str | None:
+        """Return the cached answer for ``key``, or None if absent or stale."""
+        ttl, _ = self._limits()
+        # Wall-clock time, since monotonic clocks differ between processes
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT answer FROM generation_cache "
+            "WHERE key = ? AND created > ?",
+            (key, now - ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE generation_cache SET accessed = ? WHERE key = ?",
+            (now, key),
+        )
+        return row[0]
+
+    def put(self, key: str, answer: str) -> None:
+        """Store an answer, then drop expired and least recently read ones."""
+        ttl, max_size = self._limits()
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO generation_cache VALUES (?, ?, ?, ?)",
+                (key, answer, now, now),
+            )
+            conn.execute(
+                "DELETE FROM generation_cache WHERE created <= ?",
+                (now - ttl,),
+            )
+            conn.execute(
+                "DELETE FROM generation_cache WHERE key IN ("
+                "SELECT key FROM generation_cache ORDER BY accessed DESC "
+                "LIMIT -1 OFFSET ?)",
+                (max_size,),
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def size(self) -> int:
+        """Number of entries, including expired ones not yet dropped."""
+        row = (
+            self._connect()
+            .execute("SELECT COUNT(*) FROM generation_cache")
+            .fetchone()
+        )
+        return row[0]
+
+
+def get_generation_cache() -> GenerationCache | None:
+    """Get the shared cache, or None when ``GENERATION_CACHE_PATH`` is empty."""
+    global _cache
+    if not settings.generation_cache_path:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = GenerationCache(settings.generation_cache_path)
+    return _cache
@@ -0,0 +1,127 @@
+import asyncio
+
+from sqlalchemy.sql import Executable
+
+from chroma_knowledge_search.backend.app.batching import BatchWriter, Pending
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.db import get_engine
+from chroma_knowledge_search.backend.app.metrics import DB_COMMIT_ROWS
+
+settings = get_settings()
+
+_writer = None
+
+
+class GroupCommitWriter(BatchWriter):
+    """Commit metadata writes from concurrent requests together.
+
+    Callers queue ORM objects to insert and SQL statements (such as
+    status updates) to run, then wait for the commit that makes them
+    durable. A background task takes the first queued write, waits up
+    to the commit window for others to join, or until the row limit is
+    reached, and applies the whole group in one transaction, so a
+    burst of uploads pays for one commit instead of one each. If the
+    group's transaction fails, its writes are retried one caller at a
+    time so a bad row only fails its own request.
+    """
+
+    label = "Group commit"
+
+    def __init__(
+        self,
+        session_factory=None,
+        window_ms: float | None = None,
+        max_rows: int | None = None,
+    ):
+        super().__init__()
+        self._session_factory = session_factory
+        # None follows the (reloadable) settings
+        self.window_ms = window_ms
+        self.max_rows = max_rows
+        self._full = None
+        self._queued_rows = 0
+        self._stats.update(commits=0, writes=0)
+
+    def stats(self) -> dict:
+        """Snapshot of commit and write counters."""
+        stats = dict(self._stats)
+        stats["queued_rows"] = self._queued_rows
+        return stats
+
+    def _limits(self) -> tuple[float, int]:
+        window_ms = self.window_ms
+        if window_ms is None:
+            window_ms = settings.db_commit_window_ms
+        return window_ms / 1000, self.max_rows or settings.db_commit_max_rows
+
+    async def write(self, *ops) -> None:
+        """Queue writes and wait until they are committed.
+
+        Args:
+            *ops: ORM objects to add and SQL statements to execute,
+                applied in order in the same transaction
+
+        Raises:
+            Exception: Whatever the database raised for these writes
+        """
+        if ops:
+            await self._submit([ops])
+
+    def _reset(self) -> None:
+        self._full = asyncio.Event()
+        self._queued_rows = 0
+
+    def _queued(self, pending: Pending) -> None:
+        self._queued_rows += len(pending.item)
+        if self._queued_rows >= self._limits()[1]:
+            self._full.set()
+
+    async def _next_batch(self) -> list[Pending]:
+        batch = [await self._queue.get()]
+        window, max_rows = self._limits()
+        if window > 0 and self._queued_rows < max_rows:
+            try:
+                await asyncio.wait_for(self._full.wait(), window)
+            except asyncio.TimeoutError:
+                pass
+        rows = len(batch[0].item)
+        while rows < max_rows and not self._queue.empty():
+            pending = self._queue.get_nowait()
+            batch.append(pending)
+            rows += len(pending.item)
+        self._queued_rows -= rows
+        if self._queued_rows < max_rows:
+            self._full.clear()
+        return batch
+
+    async def _write(self, batch: list[Pending]) -> None:
+        session_factory = self._session_factory or get_engine()[1]
+        async with session_factory() as session:
+            for pending in batch:
+                for op in pending.item:
+                    if isinstance(op, Executable):
+                        await session.execute(op)
+                    else:
+                        session.add(op)
+            await session.commit()
+        rows = sum(len(pending.item) for pending in batch)
+        self._stats["commits"] += 1
+        self._stats["writes"] += rows
+        DB_COMMIT_ROWS.observe(rows)
+
+
+def get_writer() -> GroupCommitWriter:
+    """Get the shared group-commit writer."""
+    global _writer
+    if _writer is None:
+        _writer = GroupCommitWriter()
+    return _writer
+
+
+async def write(*ops) -> None:
+    """Commit writes through the shared group-commit writer.
+
+    Args:
+        *ops: ORM objects to add and SQL statements to execute
+    """
+    await get_writer().write(*ops)
@@ -0,0 +1,243 @@
+import asyncio
+import heapq
+import threading
+import time
+from collections.abc import Hashable
+from operator import itemgetter
+
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.context import retrieve_context
+from chroma_knowledge_search.backend.app.embeddings import embed_query
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+from chroma_knowledge_search.backend.app.metrics import record_cache
+
+logger = get_logger(__name__, rate_limited=True)
+
+settings = get_settings()
+
+_hot_queries = None
+# Refresh tasks in flight, kept referenced until they finish, and
+# owners whose corpus changed again while theirs was running
+_refreshes: dict[str, asyncio.Task] = {}
+_stale: set[str] = set()
+
+
+class HeavyHitters:
+    """Approximate most-frequent items with the Space-Saving algorithm.
+
+    At most ``capacity`` items are counted. A new item arriving when
+    the table is full replaces the least-counted one and inherits its
+    count plus one, so counts overestimate by at most that floor and
+    any item seen more than ``total / capacity`` times is kept.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._counts: dict[Hashable, int] = {}
+
+    def add(self, item: Hashable) -> int:
+        """Count one occurrence of ``item`` and return its count."""
+        counts = self._counts
+        if item in counts:
+            counts[item] += 1
+        elif len(counts) < self.capacity:
+            counts[item] = 1
+        else:
+            victim = min(counts, key=counts.get)
+            counts[item] = counts.pop(victim) + 1
+        return counts[item]
+
+    def top(self, n: int, min_count: int = 1) -> list[tuple[Hashable, int]]:
+        """The ``n`` most counted items seen at least ``min_count`` times."""
+        ranked = heapq.nlargest(n, self._counts.items(), key=itemgetter(1))
+        return [(item, count) for item, count in ranked if count >= min_count]
+
+
+class _HotEntry:
+    """Precomputed embedding and retrieval for one hot query."""
+
+    __slots__ = ("embedding", "results", "generation", "computed_at")
+
+    def __init__(self, embedding, results, generation: int):
+        self.embedding = embedding
+        self.results = results
+        self.generation = generation
+        self.computed_at = time.monotonic()
+
+
+class HotQueries:
+    """Frequency tracking and precomputed retrieval for recurring queries.
+
+    Unfiltered queries are counted per owner by (normalized query,
+    top_k). The current top ``HOT_QUERY_TOP_N`` of an owner keep their
+    embedding and retrieval results, so they skip both steps. Results
+    are tied to a per-owner corpus generation that uploads bump; a
+    refresh then recomputes them in the background. State is
+    per-process, so results also expire after ``HOT_QUERY_TTL_S`` to
+    pick up uploads handled by other workers.
+    """
+
+    def __init__(self, capacity: int | None = None):
+        self.capacity = capacity or settings.hot_query_capacity
+        self._lock = threading.Lock()
+        self._hitters: dict[str, HeavyHitters] = {}
+        self._entries: dict[tuple[str, str, int], _HotEntry] = {}
+        self._generations: dict[str, int] = {}
+
+    def generation(self, owner_key: str) -> int:
+        """Current corpus generation of an owner."""
+        with self._lock:
+            return self._generations.get(owner_key, 0)
+
+    def record(self, owner_key: str, query: str, top_k: int) -> int:
+        """Count one occurrence of a query and return its count."""
+        with self._lock:
+            hitters = self._hitters.get(owner_key)
+            if hitters is None:
+                hitters = self._hitters[owner_key] = HeavyHitters(
+                    self.capacity
+                )
+            return hitters.add((query, top_k))
+
+    def hot(self, owner_key: str) -> list[tuple[str, int]]:
+        """An owner's hot (query, top_k) pairs, most frequent first."""
+        with self._lock:
+            hitters = self._hitters.get(owner_key)
+            if hitters is None:
+                return []
+            ranked = hitters.top(
+                settings.hot_query_top_n, settings.hot_query_min_count
+            )
+        return [item for item, _ in ranked]
+
+    def _entry(self, owner_key: str, query: str, top_k: int) -> tuple:
+        with self._lock:
+            entry = self._entries.get((owner_key, query, top_k))
+            generation = self._generations.get(owner_key, 0)
+        if entry is None:
+            return None, None
+        fresh = (
+            entry.results is not None
+            and entry.generation == generation
+            and time.monotonic() - entry.computed_at < settings.hot_query_ttl_s
+        )
+        return entry.embedding, entry.results if fresh else None
+
+    def lookup(self, owner_key: str, query: str, top_k: int) -> tuple:
+        """Precomputed (embedding, results) for a query.
+
+        The embedding does not depend on the corpus, so it is returned
+        even when the results are stale.
+
+        Returns:
+            tuple: Embedding and (docs, metadatas), each None if absent
+        """
+        embedding, results = self._entry(owner_key, query, top_k)
+        record_cache("hot_query", results is not None)
+        return embedding, results
+
+    def offer(
+        self,
+        owner_key: str,
+        query: str,
+        top_k: int,
+        embedding,
+        results: tuple,
+        generation: int,
+    ) -> bool:
+        """Keep a computed result if the query is currently hot.
+
+        Args:
+            owner_key (str): Owner the results belong to
+            query (str): Normalized query
+            top_k (int): Number of chunks retrieved
+            embedding: Query embedding
+            results (tuple): (docs, metadatas) from retrieval
+            generation (int): Corpus generation read before retrieval
+
+        Returns:
+            bool: True if the result was kept
+        """
+        if (query, top_k) not in self.hot(owner_key):
+            return False
+        with self._lock:
+            self._entries[(owner_key, query, top_k)] = _HotEntry(
+                embedding, results, generation
+            )
+        return True
+
+    def corpus_changed(self, owner_key: str) -> None:
+        """Mark an owner's precomputed results stale."""
+        with self._lock:
+            self._generations[owner_key] = (
+                self._generations.get(owner_key, 0) + 1
+            )
+
+    def refresh(self, owner_key: str) -> int:
+        """Recompute an owner's hot queries and drop ones no longer hot.
+
+        Returns:
+            int: Number of queries precomputed
+        """
+        hot = self.hot(owner_key)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == owner_key]:
+                if key[1:] not in hot:
+                    del self._entries[key]
+        refreshed = 0
+        for query, top_k in hot:
+            generation = self.generation(owner_key)
+            embedding, results = self._entry(owner_key, query, top_k)
+            if results is not None:
+                continue
+            if embedding is None:
+                embedding = embed_query(query)
+            results = retrieve_context(embedding, top_k, owner_key)
+            if self.offer(
+                owner_key, query, top_k, embedding, results, generation
+            ):
+                refreshed += 1
+        logger.debug("Precomputed %d of %d hot queries", refreshed, len(hot))
+        return refreshed
+
+
+def get_hot_queries() -> HotQueries:
+    """Get the shared hot-query tracker."""
+    global _hot_queries
+    if _hot_queries is None:
+        _hot_queries = HotQueries()
+    return _hot_queries
+
+
+def corpus_changed(owner_key: str) -> None:
+    """Invalidate an owner's hot results and recompute them in the background.
+
+    Must be called from the event loop. Changes that arrive while a
+    refresh is running are folded into one more pass of that refresh.
+    """
+    hot_queries = get_hot_queries()
+    hot_queries.corpus_changed(owner_key)
+    if not hot_queries.hot(owner_key):
+        return
+    running = _refreshes.get(owner_key)
+    if (
+        running is not None
+        and running.get_loop() is asyncio.get_running_loop()
+    ):
+        _stale.add(owner_key)
+        return
+
+    async def run():
+        try:
+            while True:
+                _stale.discard(owner_key)
+                try:
+                    await asyncio.to_thread(hot_queries.refresh, owner_key)
+                except Exception as e:
+                    logger.warning("Hot query refresh failed: %s", e)
+                if owner_key not in _stale:
+                    break
+        finally:
+            _refreshes.pop(owner_key, None)
+
+    _refreshes[owner_key] = asyncio.ensure_future(run())
@@ -0,0 +1,254 @@
+import asyncio
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.context import expand_context
+from chroma_knowledge_search.backend.app.hot_queries import get_hot_queries
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+from chroma_knowledge_search.backend.app.models import Chunk, Document
+from chroma_knowledge_search.backend.app.schemas import QueryFilters
+
+logger = get_logger(__name__, rate_limited=True)
+
+settings = get_settings()
+
+TOKEN_RE = re.compile(r"\w+")
+# Owners whose lexical index is kept in memory at once
+MAX_INDEXES = 16
+
+_indexes: OrderedDict[str, tuple[int, float, "BM25Index"]] = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased word tokens."""
+    return TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over an owner's chunks, held in memory.
+
+    Chunks carry the same metadata keys as in the vector store, so
+    lexical hits can stand in for vector hits downstream.
+    """
+
+    def __init__(
+        self,
+        docs: list[str],
+        metadatas: list[dict],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.docs = docs
+        self.metadatas = metadatas
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._lengths = []
+        for i, text in enumerate(docs):
+            terms = Counter(tokenize(text))
+            self._lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self._postings.setdefault(term, []).append((i, tf))
+        self._avg_length = (
+            sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        )
+        self._ids = {
+            f"{m['document_id']}-{m['ordinal']}": i
+            for i, m in enumerate(metadatas)
+        }
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def search(
+        self, query: str, top_k: int, filters: QueryFilters | None = None
+    ) -> tuple[list[str], list[dict]]:
+        """Rank chunks against ``query``.
+
+        Args:
+            query (str): Query text
+            top_k (int): Number of chunks to return
+            filters (QueryFilters, optional): Filters the index can
+                evaluate (see ``supports``)
+
+        Returns:
+            tuple[list[str], list[dict]]: Chunk texts and metadata, best
+            first
+        """
+        n = len(self.docs)
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(
+                1 + (n - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for i, tf in postings:
+                norm = (
+                    1 - self.b + self.b * self._lengths[i] / self._avg_length
+                )
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / (
+                    tf + self.k1 * norm
+                )
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        hits = [i for i in ranked if self._matches(i, filters)][:top_k]
+        return [self.docs[i] for i in hits], [self.metadatas[i] for i in hits]
+
+    def _matches(self, i: int, filters: QueryFilters | None) -> bool:
+        if filters is None:
+            return True
+        meta = self.metadatas[i]
+        if (
+            filters.document_ids
+            and meta["document_id"] not in filters.document_ids
+        ):
+            return False
+        if filters.filenames and meta.get("filename") not in filters.filenames:
+            return False
+        uploaded_at = meta.get("uploaded_at")
+        if filters.uploaded_after and (
+            uploaded_at is None
+            or uploaded_at < int(filters.uploaded_after.timestamp())
+        ):
+            return False
+        if filters.uploaded_before and (
+            uploaded_at is None
+            or uploaded_at > int(filters.uploaded_before.timestamp())
+        ):
+            return False
+        if filters.pages and meta.get("page") not in filters.pages:
+            return False
+        if filters.contains and filters.contains not in self.docs[i]:
+            return False
+        return True
+
+    def get_by_ids(self, ids: list[str], owner_key: str | None = None) -> dict:
+        """Look up chunks by vector-store ID, like ``chroma_client``."""
+        found = [i for i in ids if i in self._ids]
+        return {
+            "ids": found,
+            "documents": [self.docs[self._ids[i]] for i in found],
+            "metadatas": [self.metadatas[self._ids[i]] for i in found],
+        }
+
+
+def supports(filters: QueryFilters | None) -> bool:
+    """Whether lexical search can honor ``filters``.
+
+    Content types and sections are only stored in the vector store.
+    """
+    return filters is None or not (filters.content_types or filters.section)
+
+
+async def _load_index(db: AsyncSession, owner_key: str) -> BM25Index:
+    rows = (
+        await db.execute(
+            select(
+                Chunk.document_id,
+                Chunk.ordinal,
+                Chunk.char_start,
+                Chunk.char_end,
+                Chunk.page,
+                Chunk.text,
+                Document.filename,
+                Document.uploaded_at,
+            )
+            .join(Document, Document.id == Chunk.document_id)
+            .where(Document.owner_key == owner_key)
+            .order_by(Chunk.document_id, Chunk.ordinal)
+        )
+    ).all()
+    docs, metadatas = [], []
+    for row in rows:
+        uploaded_at = row.uploaded_at
+        if uploaded_at is not None and uploaded_at.tzinfo is None:
+            # SQLite drops the zone; uploads are stored in UTC
+            uploaded_at = uploaded_at.replace(tzinfo=timezone.utc)
+        meta = {
+            "document_id": row.document_id,
+            "owner_key": owner_key,
+            "ordinal": row.ordinal,
+            "char_start": row.char_start,
+            "char_end": row.char_end,
+            "page": row.page,
+            "filename": row.filename,
+            "uploaded_at": (
+                int(uploaded_at.timestamp()) if uploaded_at else None
+            ),
+        }
+        docs.append(row.text)
+        metadatas.append({k: v for k, v in meta.items() if v is not None})
+    return await asyncio.to_thread(BM25Index, docs, metadatas)
+
+
+async def get_index(db: AsyncSession, owner_key: str) -> BM25Index:
+    """Get an owner's lexical index, rebuilding it after corpus changes.
+
+    Indexes follow the corpus generation that uploads advance, and
+    expire after ``LEXICAL_INDEX_TTL_S`` to pick up uploads handled by
+    other workers.
+    """
+    generation = get_hot_queries().generation(owner_key)
+    with _indexes_lock:
+        cached = _indexes.get(owner_key)
+        if cached is not None:
+            _indexes.move_to_end(owner_key)
+    if cached is not None:
+        cached_generation, built_at, index = cached
+        if (
+            cached_generation == generation
+            and time.monotonic() - built_at < settings.lexical_index_ttl_s
+        ):
+            return index
+    started = time.perf_counter()
+    index = await _load_index(db, owner_key)
+    logger.info(
+        "Built lexical index of %d chunks in %.2fs",
+        len(index),
+        time.perf_counter() - started,
+    )
+    with _indexes_lock:
+        _indexes[owner_key] = (generation, time.monotonic(), index)
+        _indexes.move_to_end(owner_key)
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+async def lexical_retrieve(
+    db: AsyncSession,
+    owner_key: str,
+    query: str,
+    top_k: int,
+    filters: QueryFilters | None = None,
+) -> tuple[list[str], list[dict]]:
+    """BM25 search of an owner's chunks, expanded like vector results.
+
+    Needs no embedding, so it can serve queries while the embedding
+    provider is slow or unavailable.
+
+    Args:
+        db (AsyncSession): Database session
+        owner_key (str): Owner whose chunks are searched
+        query (str): Normalized query text
+        top_k (int): Number of chunks to retrieve
+        filters (QueryFilters, optional): Filters ``supports`` accepts
+
+    Returns:
+        tuple[list[str], list[dict]]: Passages and their metadata
+    """
+    index = await get_index(db, owner_key)
+    docs, metadatas = index.search(query, top_k, filters)
+    return expand_context(
+        docs, metadatas, owner_key=owner_key, fetch=index.get_by_ids
+    )
@@ -1,16 +1,203 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+import time
+from contextvars import ContextVar
 
+from chroma_knowledge_search.backend.app.config import (
+    Settings,
+    get_settings,
+    on_reload,
+)
 
-def setup_logging(level: str = "INFO") -> None:
-    """Configure logging for the application."""
+settings = get_settings()
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None))
+) | {"message", "asctime", "request_id", "suppressed"}
+
+_listener = None
+_rate_filters: list["RateLimitFilter"] = []
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp each record with the request ID of the current context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Token-bucket rate limit per message template.
+
+    Hot-path loggers emit the same few messages for every request; once a
+    template exceeds ``rate`` records per second (after a ``burst``), the
+    excess is dropped and the count of dropped records is attached to the
+    next one let through as ``suppressed``. ERROR and above always pass.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR or self.rate <= 0:
+            return True
+        key = (record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                # [tokens, last refill, suppressed since last emit]
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            bucket[0] = min(
+                self.burst, bucket[0] + (now - bucket[1]) * self.rate
+            )
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that defers formatting to the listener thread.
+
+    The stock handler formats the whole message in the calling thread;
+    this one only merges the arguments so the record can cross threads,
+    and leaves layout to the listener's formatter.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: str | None = None, fmt: str | None = None) -> None:
+    """Configure logging for the application.
+
+    Records are put on a queue by the calling thread and written to
+    stdout by a background listener, so slow writes never block the
+    event loop.
+
+    Args:
+        level (str, optional): Root log level; defaults to LOG_LEVEL
+        fmt (str, optional): ``json`` for structured output, ``text`` for
+            the classic single-line format; defaults to LOG_FORMAT
+    """
+    global _listener
+    shutdown_logging()
+    level = level or settings.log_level
+    fmt = fmt or settings.log_format
+
+    stream = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(
+            logging.Formatter(
+                "%(asctime)s - %(name)s - %(levelname)s - "
+                "[%(request_id)s] %(message)s"
+            )
+        )
+
+    log_queue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(RequestContextFilter())
     logging.basicConfig(
         level=getattr(logging, level.upper()),
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[logging.StreamHandler(sys.stdout)],
+        handlers=[handler],
+        force=True,
+    )
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream, respect_handler_level=True
     )
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def get_logger(name: str, rate_limited: bool = False) -> logging.Logger:
+    """Get a logger instance.
+
+    Args:
+        name (str): Logger name
+        rate_limited (bool): Cap repeated messages at LOG_RATE_LIMIT per
+            second per template; meant for per-request hot paths
+
+    Returns:
+        logging.Logger: The logger
+    """
+    logger = logging.getLogger(name)
+    if rate_limited and not any(
+        isinstance(f, RateLimitFilter) for f in logger.filters
+    ):
+        rate_filter = RateLimitFilter(
+            settings.log_rate_limit, settings.log_rate_burst
+        )
+        _rate_filters.append(rate_filter)
+        logger.addFilter(rate_filter)
+    return logger
 
 
-def get_logger(name: str) -> logging.Logger:
-    """Get a logger instance."""
-    return logging.getLogger(name)
+@on_reload
+def _apply_log_settings(settings: Settings) -> None:
+    logging.getLogger().setLevel(settings.log_level.upper())
+    for rate_filter in _rate_filters:
+        rate_filter.rate = settings.log_rate_limit
+        rate_filter.burst = settings.log_rate_burst
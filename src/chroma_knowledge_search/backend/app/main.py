@@ -1,33 +1,117 @@
+import asyncio
+import math
+import signal
+import time
+import uuid
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from pydantic import ValidationError
 
 from chroma_knowledge_search.backend.app.config import (
-    load_config,
     get_allow_origins,
+    get_settings,
+    reload_settings,
 )
 
 from chroma_knowledge_search.backend.app.api import router as api_router
+from chroma_knowledge_search.backend.app.auth import owner_key_for
+from chroma_knowledge_search.backend.app.chroma_client import (
+    EmbeddingMismatchError,
+    get_or_create_collection,
+    max_batch_size,
+)
+from chroma_knowledge_search.backend.app.chroma_writer import (
+    get_chroma_writer,
+)
 from chroma_knowledge_search.backend.app.db import init_db
+from chroma_knowledge_search.backend.app.embeddings import (
+    LocalEmbeddingProvider,
+    get_provider,
+)
+from chroma_knowledge_search.backend.app.group_commit import get_writer
 from chroma_knowledge_search.backend.app.logging_config import (
     get_logger,
+    request_id_var,
     setup_logging,
 )
+from chroma_knowledge_search.backend.app.quotas import (
+    QuotaExceeded,
+    admit,
+    off_loop,
+    release,
+)
+from chroma_knowledge_search.backend.app.ratelimit import (
+    RateLimitExceeded,
+    get_openai_client,
+)
+from chroma_knowledge_search.backend.app.metrics import (
+    CONTENT_TYPE,
+    REQUEST_LATENCY,
+    REQUESTS_IN_FLIGHT,
+    render,
+)
+from chroma_knowledge_search.backend.app.tracing import (
+    current_trace_id,
+    request_span,
+    set_attributes,
+)
+from chroma_knowledge_search.backend.app.utils import load_parsers
 
 setup_logging()
 logger = get_logger(__name__)
 
-load_config()
+settings = get_settings()
 allow_origins = get_allow_origins()
 
 
+def _prewarm() -> None:
+    """Build clients and load models so the first request does not."""
+    started = time.perf_counter()
+    get_openai_client()
+    get_or_create_collection()
+    max_batch_size()
+    provider = get_provider()
+    if isinstance(provider, LocalEmbeddingProvider):
+        provider.embed(["warm-up"])
+    load_parsers()
+    logger.info("Pre-warmed in %.2fs", time.perf_counter() - started)
+
+
+def _reload_on_sighup() -> None:
+    """Apply reloadable settings from SETTINGS_RELOAD_FILE."""
+    try:
+        changed = reload_settings()
+    except ValidationError as e:
+        logger.error("Settings reload rejected, keeping current: %s", e)
+        return
+    logger.info(
+        "Reloaded settings: %s",
+        {name: new for name, (_, new) in changed.items()} or "no changes",
+    )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting application")
     await init_db()
     logger.info("Database initialized")
+    if settings.prewarm:
+        await asyncio.to_thread(_prewarm)
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGHUP, _reload_on_sighup)
+        sighup = True
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+        # No SIGHUP on Windows, and only the main thread can take signals
+        sighup = False
     yield
+    if sighup:
+        loop.remove_signal_handler(signal.SIGHUP)
+    await get_chroma_writer().close()
+    await get_writer().close()
     logger.info("Shutting down application")
 
 
@@ -44,6 +128,114 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api")
 
 
+@app.middleware("http")
+async def enforce_quotas(request: Request, call_next):
+    """Apply per-key quotas from the headers alone.
+
+    Runs before the body is read, so an over-limit client is turned
+    away without streaming its upload. Requests without a valid key
+    pass through to be rejected by authentication.
+    """
+    owner_key = await owner_key_for(request.headers.get("x-api-key"))
+    if owner_key is None or not request.url.path.startswith("/api/"):
+        return await call_next(request)
+    length = request.headers.get("content-length")
+    try:
+        lease = await off_loop(
+            admit,
+            owner_key,
+            int(length) if length and length.isdigit() else None,
+            is_upload=request.method == "POST"
+            and request.url.path == "/api/upload",
+        )
+    except QuotaExceeded as exc:
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.detail},
+            headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+        )
+    try:
+        return await call_next(request)
+    finally:
+        await off_loop(release, owner_key, lease)
+
+
+@app.middleware("http")
+async def bind_request_id(request: Request, call_next):
+    """Tag every log record of a request with its request ID.
+
+    Reuses an incoming X-Request-ID header when present so IDs line up
+    with upstream proxies, and echoes the ID back in the response.
+    """
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Wrap each request in a server span and return its trace ID."""
+    with request_span(
+        f"{request.method} {request.url.path}",
+        request.headers,
+        {"http.method": request.method, "http.target": request.url.path},
+    ):
+        response = await call_next(request)
+        route = request.scope.get("route")
+        set_attributes(
+            {
+                "http.route": getattr(route, "path", None),
+                "http.status_code": response.status_code,
+            }
+        )
+        trace_id = current_trace_id()
+        if trace_id:
+            response.headers["X-Trace-Id"] = trace_id
+        return response
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record in-flight count and latency for every HTTP request."""
+    REQUESTS_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        ).observe(time.perf_counter() - started)
+
+
+@app.exception_handler(EmbeddingMismatchError)
+async def embedding_mismatch(request: Request, exc: EmbeddingMismatchError):
+    """Report a provider/collection mismatch as a conflict."""
+    logger.error("%s", exc)
+    return JSONResponse(status_code=409, content={"detail": str(exc)})
+
+
+@app.exception_handler(RateLimitExceeded)
+async def upstream_saturated(request: Request, exc: RateLimitExceeded):
+    """Shed load quickly when OpenAI capacity is exhausted."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint.
@@ -55,6 +247,16 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint.
+
+    Returns:
+        Response: Metrics in the Prometheus text exposition format
+    """
+    return Response(content=render(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     import os
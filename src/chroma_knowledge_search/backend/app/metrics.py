@@ -0,0 +1,434 @@
+import functools
+import inspect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+
+from chroma_knowledge_search.backend.app import tracing
+
+NAMESPACE = "knowledge_search"
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Registry:
+    """Collection of metrics rendered together on ``/metrics``."""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric) -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        registry: Registry = REGISTRY,
+    ):
+        self.name = f"{NAMESPACE}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def labels(self, **labels):
+        """Get the child metric for one combination of label values."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _unlabelled(self):
+        return self.labels()
+
+    @abstractmethod
+    def _new_child(self):
+        """Create the child holding one label combination's value."""
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            children = list(self._children.items())
+        lines = []
+        for key, child in children:
+            lines.extend(child.samples(self.name, self.labelnames, key))
+        return lines
+
+
+class _ValueChild:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def get(self) -> float:
+        return self._value
+
+    def samples(self, name, labelnames, key) -> list[str]:
+        labels = _format_labels(labelnames, key)
+        return [f"{name}{labels} {_format_value(self._value)}"]
+
+
+class _GaugeChild(_ValueChild):
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def samples(self, name, labelnames, key) -> list[str]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        lines = []
+        cumulative = 0
+        bounds = self._buckets + (math.inf,)
+        for bound, count in zip(bounds, counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            labels = _format_labels(labelnames, key, le)
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _format_labels(labelnames, key)
+        lines.append(f"{name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self._unlabelled().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self._unlabelled().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._unlabelled().set(value)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: tuple = DEFAULT_BUCKETS, **kwargs):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(*args, **kwargs)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled().observe(value)
+
+
+STAGE_LATENCY = Histogram(
+    "stage_duration_seconds",
+    "Latency of pipeline stages",
+    ("stage",),
+)
+STAGE_IN_FLIGHT = Gauge(
+    "stage_in_flight",
+    "Pipeline stage executions currently running",
+    ("stage",),
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+)
+TOKENS = Counter(
+    "tokens_total",
+    "OpenAI tokens consumed",
+    ("kind",),
+)
+CHUNKS = Counter(
+    "chunks_indexed_total",
+    "Chunks written to the vector store",
+)
+UPLOADS = Counter(
+    "uploads_total",
+    "Documents uploaded",
+    ("content_type",),
+)
+UPLOAD_BYTES = Counter(
+    "upload_bytes_total",
+    "Bytes of uploaded documents",
+    ("content_type",),
+)
+CACHE_HITS = Counter(
+    "cache_hits_total",
+    "Cache lookups served from cache",
+    ("cache",),
+)
+CACHE_MISSES = Counter(
+    "cache_misses_total",
+    "Cache lookups that missed",
+    ("cache",),
+)
+RETRIES = Counter(
+    "retries_total",
+    "Retried upstream calls",
+    ("operation",),
+)
+COALESCED = Counter(
+    "coalesced_calls_total",
+    "Calls that joined an identical in-flight computation",
+    ("stage",),
+)
+CONCURRENCY_LIMIT = Gauge(
+    "upstream_concurrency_limit",
+    "Adaptive concurrency limit for upstream API calls",
+    ("api",),
+)
+QUEUE_WAIT = Histogram(
+    "upstream_queue_wait_seconds",
+    "Time upstream calls waited for admission",
+    ("api",),
+)
+THROTTLED = Counter(
+    "upstream_throttled_total",
+    "Upstream calls shed locally or rate limited by the API",
+    ("api", "reason"),
+)
+QUOTA_REJECTIONS = Counter(
+    "quota_rejections_total",
+    "Requests refused by per-key quotas",
+    ("reason",),
+)
+RETRIEVALS = Counter(
+    "retrievals_total",
+    "Query retrievals by the path that served them",
+    ("path",),
+)
+DB_COMMIT_ROWS = Histogram(
+    "db_group_commit_rows",
+    "Metadata writes committed together in one transaction",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+CHROMA_WRITE_ROWS = Histogram(
+    "chroma_write_batch_rows",
+    "Chunks sent to the vector store in one add",
+    buckets=(1, 8, 32, 128, 512, 1024, 2048, 4096, 8192),
+)
+CHROMA_WRITE_QUEUE = Gauge(
+    "chroma_write_queue_depth",
+    "Vector-store adds waiting for the shared writer",
+)
+
+
+_STAGE_CHILDREN = {}
+
+
+def _stage_children(stage: str) -> tuple:
+    """Latency and in-flight children for a stage, looked up once."""
+    children = _STAGE_CHILDREN.get(stage)
+    if children is None:
+        children = (
+            STAGE_LATENCY.labels(stage=stage),
+            STAGE_IN_FLIGHT.labels(stage=stage),
+        )
+        _STAGE_CHILDREN[stage] = children
+    return children
+
+
+class _StageTimer:
+    """Context manager and decorator recording one stage's latency.
+
+    Each timed stage is also wrapped in a tracing span of the same name.
+    """
+
+    __slots__ = ("stage", "_latency", "_in_flight", "_started", "_span")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._latency, self._in_flight = _stage_children(stage)
+
+    def __enter__(self):
+        self._in_flight.inc()
+        self._span = tracing.span(self.stage)
+        self._span.__enter__()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._started
+        self._span.__exit__(exc_type, exc, tb)
+        self._latency.observe(elapsed)
+        self._in_flight.dec()
+        return False
+
+    def __call__(self, fn):
+        stage = self.stage
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with _StageTimer(stage):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _StageTimer(stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+
+def timed(stage: str) -> _StageTimer:
+    """Time a pipeline stage, as ``with timed(...)`` or ``@timed(...)``.
+
+    Args:
+        stage (str): Stage name used as the ``stage`` label
+
+    Returns:
+        _StageTimer: Context manager that also works as a decorator
+    """
+    return _StageTimer(stage)
+
+
+def record_tokens(kind: str, usage) -> None:
+    """Count tokens from an OpenAI ``usage`` object, if present.
+
+    The counts are also added to the current span as ``tokens.*``.
+
+    Args:
+        kind (str): Call type, e.g. ``embedding`` or ``chat``
+        usage: ``resp.usage`` from an OpenAI response
+    """
+    for field in ("prompt_tokens", "completion_tokens"):
+        value = getattr(usage, field, None)
+        if isinstance(value, int) and value:
+            name = f"{kind}_{field.split('_')[0]}"
+            TOKENS.labels(kind=name).inc(value)
+            tracing.set_attributes({f"tokens.{name}": value})
+
+
+def count_retry(operation: str):
+    """Build a tenacity ``before_sleep`` hook counting retries.
+
+    Args:
+        operation (str): Operation name used as the ``operation`` label
+
+    Returns:
+        Callable: Hook for ``retry(before_sleep=...)``
+    """
+
+    def hook(retry_state) -> None:
+        RETRIES.labels(operation=operation).inc()
+
+    return hook
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count one lookup against a named cache and tag the current span."""
+    (CACHE_HITS if hit else CACHE_MISSES).labels(cache=cache).inc()
+    tracing.set_attributes({f"cache.{cache}.hit": hit})
+
+
+def render() -> str:
+    """Render the default registry for the ``/metrics`` endpoint."""
+    return REGISTRY.render()
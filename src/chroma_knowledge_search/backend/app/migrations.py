@@ -0,0 +1,149 @@
+from collections.abc import Callable
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    DateTime,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    func,
+    insert,
+    select,
+    text,
+)
+
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Arbitrary key for the Postgres advisory lock held while migrating
+MIGRATION_LOCK_ID = 0x636B73
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def _v1_initial(conn: Connection) -> None:
+    # Frozen copy of the schema that create_all used to build, so
+    # databases from before migrations are adopted unchanged
+    metadata = MetaData()
+    Table(
+        "documents",
+        metadata,
+        Column("id", String, primary_key=True, index=True),
+        Column("owner_key", String, index=True, nullable=False),
+        Column("filename", String, nullable=False),
+        Column(
+            "uploaded_at", DateTime(timezone=True), server_default=func.now()
+        ),
+        Column("text_preview", Text, nullable=True),
+    )
+    Table(
+        "api_keys",
+        metadata,
+        Column("id", String, primary_key=True),
+        Column("owner_key", String, index=True, nullable=False),
+        Column("name", String, nullable=True),
+        Column("salt", String, nullable=False),
+        Column("key_hash", String, nullable=False),
+        Column(
+            "created_at", DateTime(timezone=True), server_default=func.now()
+        ),
+        Column("revoked_at", DateTime(timezone=True), nullable=True),
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+def _v2_chunks(conn: Connection) -> None:
+    metadata = MetaData()
+    Table("documents", metadata, Column("id", String, primary_key=True))
+    Table(
+        "chunks",
+        metadata,
+        Column(
+            "document_id",
+            String,
+            ForeignKey("documents.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        Column("ordinal", Integer, primary_key=True),
+        Column("char_start", Integer, nullable=False),
+        Column("char_end", Integer, nullable=False),
+        Column("page", Integer, nullable=True),
+        Column("token_count", Integer, nullable=False),
+        Column("content_hash", String, nullable=False),
+        Column("text", Text, nullable=False),
+    )
+    metadata.tables["chunks"].create(conn, checkfirst=True)
+
+
+def _v3_uploads(conn: Connection) -> None:
+    metadata = MetaData()
+    Table(
+        "uploads",
+        metadata,
+        Column("owner_key", String, primary_key=True),
+        Column("idempotency_key", String, primary_key=True),
+        Column("document_id", String, unique=True, nullable=False),
+        Column("content_hash", String, nullable=False),
+        Column("filename", String, nullable=False),
+        Column("uploaded_at", DateTime(timezone=True), nullable=False),
+        Column("chunk_size", Integer, nullable=False),
+        Column("chunk_overlap", Integer, nullable=False),
+        Column("chunks_total", Integer, nullable=True),
+        Column("chunks_done", Integer, nullable=False),
+        Column("completed_at", DateTime(timezone=True), nullable=True),
+    )
+    metadata.tables["uploads"].create(conn, checkfirst=True)
+
+
+# (version, description, upgrade); append only, never edit a released one
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "documents and api_keys tables", _v1_initial),
+    (2, "chunks table", _v2_chunks),
+    (3, "uploads table", _v3_uploads),
+]
+
+
+def migrate(conn: Connection) -> list[int]:
+    """Apply pending migrations inside the caller's transaction.
+
+    Postgres serializes concurrent workers with an advisory lock; on
+    SQLite the first write takes the database lock, and a worker that
+    loses the race fails and retries (see ``db.init_db``).
+
+    Args:
+        conn (Connection): Connection with an open transaction
+
+    Returns:
+        list[int]: Versions applied by this call
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"),
+            {"key": MIGRATION_LOCK_ID},
+        )
+    schema_migrations.create(conn, checkfirst=True)
+    applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+    newly_applied = []
+    for version, description, upgrade in MIGRATIONS:
+        if version in applied:
+            continue
+        logger.info("Applying migration %d: %s", version, description)
+        upgrade(conn)
+        conn.execute(
+            insert(schema_migrations).values(
+                version=version, description=description
+            )
+        )
+        newly_applied.append(version)
+    return newly_applied
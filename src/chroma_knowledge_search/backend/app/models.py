@@ -1,4 +1,12 @@
-from sqlalchemy import Column, DateTime, String, Text, func
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -13,3 +21,48 @@ class Document(Base):
     filename = Column(String, nullable=False)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
     text_preview = Column(Text, nullable=True)
+
+
+class ApiKey(Base):
+    __tablename__ = "api_keys"
+    # Public half of the key, so lookups never need the secret
+    id = Column(String, primary_key=True)
+    owner_key = Column(String, index=True, nullable=False)
+    name = Column(String, nullable=True)
+    salt = Column(String, nullable=False)
+    key_hash = Column(String, nullable=False)  # hex HMAC-SHA256 of secret
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class Chunk(Base):
+    __tablename__ = "chunks"
+    # (document_id, ordinal) orders a document's chunks for range scans
+    document_id = Column(
+        String,
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    ordinal = Column(Integer, primary_key=True)
+    char_start = Column(Integer, nullable=False)
+    char_end = Column(Integer, nullable=False)
+    page = Column(Integer, nullable=True)
+    token_count = Column(Integer, nullable=False)
+    content_hash = Column(String, nullable=False)  # hex sha256 of text
+    text = Column(Text, nullable=False)
+
+
+class Upload(Base):
+    __tablename__ = "uploads"
+    # Checkpoint of an upload sent with an Idempotency-Key header
+    owner_key = Column(String, primary_key=True)
+    idempotency_key = Column(String, primary_key=True)
+    document_id = Column(String, unique=True, nullable=False)
+    content_hash = Column(String, nullable=False)  # hex sha256 of file
+    filename = Column(String, nullable=False)
+    uploaded_at = Column(DateTime(timezone=True), nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    chunk_overlap = Column(Integer, nullable=False)
+    chunks_total = Column(Integer, nullable=True)
+    chunks_done = Column(Integer, nullable=False, default=0)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
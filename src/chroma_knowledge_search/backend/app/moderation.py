@@ -1,12 +1,237 @@
-import os
-from openai import OpenAI
-from chroma_knowledge_search.backend.app.config import load_config
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 
-load_config()
+from chroma_knowledge_search.backend.app.config import (
+    Settings,
+    get_settings,
+    on_reload,
+)
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+from chroma_knowledge_search.backend.app.metrics import record_cache, timed
+from chroma_knowledge_search.backend.app.ratelimit import (
+    estimate_tokens,
+    get_limiter,
+    get_openai_client,
+    retry_on_429,
+)
+from chroma_knowledge_search.backend.app.tracing import set_attributes
 
-openai_api_key = os.getenv("OPENAI_API_KEY")
+logger = get_logger(__name__, rate_limited=True)
 
-client = OpenAI(api_key=openai_api_key)
+settings = get_settings()
+
+# Set to override the shared OpenAI client
+client = None
+
+_service = None
+
+
+class _PendingCheck:
+    """A text waiting for the next coalesced moderation call."""
+
+    __slots__ = ("text", "key", "flagged", "error", "done")
+
+    def __init__(self, text: str, key: str):
+        self.text = text
+        self.key = key
+        self.flagged = False
+        self.error = None
+        self.done = threading.Event()
+
+
+class ModerationService:
+    """Moderation checks with a TTL cache and coalesced API calls.
+
+    Results are cached under a SHA-256 of (model, text). Cache misses
+    from concurrent callers are queued; the first caller waits a short
+    window for others to join, then sends everything queued as one
+    list-input ``moderations.create`` call.
+    """
+
+    def __init__(
+        self,
+        model: str | None = None,
+        ttl: float | None = None,
+        max_size: int | None = None,
+        window_ms: float | None = None,
+        max_batch: int | None = None,
+    ):
+        self.model = model or settings.openai_moderation_model
+        self.ttl = settings.moderation_cache_ttl if ttl is None else ttl
+        self.max_size = (
+            settings.moderation_cache_size if max_size is None else max_size
+        )
+        if window_ms is None:
+            window_ms = settings.moderation_batch_window_ms
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch or settings.moderation_max_batch)
+        self._cache: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: list[_PendingCheck] = []
+        self._flushing = False
+        self._stats = {
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "api_calls": 0,
+            "api_inputs": 0,
+        }
+
+    def _key(self, text: str) -> str:
+        raw = f"{self.model}\x00{text}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def _cache_get(self, key: str) -> bool | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, flagged = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return flagged
+
+    def _cache_put(self, key: str, flagged: bool) -> None:
+        self._cache[key] = (time.monotonic() + self.ttl, flagged)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Snapshot of cache and API call counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cache_size"] = len(self._cache)
+        lookups = stats["cache_hits"] + stats["cache_misses"]
+        stats["cache_hit_ratio"] = (
+            stats["cache_hits"] / lookups if lookups else 0.0
+        )
+        return stats
+
+    def check(self, text: str) -> bool:
+        """Check whether one text is flagged.
+
+        Args:
+            text (str): Text to moderate
+
+        Returns:
+            bool: True if content is flagged as unsafe
+        """
+        return self.check_many([text])[0]
+
+    @timed("moderate")
+    def check_many(self, texts: list[str]) -> list[bool]:
+        """Check several texts, serving repeats from the cache.
+
+        Args:
+            texts (list[str]): Texts to moderate
+
+        Returns:
+            list[bool]: Flag results aligned with texts
+        """
+        set_attributes({"moderation.inputs": len(texts)})
+        results: list[bool | None] = [None] * len(texts)
+        waiting: list[tuple[int, _PendingCheck]] = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = self._key(text)
+                cached = self._cache_get(key)
+                record_cache("moderation", cached is not None)
+                if cached is not None:
+                    self._stats["cache_hits"] += 1
+                    results[i] = cached
+                    continue
+                self._stats["cache_misses"] += 1
+                pending = _PendingCheck(text, key)
+                self._pending.append(pending)
+                waiting.append((i, pending))
+            lead = bool(waiting) and not self._flushing
+            if lead:
+                self._flushing = True
+
+        if lead:
+            if self.window > 0:
+                # Give concurrent callers a moment to join this batch
+                time.sleep(self.window)
+            self._drain()
+
+        for i, pending in waiting:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            results[i] = pending.flagged
+        return results
+
+    def _drain(self) -> None:
+        """Send queued checks in batches until the queue is empty."""
+        while True:
+            with self._lock:
+                batch = self._pending[: self.max_batch]
+                del self._pending[: self.max_batch]
+                if not batch:
+                    self._flushing = False
+                    return
+            self._flush(batch)
+
+    def _flush(self, batch: list[_PendingCheck]) -> None:
+        # Identical texts in one batch are only sent once
+        unique = list(dict.fromkeys(p.text for p in batch))
+        try:
+            mod = _create_moderation(self.model, unique)
+            results = getattr(mod, "results", None) or []
+            flags = {
+                text: (
+                    bool(getattr(results[i], "flagged", False))
+                    if i < len(results)
+                    else False
+                )
+                for i, text in enumerate(unique)
+            }
+        except Exception as e:
+            logger.warning("Moderation call failed for %d inputs", len(unique))
+            for pending in batch:
+                pending.error = e
+                pending.done.set()
+            return
+
+        with self._lock:
+            self._stats["api_calls"] += 1
+            self._stats["api_inputs"] += len(unique)
+            for pending in batch:
+                pending.flagged = flags[pending.text]
+                self._cache_put(pending.key, pending.flagged)
+        for pending in batch:
+            pending.done.set()
+        logger.debug("Moderated %d inputs in one call", len(unique))
+
+
+@retry_on_429("moderate")
+def _create_moderation(model: str, texts: list[str]):
+    with get_limiter("moderation").slot(estimate_tokens(texts)):
+        return (client or get_openai_client()).moderations.create(
+            model=model, input=texts
+        )
+
+
+def get_moderation_service() -> ModerationService:
+    """Get the shared moderation service instance."""
+    global _service
+    if _service is None:
+        _service = ModerationService()
+    return _service
+
+
+@on_reload
+def _apply_moderation_settings(settings: Settings) -> None:
+    service = _service
+    if service is not None:
+        with service._lock:
+            service.ttl = settings.moderation_cache_ttl
+            service.max_size = settings.moderation_cache_size
+            service.window = settings.moderation_batch_window_ms / 1000
+            service.max_batch = settings.moderation_max_batch
 
 
 def is_flagged(text: str) -> bool:
@@ -18,10 +243,16 @@ def is_flagged(text: str) -> bool:
     Returns:
         bool: True if content is flagged as unsafe, False otherwise
     """
+    return get_moderation_service().check(text)
+
+
+def is_flagged_many(texts: list[str]) -> list[bool]:
+    """Check several texts against OpenAI's usage policies.
 
-    mod = client.moderations.create(model="omni-moderation-latest", input=text)
-    result = getattr(mod, "results", None)
-    if result and len(result) > 0:
-        flagged = getattr(result[0], "flagged", False)
-        return bool(flagged)
-    return False
+    Args:
+        texts (list[str]): Texts to moderate
+
+    Returns:
+        list[bool]: True for each text flagged as unsafe
+    """
+    return get_moderation_service().check_many(texts)
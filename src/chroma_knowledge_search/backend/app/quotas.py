@@ -0,0 +1,297 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import uuid
+
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+from chroma_knowledge_search.backend.app.metrics import QUOTA_REJECTIONS
+from chroma_knowledge_search.backend.app.ratelimit import TokenBucket
+
+logger = get_logger(__name__, rate_limited=True)
+
+settings = get_settings()
+# Leases outlive a crashed worker by at most this long
+UPLOAD_LEASE_SECONDS = 600
+# Multipart boundaries and headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+_store = None
+
+
+class QuotaExceeded(Exception):
+    """A request was refused by the per-key quotas."""
+
+    def __init__(
+        self, status_code: int, detail: str, retry_after: float = 1.0
+    ):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class MemoryQuotaStore:
+    """Per-process quota state; enough for a single worker."""
+
+    # Only takes a lock, so callers need not leave the event loop
+    blocking = False
+
+    def __init__(self):
+        self._buckets: dict[tuple, TokenBucket] = {}
+        self._leases: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(
+        self, key: str, name: str, amount: float, rate: float, capacity: float
+    ) -> float:
+        """Take ``amount`` from a bucket.
+
+        Returns:
+            float: 0 if granted, otherwise seconds until it would be
+        """
+        with self._lock:
+            bucket = self._buckets.get((key, name))
+            if bucket is None:
+                bucket = self._buckets[(key, name)] = TokenBucket(
+                    rate, capacity
+                )
+            # Limits may have been reloaded since the bucket was created
+            bucket.rate, bucket.capacity = rate, max(1.0, capacity)
+            # Read after creation so a new bucket never refills backwards
+            now = time.monotonic()
+            wait = bucket.wait_time(amount, now)
+            if wait <= 0:
+                bucket.take(amount, now)
+            return wait
+
+    def acquire_slot(self, key: str, limit: int) -> str | None:
+        """Lease one of ``limit`` concurrent slots, or None if all taken."""
+        now = time.monotonic()
+        with self._lock:
+            leases = self._leases.setdefault(key, {})
+            for lease, expires in list(leases.items()):
+                if expires <= now:
+                    del leases[lease]
+            if len(leases) >= limit:
+                return None
+            lease = uuid.uuid4().hex
+            leases[lease] = now + UPLOAD_LEASE_SECONDS
+            return lease
+
+    def release_slot(self, key: str, lease: str) -> None:
+        with self._lock:
+            self._leases.get(key, {}).pop(lease, None)
+
+
+class SQLiteQuotaStore:
+    """Quota state shared by every worker through one SQLite file.
+
+    Each operation is a short ``BEGIN IMMEDIATE`` transaction, so
+    concurrent workers see a consistent bucket. Upload slots are leases
+    with an expiry, so a crashed worker cannot hold them forever.
+    """
+
+    # Waits up to the busy timeout for other workers' transactions
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS quota_buckets (
+                    key TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (key, name)
+                );
+                CREATE TABLE IF NOT EXISTS quota_leases (
+                    lease TEXT PRIMARY KEY,
+                    key TEXT NOT NULL,
+                    expires REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_quota_leases_key
+                    ON quota_leases (key);
+                """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, fn):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def take(
+        self, key: str, name: str, amount: float, rate: float, capacity: float
+    ) -> float:
+        # Wall-clock time, since monotonic clocks differ between processes
+        now = time.time()
+        capacity = max(1.0, capacity)
+        amount = min(amount, capacity)
+
+        def update(conn):
+            row = conn.execute(
+                "SELECT tokens, updated FROM quota_buckets "
+                "WHERE key = ? AND name = ?",
+                (key, name),
+            ).fetchone()
+            tokens = capacity
+            if row is not None:
+                tokens = min(capacity, row[0] + (now - row[1]) * rate)
+            if tokens < amount:
+                return (amount - tokens) / rate if rate > 0 else 0.0
+            conn.execute(
+                "INSERT OR REPLACE INTO quota_buckets VALUES (?, ?, ?, ?)",
+                (key, name, tokens - amount, now),
+            )
+            return 0.0
+
+        return self._transaction(update)
+
+    def acquire_slot(self, key: str, limit: int) -> str | None:
+        now = time.time()
+
+        def lease(conn):
+            conn.execute(
+                "DELETE FROM quota_leases WHERE key = ? AND expires <= ?",
+                (key, now),
+            )
+            (held,) = conn.execute(
+                "SELECT COUNT(*) FROM quota_leases WHERE key = ?", (key,)
+            ).fetchone()
+            if held >= limit:
+                return None
+            lease_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO quota_leases VALUES (?, ?, ?)",
+                (lease_id, key, now + UPLOAD_LEASE_SECONDS),
+            )
+            return lease_id
+
+        return self._transaction(lease)
+
+    def release_slot(self, key: str, lease: str) -> None:
+        self._connect().execute(
+            "DELETE FROM quota_leases WHERE lease = ?", (lease,)
+        )
+
+
+def get_quota_store():
+    """Get the quota store selected by QUOTA_STORE."""
+    global _store
+    if _store is None:
+        if settings.quota_store == "sqlite":
+            logger.info(
+                "Using SQLite quota store at %s", settings.quota_db_path
+            )
+            _store = SQLiteQuotaStore(settings.quota_db_path)
+        else:
+            _store = MemoryQuotaStore()
+    return _store
+
+
+async def off_loop(fn, *args, **kwargs):
+    """Call ``admit`` or ``release`` from async code.
+
+    Stores that do blocking I/O are called in a worker thread, so a
+    worker waiting on the shared SQLite lock does not stall the event
+    loop; the in-memory store is called directly.
+
+    Args:
+        fn (Callable): Quota function to call
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+
+    Returns:
+        Any: What fn returned
+    """
+    if get_quota_store().blocking:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+def _reject(status_code: int, reason: str, detail: str, retry_after=1.0):
+    QUOTA_REJECTIONS.labels(reason=reason).inc()
+    raise QuotaExceeded(status_code, detail, retry_after)
+
+
+def admit(
+    owner_key: str, content_length: int | None, is_upload: bool
+) -> str | None:
+    """Apply per-key quotas to a request before its body is read.
+
+    Every request takes one token from the key's request bucket.
+    Uploads must declare their size, take one of the key's
+    concurrent-upload slots and are charged their size against the
+    key's upload byte budget. A limit of 0 disables that check.
+
+    Args:
+        owner_key (str): Owner hash of the caller's API key
+        content_length (int | None): Declared body size
+        is_upload (bool): Whether this is a document upload
+
+    Returns:
+        str | None: Upload slot lease to pass to :func:`release`
+
+    Raises:
+        QuotaExceeded: If the request is over any limit
+    """
+    store = get_quota_store()
+    rpm = settings.api_key_rpm
+    if rpm > 0:
+        wait = store.take(
+            owner_key, "requests", 1, rpm / 60, settings.api_key_burst
+        )
+        if wait > 0:
+            _reject(429, "requests", "Request rate limit exceeded", wait)
+    if not is_upload:
+        return None
+
+    max_bytes = settings.max_file_size_mb * 1024 * 1024
+    if content_length is None:
+        _reject(411, "length", "Content-Length required for uploads")
+    if content_length > max_bytes + MULTIPART_OVERHEAD:
+        _reject(413, "size", "File too large")
+
+    lease = None
+    slots = settings.api_key_max_concurrent_uploads
+    if slots > 0:
+        lease = store.acquire_slot(owner_key, slots)
+        if lease is None:
+            _reject(429, "concurrency", "Too many concurrent uploads")
+
+    if settings.api_key_upload_mb_per_min > 0:
+        budget = settings.api_key_upload_mb_per_min * 1024 * 1024
+        # A single maximum-size file must always fit in the bucket
+        wait = store.take(
+            owner_key,
+            "upload_bytes",
+            content_length,
+            budget / 60,
+            max(budget, max_bytes),
+        )
+        if wait > 0:
+            release(owner_key, lease)
+            _reject(429, "upload_bytes", "Upload volume limit exceeded", wait)
+    return lease
+
+
+def release(owner_key: str, lease: str | None) -> None:
+    """Return an upload slot taken by :func:`admit`."""
+    if lease is not None:
+        get_quota_store().release_slot(owner_key, lease)
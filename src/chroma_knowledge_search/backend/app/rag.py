@@ -1,16 +1,30 @@
-import os
-from openai import OpenAI
+import sqlite3
 
+from chroma_knowledge_search.backend.app.generation_cache import (
+    fingerprint,
+    get_generation_cache,
+)
 from chroma_knowledge_search.backend.app.logging_config import get_logger
+from chroma_knowledge_search.backend.app.metrics import (
+    record_cache,
+    record_tokens,
+    timed,
+)
+from chroma_knowledge_search.backend.app.tracing import set_attributes
 from chroma_knowledge_search.backend.app.moderation import is_flagged
-from chroma_knowledge_search.backend.app.config import load_config
+from chroma_knowledge_search.backend.app.ratelimit import (
+    estimate_tokens,
+    get_limiter,
+    get_openai_client,
+    retry_on_429,
+)
+from chroma_knowledge_search.backend.app.config import get_settings
 
-logger = get_logger(__name__)
+logger = get_logger(__name__, rate_limited=True)
 
-load_config()
-openai_api_key = os.getenv("OPENAI_API_KEY")
-openai_chat_model = os.getenv("OPENAI_CHAT_MODEL")
-client = OpenAI(api_key=openai_api_key)
+settings = get_settings()
+# Set to override the shared OpenAI client
+client = None
 
 SYSTEM_PROMPT = (
     "You are a helpful, concise assistant. Use ONLY the provided context to answer. "
@@ -42,18 +56,76 @@ def build_prompt(context_chunks: list[str], question: str) -> list[dict]:
     ]
 
 
-def generate_answer(context_chunks: list[str], question: str) -> str:
+@retry_on_429("chat")
+def _complete(messages: list[dict], model: str, temperature: float):
+    prompt = [m["content"] for m in messages]
+    with get_limiter("chat").slot(estimate_tokens(prompt)) as slot:
+        resp = (client or get_openai_client()).chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+        )
+        slot.used(getattr(getattr(resp, "usage", None), "total_tokens", None))
+    return resp
+
+
+def _generate(messages: list[dict], fresh: bool) -> str:
+    """Complete ``messages``, through the generation cache when allowed.
+
+    Sampling above ``GENERATION_CACHE_MAX_TEMPERATURE`` is not
+    repeatable enough to cache. A fresh answer skips the lookup but
+    still replaces the cached one.
+    """
+    model = settings.openai_chat_model
+    temperature = settings.openai_chat_temperature
+    cache = None
+    if temperature <= settings.generation_cache_max_temperature:
+        cache = get_generation_cache()
+    if cache is not None:
+        key = fingerprint(model, temperature, messages)
+        if not fresh:
+            try:
+                cached = cache.get(key)
+            except sqlite3.Error as e:
+                logger.warning("Generation cache read failed: %s", e)
+                cached = None
+            record_cache("generation", cached is not None)
+            if cached is not None:
+                logger.debug("Answer served from generation cache")
+                return cached
+
+    with timed("generate"):
+        set_attributes({"chat.model": model, "chat.temperature": temperature})
+        resp = _complete(messages, model, temperature)
+    record_tokens("chat", getattr(resp, "usage", None))
+    answer = resp.choices[0].message.content
+    if cache is not None and isinstance(answer, str) and answer:
+        try:
+            cache.put(key, answer)
+        except sqlite3.Error as e:
+            logger.warning("Generation cache write failed: %s", e)
+    return answer
+
+
+def generate_answer(
+    context_chunks: list[str], question: str, fresh: bool = False
+) -> str:
     """Generate answer using retrieved context and safety checks.
 
+    Identical prompts are answered from the generation cache unless
+    ``fresh`` is set.
+
     Args:
         context_chunks (list[str]): Retrieved document chunks
         question (str): User question
+        fresh (bool): Ask the model again instead of using the cache
 
     Returns:
         str: Generated answer or safety message
     """
     logger.debug(
-        f"Generating answer for question with {len(context_chunks)} context chunks"
+        "Generating answer for question with %d context chunks",
+        len(context_chunks),
     )
 
     # Safety pre-check on user question
@@ -62,12 +134,8 @@ def generate_answer(context_chunks: list[str], question: str) -> str:
         return "I'm sorry, I can't assist with that request."
 
     messages = build_prompt(context_chunks, question)
-    resp = client.chat.completions.create(
-        model=openai_chat_model,
-        messages=messages,
-        temperature=0.2,
-    )
-    answer = resp.choices[0].message.content
+    set_attributes({"chat.chunks": len(context_chunks)})
+    answer = _generate(messages, fresh)
 
     # Safety post-check on model answer
     if is_flagged(answer):
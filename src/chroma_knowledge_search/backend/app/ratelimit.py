@@ -0,0 +1,361 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_none,
+)
+
+from chroma_knowledge_search.backend.app.config import (
+    Settings,
+    get_settings,
+    on_reload,
+)
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+from chroma_knowledge_search.backend.app.metrics import (
+    CONCURRENCY_LIMIT,
+    QUEUE_WAIT,
+    THROTTLED,
+    count_retry,
+)
+
+logger = get_logger(__name__, rate_limited=True)
+
+settings = get_settings()
+# Cool-down after a 429 that carries no Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+_limiters: dict[str, "AdaptiveLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+
+class RateLimitExceeded(Exception):
+    """A call could not be admitted before its deadline."""
+
+    def __init__(self, api: str, retry_after: float):
+        super().__init__(
+            f"{api} capacity exhausted, retry in {retry_after:.1f}s"
+        )
+        self.api = api
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Budget refilled at ``rate`` per second, holding up to ``capacity``.
+
+    Not thread-safe on its own; callers hold their own lock. A rate of
+    0 means unlimited.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` can be taken (0 if available now)."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount: float, now: float) -> None:
+        if self.rate > 0:
+            self._refill(now)
+            self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount: float) -> None:
+        """Charge (or refund, if negative) after the real cost is known."""
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class _Reservation:
+    """Admission handed to the caller; reports actual token usage."""
+
+    __slots__ = ("estimated", "actual")
+
+    def __init__(self, estimated: int):
+        self.estimated = estimated
+        self.actual = None
+
+    def used(self, tokens) -> None:
+        if isinstance(tokens, int):
+            self.actual = tokens
+
+
+class AdaptiveLimiter:
+    """Shared admission control for one upstream API.
+
+    Each call needs a request from the RPM bucket, its estimated tokens
+    from the TPM bucket, and a concurrency slot. The concurrency limit is
+    adjusted AIMD-style: it grows by about one per window of successful
+    calls, shrinks by 10% when latency exceeds the target, and halves on
+    a 429, which also pauses every caller for the Retry-After period so
+    workers do not retry in lockstep. Callers that cannot be admitted
+    within ``max_wait`` fail fast with :class:`RateLimitExceeded`.
+    """
+
+    def __init__(
+        self,
+        api: str,
+        rpm: float = 0,
+        tpm: float = 0,
+        max_concurrency: int | None = None,
+        min_concurrency: int = 1,
+        latency_target: float | None = None,
+        max_wait: float | None = None,
+    ):
+        if max_concurrency is None:
+            max_concurrency = settings.openai_max_concurrency
+        if latency_target is None:
+            latency_target = settings.openai_latency_target_s
+        if max_wait is None:
+            max_wait = settings.openai_max_queue_wait_s
+        self.api = api
+        # One second of budget may be spent in a burst
+        self.requests = TokenBucket(rpm / 60, rpm / 60)
+        self.tokens = TokenBucket(tpm / 60, tpm / 60)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_target = latency_target
+        self.max_wait = max_wait
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self._cond = threading.Condition()
+        self._gauge = CONCURRENCY_LIMIT.labels(api=api)
+        self._gauge.set(self.limit)
+
+    def acquire(self, tokens: int = 0, max_wait: float | None = None):
+        """Wait for admission.
+
+        Args:
+            tokens (int): Estimated tokens the call will consume
+            max_wait (float, optional): Longest time to queue, in seconds
+
+        Raises:
+            RateLimitExceeded: If admission is impossible within max_wait
+        """
+        started = time.monotonic()
+        deadline = started + (self.max_wait if max_wait is None else max_wait)
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                remaining = deadline - now
+                wait = max(0.0, self.cooldown_until - now)
+                if self.in_flight >= max(1, int(self.limit)):
+                    if remaining <= 0:
+                        self._reject("concurrency", max(wait, 1.0))
+                    self._cond.wait(remaining)
+                    continue
+                wait = max(
+                    wait,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(tokens, now),
+                )
+                if wait <= 0:
+                    self.requests.take(1, now)
+                    self.tokens.take(tokens, now)
+                    self.in_flight += 1
+                    break
+                if wait > remaining:
+                    # Fail now rather than hold the caller until it times out
+                    self._reject("budget", wait)
+                self._cond.wait(wait)
+        QUEUE_WAIT.labels(api=self.api).observe(time.monotonic() - started)
+
+    def _reject(self, reason: str, retry_after: float):
+        THROTTLED.labels(api=self.api, reason=reason).inc()
+        logger.warning(
+            "Shedding %s call: %s exhausted, retry in %.1fs",
+            self.api,
+            reason,
+            retry_after,
+        )
+        raise RateLimitExceeded(self.api, retry_after)
+
+    def release(self, latency: float | None, rate_limited: bool = False):
+        """Free a slot and adapt the concurrency limit.
+
+        Args:
+            latency (float | None): Call duration, or None if it failed
+                for a reason unrelated to load
+            rate_limited (bool): The call was answered with a 429
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                self.limit = max(self.min_concurrency, self.limit / 2)
+            elif latency is not None and latency > self.latency_target:
+                self.limit = max(self.min_concurrency, self.limit * 0.9)
+            elif latency is not None:
+                self.limit = min(
+                    self.max_concurrency, self.limit + 1 / self.limit
+                )
+            self._gauge.set(self.limit)
+            self._cond.notify_all()
+
+    def backoff(self, retry_after: float | None) -> None:
+        """Pause all callers after a 429 for the server's Retry-After."""
+        THROTTLED.labels(api=self.api, reason="upstream_429").inc()
+        pause = retry_after if retry_after else DEFAULT_RETRY_AFTER
+        with self._cond:
+            self.cooldown_until = max(
+                self.cooldown_until, time.monotonic() + pause
+            )
+
+    @contextmanager
+    def slot(self, tokens: int = 0, max_wait: float | None = None):
+        """Run one upstream call under this limiter.
+
+        Yields a reservation; call ``reservation.used(n)`` with the real
+        token count to correct the TPM estimate.
+        """
+        self.acquire(tokens, max_wait)
+        reservation = _Reservation(tokens)
+        started = time.monotonic()
+        latency, limited = None, False
+        try:
+            yield reservation
+            latency = time.monotonic() - started
+        except Exception as e:
+            if is_rate_limit_error(e):
+                limited = True
+                self.backoff(retry_after_seconds(e))
+            raise
+        finally:
+            if reservation.actual is not None:
+                with self._cond:
+                    self.tokens.adjust(reservation.actual - tokens)
+            self.release(latency, rate_limited=limited)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "cooling_down": self.cooldown_until > time.monotonic(),
+            }
+
+
+@functools.cache
+def get_openai_client():
+    """Get the OpenAI client shared by every module, built on first use.
+
+    The SDK is imported here rather than at module import, which keeps
+    it out of worker start-up. Pacing and 429 handling are left to the
+    shared limiter, so the client's own retries are off.
+    """
+    from openai import OpenAI
+
+    return OpenAI(
+        api_key=settings.openai_api_key,
+        timeout=settings.openai_timeout_s,
+        max_retries=0,
+    )
+
+
+def get_limiter(api: str) -> AdaptiveLimiter:
+    """Get the shared limiter for ``embed``, ``chat`` or ``moderation``."""
+    with _limiters_lock:
+        limiter = _limiters.get(api)
+        if limiter is None:
+            # Budgets from the OpenAI account's rate-limit tier, split
+            # between the workers that each hold a limiter
+            workers = settings.web_concurrency
+            limiter = _limiters[api] = AdaptiveLimiter(
+                api,
+                rpm=getattr(settings, f"openai_{api}_rpm", 0) / workers,
+                tpm=getattr(settings, f"openai_{api}_tpm", 0) / workers,
+            )
+        return limiter
+
+
+@on_reload
+def _apply_limiter_settings(settings: Settings) -> None:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    for limiter in limiters:
+        with limiter._cond:
+            limiter.latency_target = settings.openai_latency_target_s
+            limiter.max_wait = settings.openai_max_queue_wait_s
+
+
+def estimate_tokens(texts: list[str]) -> int:
+    """Rough token count (about four characters per token)."""
+    return sum(len(t) // 4 + 1 for t in texts)
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """True for OpenAI 429 errors (anything with status_code 429)."""
+    return getattr(exc, "status_code", None) == 429
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Read Retry-After (or retry-after-ms) from an OpenAI error."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def upstream_wait(fallback):
+    """Tenacity wait strategy that leaves 429 pacing to the limiter.
+
+    After a 429 the shared limiter already holds every caller until the
+    cool-down ends, so the retry goes straight back to it; other errors
+    use ``fallback``.
+
+    Args:
+        fallback: Tenacity wait strategy for other errors
+
+    Returns:
+        Callable: Wait strategy for ``retry(wait=...)``
+    """
+
+    def wait(retry_state) -> float:
+        exc = retry_state.outcome.exception()
+        if exc is not None and is_rate_limit_error(exc):
+            return 0.0
+        return fallback(retry_state)
+
+    return wait
+
+
+def retry_on_429(operation: str, attempts: int = 3):
+    """Retry a limited call after 429s only, paced by the limiter.
+
+    Args:
+        operation (str): Operation name for the retry counter
+        attempts (int): Total attempts including the first
+
+    Returns:
+        Callable: Decorator; the last 429 is re-raised when exhausted
+    """
+    return retry(
+        retry=retry_if_exception(is_rate_limit_error),
+        wait=wait_none(),
+        stop=stop_after_attempt(attempts),
+        before_sleep=count_retry(operation),
+        reraise=True,
+    )
@@ -1,6 +1,7 @@
-from typing import List
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 
 
 class UploadResponse(BaseModel):
@@ -8,11 +9,116 @@ class UploadResponse(BaseModel):
     chunks_indexed: int
 
 
+class QueryFilters(BaseModel):
+    document_ids: Optional[List[str]] = Field(default=None, min_length=1)
+    filenames: Optional[List[str]] = Field(default=None, min_length=1)
+    content_types: Optional[List[str]] = Field(default=None, min_length=1)
+    uploaded_after: Optional[datetime] = None
+    uploaded_before: Optional[datetime] = None
+    pages: Optional[List[int]] = Field(default=None, min_length=1)
+    section: Optional[str] = None
+    contains: Optional[str] = None
+
+    @field_validator("uploaded_after", "uploaded_before")
+    @classmethod
+    def _assume_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Naive times would otherwise be read in each host's local zone
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+    def is_selective(self) -> bool:
+        """Whether the filters pin the search to a few named documents.
+
+        Only these are narrow enough to be worth counting candidates
+        before the query; dates, types, pages, sections and text usually
+        match a large share of an owner's chunks.
+        """
+        return bool(self.document_ids or self.filenames)
+
+
 class QueryRequest(BaseModel):
     query: str
     top_k: int = 5
+    filters: Optional[QueryFilters] = None
+    fresh: bool = False
 
 
 class QueryResult(BaseModel):
     answer: str
     sources: List[str]
+    # "vector", or "lexical" when the query embedding missed its deadline
+    retrieval: str = "vector"
+
+
+class BatchQueryRequest(BaseModel):
+    queries: List[str] = Field(min_length=1, max_length=256)
+    top_k: int = 5
+    filters: Optional[QueryFilters] = None
+    retrieval_only: bool = False
+    fresh: bool = False
+
+
+class BatchQueryItem(BaseModel):
+    query: str
+    answer: Optional[str] = None
+    sources: List[str]
+    contexts: List[str]
+    retrieval: str = "vector"
+    timings: Dict[str, float]
+
+
+class BatchQueryResult(BaseModel):
+    results: List[BatchQueryItem]
+    timings: Dict[str, float]
+
+
+class SearchRequest(BaseModel):
+    query: str = Field(min_length=1)
+    limit: int = Field(default=10, ge=1, le=50)
+    cursor: Optional[str] = None
+    filters: Optional[QueryFilters] = None
+
+
+class SearchHit(BaseModel):
+    id: str
+    document_id: str
+    text: str
+    distance: Optional[float] = None
+    filename: Optional[str] = None
+    ordinal: Optional[int] = None
+    char_start: Optional[int] = None
+    char_end: Optional[int] = None
+    page: Optional[int] = None
+
+
+class SearchResponse(BaseModel):
+    hits: List[SearchHit]
+    next_cursor: Optional[str] = None
+
+
+class ChunkRecord(BaseModel):
+    ordinal: int
+    char_start: int
+    char_end: int
+    page: Optional[int] = None
+    token_count: int
+    content_hash: str
+    text: str
+
+
+class ChunkListResponse(BaseModel):
+    document_id: str
+    chunks: List[ChunkRecord]
+
+
+class ApiKeyCreate(BaseModel):
+    name: Optional[str] = None
+    owner_key: Optional[str] = Field(default=None, min_length=1)
+
+
+class ApiKeyCreated(BaseModel):
+    key_id: str
+    api_key: str
+    owner_key: str
+    name: Optional[str] = None
@@ -0,0 +1,63 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+from chroma_knowledge_search.backend.app.metrics import COALESCED
+
+logger = get_logger(__name__, rate_limited=True)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one computation.
+
+    The first caller for a key starts the work as a separate task; callers
+    arriving while it is in flight await the same task instead of
+    repeating it. The key is released as soon as the task finishes, so
+    later calls compute afresh. A cancelled caller does not cancel the
+    shared task.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._stats = {"executions": 0, "shared": 0}
+
+    def stats(self) -> dict:
+        """Snapshot of executed and shared call counts."""
+        return dict(self._stats, in_flight=len(self._calls))
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[..., Awaitable[Any]],
+        *args,
+        **kwargs,
+    ) -> Any:
+        """Run ``fn(*args, **kwargs)`` once per in-flight key.
+
+        Args:
+            key (Hashable): Identity of the computation
+            fn (Callable): Coroutine function to run, e.g. ``asyncio.to_thread``
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Any: The result of the shared computation
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, fn, *args, **kwargs))
+            self._calls[key] = task
+            self._stats["executions"] += 1
+        else:
+            self._stats["shared"] += 1
+            COALESCED.labels(stage=self.name).inc()
+            logger.debug("Joining in-flight %s call", self.name)
+        return await asyncio.shield(task)
+
+    async def _run(self, key, fn, *args, **kwargs):
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            self._calls.pop(key, None)
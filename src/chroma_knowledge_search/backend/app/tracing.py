@@ -0,0 +1,176 @@
+import contextlib
+
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.logging_config import get_logger
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+        SimpleSpanProcessor,
+    )
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+except ImportError:
+    # Tracing is optional; spans become no-ops without OpenTelemetry
+    trace = None
+
+logger = get_logger(__name__)
+
+settings = get_settings()
+
+_NOOP = contextlib.nullcontext()
+_tracer = None
+_provider = None
+_configured = False
+
+
+def _build_exporter(name: str):
+    if name == "console":
+        return ConsoleSpanExporter()
+    if name == "memory":
+        return InMemorySpanExporter()
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        return OTLPSpanExporter()
+    raise ValueError(f"Unsupported OTEL_TRACES_EXPORTER: {name}")
+
+
+def configure_tracing(
+    exporter: str | None = None,
+    sample_ratio: float | None = None,
+    span_exporter=None,
+):
+    """Build the tracer used for pipeline spans.
+
+    Uses a private tracer provider rather than the global one, so it can
+    be reconfigured (e.g. by tests) without touching other libraries.
+
+    Args:
+        exporter (str, optional): ``none``, ``console``, ``memory`` or
+            ``otlp``; defaults to OTEL_TRACES_EXPORTER
+        sample_ratio (float, optional): Fraction of root traces to
+            sample; defaults to OTEL_TRACES_SAMPLER_ARG
+        span_exporter (SpanExporter, optional): Exporter instance to use
+            instead of building one from ``exporter``
+
+    Returns:
+        SpanExporter | None: The exporter in use, or None when disabled
+    """
+    global _tracer, _provider, _configured
+    exporter = exporter or settings.otel_traces_exporter
+    if sample_ratio is None:
+        sample_ratio = settings.otel_traces_sampler_arg
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = _provider = None
+    _configured = True
+    if trace is None or (exporter == "none" and span_exporter is None):
+        return None
+
+    if span_exporter is None:
+        span_exporter = _build_exporter(exporter)
+    processor = (
+        SimpleSpanProcessor
+        if isinstance(span_exporter, InMemorySpanExporter)
+        else BatchSpanProcessor
+    )
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.otel_service_name}),
+        sampler=ParentBased(TraceIdRatioBased(sample_ratio)),
+    )
+    _provider.add_span_processor(processor(span_exporter))
+    _tracer = _provider.get_tracer(__name__)
+    logger.info(
+        "Tracing enabled with %s, sample ratio %s",
+        type(span_exporter).__name__,
+        sample_ratio,
+    )
+    return span_exporter
+
+
+def get_tracer():
+    """Get the configured tracer, or None when tracing is disabled."""
+    if not _configured:
+        configure_tracing()
+    return _tracer
+
+
+def span(name: str, attributes: dict | None = None):
+    """Start a span as the current span.
+
+    Returns a shared no-op context manager when tracing is disabled or
+    the parent trace was sampled out, so instrumented code pays almost
+    nothing in either case.
+
+    Args:
+        name (str): Span name
+        attributes (dict, optional): Initial span attributes
+
+    Returns:
+        ContextManager: Context manager for the span
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        return _NOOP
+    parent = trace.get_current_span().get_span_context()
+    if parent.is_valid and not parent.trace_flags.sampled:
+        # Children of an unsampled trace are never recorded
+        return _NOOP
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+
+def request_span(name: str, headers, attributes: dict | None = None):
+    """Start a server span continuing any incoming W3C trace context.
+
+    Args:
+        name (str): Span name
+        headers: Incoming request headers
+        attributes (dict, optional): Initial span attributes
+
+    Returns:
+        ContextManager: Context manager for the span
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        return _NOOP
+    return tracer.start_as_current_span(
+        name,
+        context=propagate.extract(headers),
+        kind=trace.SpanKind.SERVER,
+        attributes=attributes,
+    )
+
+
+def set_attributes(attributes: dict) -> None:
+    """Add attributes to the current span if it is being recorded.
+
+    Args:
+        attributes (dict): Attribute names and values; None values are
+            skipped
+    """
+    if _tracer is None:
+        return
+    current = trace.get_current_span()
+    if current.is_recording():
+        current.set_attributes(
+            {k: v for k, v in attributes.items() if v is not None}
+        )
+
+
+def current_trace_id() -> str | None:
+    """Hex trace ID of the current recorded span, if any."""
+    if _tracer is None:
+        return None
+    ctx = trace.get_current_span().get_span_context()
+    if not ctx.is_valid or not ctx.trace_flags.sampled:
+        return None
+    return f"{ctx.trace_id:032x}"
@@ -0,0 +1,89 @@
+import hashlib
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Update, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chroma_knowledge_search.backend.app.models import Upload
+
+# Namespace for document IDs derived from idempotency keys
+UPLOAD_NAMESPACE = uuid.UUID("6f1c2a9e-3d4b-5c8e-9a71-0b2d4e6f8a13")
+
+
+def upload_hash(content: bytes) -> str:
+    """Hex SHA-256 of an uploaded file, to spot a reused key."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def document_id_for(owner_key: str, idempotency_key: str) -> str:
+    """Deterministic document ID for an owner's idempotency key.
+
+    Retries of an upload get the same document ID, and with it the same
+    ``<document_id>-<ordinal>`` chunk IDs, so vectors written by an
+    earlier attempt are reused rather than orphaned.
+    """
+    return str(uuid.uuid5(UPLOAD_NAMESPACE, f"{owner_key}:{idempotency_key}"))
+
+
+def as_utc(value: datetime) -> datetime:
+    """Attach UTC to timestamps SQLite returns without a zone."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+async def get_upload(
+    db: AsyncSession, owner_key: str, idempotency_key: str
+) -> Upload | None:
+    """Read the checkpoint of an earlier attempt at an upload.
+
+    Args:
+        db (AsyncSession): Database session
+        owner_key (str): Owner who sent the upload
+        idempotency_key (str): ``Idempotency-Key`` header of the upload
+
+    Returns:
+        Upload | None: The checkpoint, or None for a first attempt
+    """
+    return (
+        await db.execute(
+            select(Upload).where(
+                Upload.owner_key == owner_key,
+                Upload.idempotency_key == idempotency_key,
+            )
+        )
+    ).scalar_one_or_none()
+
+
+def record_progress(
+    upload: Upload, chunks_done: int, chunks_total: int
+) -> Update:
+    """Statement checkpointing the chunks stored so far.
+
+    Args:
+        upload (Upload): Checkpoint being advanced
+        chunks_done (int): Chunks whose vectors are stored, from the start
+        chunks_total (int): Chunks in the document
+
+    Returns:
+        Update: Statement for the group-commit writer
+    """
+    return _update(upload).values(
+        chunks_done=chunks_done, chunks_total=chunks_total
+    )
+
+
+def complete(upload: Upload) -> Update:
+    """Statement marking an upload done, so retries replay its result."""
+    return _update(upload).values(
+        chunks_done=Upload.chunks_total,
+        completed_at=datetime.now(timezone.utc),
+    )
+
+
+def _update(upload: Upload) -> Update:
+    return update(Upload).where(
+        Upload.owner_key == upload.owner_key,
+        Upload.idempotency_key == upload.idempotency_key,
+    )
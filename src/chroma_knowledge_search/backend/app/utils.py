@@ -1,10 +1,14 @@
 import io
+import re
+from bisect import bisect_right
 from typing import List
 
-import docx
-from pdfminer.high_level import extract_text
-
 SUPPORTED_EXTS = (".pdf", ".txt", ".docx")
+WORD_RE = re.compile(r"\S+")
+HEADING_RE = re.compile(
+    r"(?:^|(?<=\f))#{1,6}[ \t]+(.+?)[ \t#]*$", re.MULTILINE
+)
+PAGE_BREAK = "\f"
 
 
 async def extract_text_from_file(file_bytes: bytes, filename: str) -> str:
@@ -18,16 +22,27 @@ async def extract_text_from_file(file_bytes: bytes, filename: str) -> str:
         str: Extracted text content
     """
     fname = filename.lower()
+    # Parsers are imported on first use to keep them out of start-up
     if fname.endswith(".pdf"):
+        from pdfminer.high_level import extract_text
+
         with io.BytesIO(file_bytes) as f:
             return extract_text(f)
     if fname.endswith(".docx"):
+        import docx
+
         with io.BytesIO(file_bytes) as f:
             doc = docx.Document(f)
             return "\n".join(p.text for p in doc.paragraphs)
     return file_bytes.decode("utf-8", errors="ignore")
 
 
+def load_parsers() -> None:
+    """Import the PDF and DOCX parsers ahead of the first upload."""
+    import docx  # noqa: F401
+    import pdfminer.high_level  # noqa: F401
+
+
 def chunk_text(text: str, chunk_size: int, overlap: int) -> List[dict]:
     """Split text into overlapping chunks.
 
@@ -37,16 +52,50 @@ def chunk_text(text: str, chunk_size: int, overlap: int) -> List[dict]:
         overlap (int): Number of overlapping words
 
     Returns:
-        List[dict]: List of text chunks with 'text' key
+        List[dict]: List of text chunks with 'text', 'char_start' and
+        'char_end' keys (offsets into the original text)
     """
-    words = text.split()
-    if not words:
+    spans = [m.span() for m in WORD_RE.finditer(text)]
+    if not spans:
         return []
     chunks = []
     i = 0
     step = max(1, chunk_size - overlap)
-    while i < len(words):
-        chunk = " ".join(words[i : i + chunk_size])
-        chunks.append({"text": chunk})
+    while i < len(spans):
+        window = spans[i : i + chunk_size]
+        chunk = " ".join(text[start:end] for start, end in window)
+        chunks.append(
+            {
+                "text": chunk,
+                "char_start": window[0][0],
+                "char_end": window[-1][1],
+            }
+        )
         i += step
     return chunks
+
+
+def annotate_chunks(text: str, chunks: List[dict]) -> List[dict]:
+    """Add page and section metadata to chunks in place.
+
+    Pages are counted from form feeds, which pdfminer emits between PDF
+    pages. Sections come from the nearest preceding markdown heading.
+
+    Args:
+        text (str): Original text the chunks were cut from
+        chunks (List[dict]): Chunks with 'char_start' offsets
+
+    Returns:
+        List[dict]: The same chunks, annotated
+    """
+    page_breaks = [m.start() for m in re.finditer(PAGE_BREAK, text)]
+    headings = [(m.start(), m.group(1)) for m in HEADING_RE.finditer(text)]
+    heading_starts = [start for start, _ in headings]
+    for chunk in chunks:
+        start = chunk["char_start"]
+        if page_breaks:
+            chunk["page"] = bisect_right(page_breaks, start) + 1
+        idx = bisect_right(heading_starts, start)
+        if idx:
+            chunk["section"] = headings[idx - 1][1]
+    return chunks
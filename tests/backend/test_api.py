@@ -105,6 +105,205 @@ class TestQueryEndpoint:
             assert result["sources"] == []
 
 
+class TestBatchQueryEndpoint:
+    """Test batch query API endpoint."""
+
+    def _setup_two_queries(self, mock_openai, mock_chroma):
+        mock_openai.embeddings.create.return_value = Mock(
+            data=[Mock(embedding=[0.1] * 1536), Mock(embedding=[0.2] * 1536)]
+        )
+        mock_collection = mock_chroma.get_collection.return_value
+        mock_collection.query.return_value = {
+            "documents": [["First context"], []],
+            "metadatas": [[{"document_id": "doc-1"}], []],
+        }
+        return mock_collection
+
+    def test_batch_query_success(self, client, mock_openai, mock_chroma):
+        """Test batch query embeds and searches once for all queries."""
+        mock_collection = self._setup_two_queries(mock_openai, mock_chroma)
+
+        with patch(
+            "chroma_knowledge_search.backend.app.api.generate_answer",
+            return_value="Batch answer",
+        ) as mock_generate:
+            response = client.post(
+                "/api/query/batch",
+                json={"queries": ["first?", "second?"], "top_k": 3},
+                headers={"x-api-key": "test-api-key"},
+            )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert [r["answer"] for r in result["results"]] == [
+            "Batch answer",
+            "I couldn't find relevant context for your question.",
+        ]
+        assert result["results"][0]["sources"] == ["doc-1"]
+        assert "generate_ms" in result["results"][0]["timings"]
+        assert {"embed_ms", "retrieve_ms", "total_ms"} <= set(
+            result["timings"]
+        )
+        mock_openai.embeddings.create.assert_called_once()
+        mock_collection.query.assert_called_once()
+        assert (
+            len(mock_collection.query.call_args.kwargs["query_embeddings"])
+            == 2
+        )
+        mock_generate.assert_called_once()
+
+    def test_batch_query_retrieval_only(
+        self, client, mock_openai, mock_chroma
+    ):
+        """Test retrieval-only mode skips answer generation."""
+        self._setup_two_queries(mock_openai, mock_chroma)
+
+        with patch(
+            "chroma_knowledge_search.backend.app.api.generate_answer"
+        ) as mock_generate:
+            response = client.post(
+                "/api/query/batch",
+                json={
+                    "queries": ["first?", "second?"],
+                    "retrieval_only": True,
+                },
+                headers={"x-api-key": "test-api-key"},
+            )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["results"][0]["answer"] is None
+        assert result["results"][0]["contexts"] == ["First context"]
+        mock_generate.assert_not_called()
+
+    def test_batch_query_follows_query_path(
+        self, client, mock_openai, mock_chroma
+    ):
+        """Test batch queries are normalized and widened like /query."""
+        mock_collection = mock_chroma.get_collection.return_value
+        mock_collection.query.return_value = {
+            "documents": [["middle chunk"]],
+            "metadatas": [[{"document_id": "doc-1", "ordinal": 1}]],
+        }
+        mock_collection.get.return_value = {
+            "documents": ["first chunk", "last chunk"],
+            "metadatas": [
+                {"document_id": "doc-1", "ordinal": 0},
+                {"document_id": "doc-1", "ordinal": 2},
+            ],
+        }
+
+        with patch(
+            "chroma_knowledge_search.backend.app.api.generate_answer",
+            return_value="Batch answer",
+        ) as mock_generate:
+            response = client.post(
+                "/api/query/batch",
+                json={"queries": ["  widened   question? "]},
+                headers={"x-api-key": "test-api-key"},
+            )
+
+        assert response.status_code == 200
+        item = response.json()["results"][0]
+        assert item["query"] == "  widened   question? "
+        assert item["retrieval"] == "vector"
+        assert item["contexts"] == ["first chunk middle chunk last chunk"]
+        mock_generate.assert_called_once_with(
+            ["first chunk middle chunk last chunk"], "widened question?", False
+        )
+
+    def test_batch_query_empty(self, client):
+        """Test an empty batch is rejected."""
+        response = client.post(
+            "/api/query/batch",
+            json={"queries": []},
+            headers={"x-api-key": "test-api-key"},
+        )
+
+        assert response.status_code == 422
+
+
+class TestSearchEndpoint:
+    """Test retrieval-only search endpoint."""
+
+    def _setup_hits(self, mock_chroma, count):
+        mock_collection = mock_chroma.get_collection.return_value
+        mock_collection.query.return_value = {
+            "ids": [[f"doc-1-{i}" for i in range(count)]],
+            "documents": [[f"chunk {i}" for i in range(count)]],
+            "metadatas": [
+                [
+                    {"document_id": "doc-1", "ordinal": i, "char_start": 0}
+                    for i in range(count)
+                ]
+            ],
+            "distances": [[0.1 * i for i in range(count)]],
+        }
+        return mock_collection
+
+    def test_search_pages_with_cursor(self, client, mock_openai, mock_chroma):
+        """Test hits are paged with an opaque cursor."""
+        mock_collection = self._setup_hits(mock_chroma, 3)
+        headers = {"x-api-key": "test-api-key"}
+
+        with patch(
+            "chroma_knowledge_search.backend.app.api.generate_answer"
+        ) as mock_generate:
+            first = client.post(
+                "/api/search",
+                json={"query": "paged search", "limit": 2},
+                headers=headers,
+            ).json()
+            second = client.post(
+                "/api/search",
+                json={
+                    "query": "paged search",
+                    "limit": 2,
+                    "cursor": first["next_cursor"],
+                },
+                headers=headers,
+            ).json()
+
+        assert [h["id"] for h in first["hits"]] == ["doc-1-0", "doc-1-1"]
+        assert first["hits"][1]["ordinal"] == 1
+        assert first["next_cursor"]
+        assert [h["id"] for h in second["hits"]] == ["doc-1-2"]
+        assert second["next_cursor"] is None
+        call_kwargs = mock_collection.query.call_args.kwargs
+        assert call_kwargs["n_results"] == 5
+        mock_generate.assert_not_called()
+
+    def test_search_cursor_from_other_query(
+        self, client, mock_openai, mock_chroma
+    ):
+        """Test a cursor cannot be reused for a different query."""
+        self._setup_hits(mock_chroma, 3)
+        headers = {"x-api-key": "test-api-key"}
+        first = client.post(
+            "/api/search",
+            json={"query": "first search", "limit": 1},
+            headers=headers,
+        ).json()
+
+        response = client.post(
+            "/api/search",
+            json={"query": "other", "cursor": first["next_cursor"]},
+            headers=headers,
+        )
+
+        assert response.status_code == 400
+
+    def test_search_invalid_cursor(self, client, mock_openai, mock_chroma):
+        """Test a malformed cursor is rejected."""
+        response = client.post(
+            "/api/search",
+            json={"query": "search", "cursor": "not-a-cursor"},
+            headers={"x-api-key": "test-api-key"},
+        )
+
+        assert response.status_code == 400
+
+
 class TestHealthEndpoint:
     """Test health check endpoint."""
 
@@ -1,7 +1,13 @@
+import hashlib
+from unittest.mock import patch
+
 import pytest
 from fastapi import HTTPException
+from fastapi.testclient import TestClient
 
+from chroma_knowledge_search.backend.app import auth
 from chroma_knowledge_search.backend.app.auth import require_api_key
+from chroma_knowledge_search.backend.app.main import app
 
 
 class TestAuth:
@@ -27,3 +33,97 @@ class TestAuth:
         with pytest.raises(HTTPException) as exc_info:
             await require_api_key("invalid-key")
         assert exc_info.value.status_code == 403
+
+
+@pytest.fixture
+def admin():
+    """Enable the admin endpoints and start from an empty key cache."""
+    auth.clear_cache()
+    with patch.object(auth.settings, "admin_api_key", "test-admin-key"):
+        yield {"x-admin-key": "test-admin-key"}
+    auth.clear_cache()
+
+
+class TestApiKeys:
+    """Test minted keys, the verification cache and revocation."""
+
+    def test_mint_and_use_key(self, admin):
+        """Test a minted key authenticates as its own owner."""
+        with TestClient(app) as client:
+            created = client.post(
+                "/api/admin/keys", json={"name": "ci"}, headers=admin
+            ).json()
+            owner_key = client.portal.call(require_api_key, created["api_key"])
+
+        assert created["api_key"].startswith(f"cks_{created['key_id']}_")
+        assert owner_key == created["owner_key"]
+        assert owner_key != hashlib.sha256(b"test-api-key").hexdigest()
+
+    def test_verification_is_cached(self, admin):
+        """Test only the first use of a key reads the key table."""
+        with TestClient(app) as client:
+            api_key = client.post(
+                "/api/admin/keys", json={}, headers=admin
+            ).json()["api_key"]
+            with patch.object(
+                auth, "_lookup", wraps=auth._lookup
+            ) as mock_lookup:
+                for _ in range(3):
+                    client.portal.call(require_api_key, api_key)
+
+        assert mock_lookup.call_count == 1
+
+    def test_rejection_is_cached(self, admin):
+        """Test a repeated unknown key reads the key table once."""
+        with TestClient(app) as client:
+            with patch.object(
+                auth, "_lookup", wraps=auth._lookup
+            ) as mock_lookup:
+                for _ in range(3):
+                    with pytest.raises(HTTPException):
+                        client.portal.call(require_api_key, "cks_nope_secret")
+
+        assert mock_lookup.call_count == 1
+
+    def test_wrong_secret_rejected(self, admin):
+        """Test a known key ID with the wrong secret is refused."""
+        with TestClient(app) as client:
+            key_id = client.post(
+                "/api/admin/keys", json={}, headers=admin
+            ).json()["key_id"]
+            with pytest.raises(HTTPException) as exc_info:
+                client.portal.call(require_api_key, f"cks_{key_id}_forged")
+
+        assert exc_info.value.status_code == 403
+
+    def test_revoked_key_rejected(self, admin):
+        """Test revocation takes effect immediately on this worker."""
+        with TestClient(app) as client:
+            created = client.post(
+                "/api/admin/keys", json={}, headers=admin
+            ).json()
+            client.portal.call(require_api_key, created["api_key"])
+
+            revoked = client.delete(
+                f"/api/admin/keys/{created['key_id']}", headers=admin
+            )
+            again = client.delete(
+                f"/api/admin/keys/{created['key_id']}", headers=admin
+            )
+            with pytest.raises(HTTPException) as exc_info:
+                client.portal.call(require_api_key, created["api_key"])
+
+        assert revoked.status_code == 204
+        assert again.status_code == 404
+        assert exc_info.value.status_code == 403
+
+    def test_admin_key_required(self, admin):
+        """Test key management is refused without the admin key."""
+        with TestClient(app) as client:
+            response = client.post(
+                "/api/admin/keys",
+                json={},
+                headers={"x-admin-key": "test-api-key"},
+            )
+
+        assert response.status_code == 403
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from chroma_knowledge_search.backend.app.batching import BatchWriter
+
+
+class ListWriter(BatchWriter):
+    """Writer storing items in a list, failing on ``"bad"``."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    async def _next_batch(self):
+        batch = [await self._queue.get()]
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch):
+        items = [pending.item for pending in batch]
+        if "bad" in items:
+            raise ValueError("bad item")
+        self.batches.append(items)
+
+
+class TestBatchWriter:
+    """Test the queue and retry handling shared by the batch writers."""
+
+    def test_subclass_must_write(self):
+        """Test a writer without ``_write`` cannot be created."""
+
+        class Incomplete(BatchWriter):
+            async def _next_batch(self):
+                return []
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_retried_singly(self):
+        """Test a failing item fails only its caller."""
+        writer = ListWriter()
+
+        results = await asyncio.gather(
+            writer._submit(["a"]),
+            writer._submit(["bad"]),
+            writer._submit(["b", "c"]),
+            return_exceptions=True,
+        )
+        await writer.close()
+
+        assert results[0] is None and results[2] is None
+        assert isinstance(results[1], ValueError)
+        assert writer.batches == [["a"], ["b"], ["c"]]
+        assert writer._stats["retried"] == 4
@@ -1,10 +1,22 @@
+from datetime import datetime, timezone
 from unittest.mock import Mock, patch
 
+import pytest
+
+from chroma_knowledge_search.backend.app import chroma_client
 from chroma_knowledge_search.backend.app.chroma_client import (
+    EmbeddingMismatchError,
+    build_where,
+    build_where_document,
     get_or_create_collection,
     query,
     upsert_chunks,
 )
+from chroma_knowledge_search.backend.app.embeddings import (
+    HashingEmbeddingProvider,
+    set_provider,
+)
+from chroma_knowledge_search.backend.app.schemas import QueryFilters
 
 
 class TestChromaClient:
@@ -34,6 +46,45 @@ class TestChromaClient:
             assert collection == mock_collection
             mock_client.create_collection.assert_called_once()
 
+    def test_new_collection_records_provider(self, mock_chroma):
+        """Test a new collection records the embedding space."""
+        mock_chroma.get_collection.side_effect = Exception("Not found")
+        set_provider(HashingEmbeddingProvider(dimensions=64))
+        try:
+            get_or_create_collection()
+        finally:
+            set_provider(None)
+
+        metadata = mock_chroma.create_collection.call_args.kwargs["metadata"]
+        assert metadata["embedding_provider"] == "hashing:blake2b-64"
+        assert metadata["embedding_dimensions"] == 64
+
+    def test_provider_mismatch_refused(self, mock_chroma):
+        """Test a collection built by another provider is refused."""
+        mock_chroma.get_collection.return_value.metadata = {
+            "embedding_provider": "openai:text-embedding-3-small",
+            "embedding_dimensions": 1536,
+        }
+        set_provider(HashingEmbeddingProvider(dimensions=64))
+        try:
+            with pytest.raises(EmbeddingMismatchError):
+                get_or_create_collection()
+        finally:
+            set_provider(None)
+
+    def test_dimension_mismatch_refused(self, mock_chroma):
+        """Test a collection with other dimensions is refused."""
+        mock_chroma.get_collection.return_value.metadata = {
+            "embedding_provider": "hashing:blake2b-64",
+            "embedding_dimensions": 128,
+        }
+        set_provider(HashingEmbeddingProvider(dimensions=64))
+        try:
+            with pytest.raises(EmbeddingMismatchError):
+                get_or_create_collection()
+        finally:
+            set_provider(None)
+
     def test_upsert_chunks(self, mock_chroma):
         """Test upserting document chunks."""
         chunks = [
@@ -75,3 +126,137 @@ class TestChromaClient:
         mock_collection.query.assert_called_once_with(
             query_embeddings=[query_embedding], n_results=5, where=None
         )
+
+    def test_upsert_chunks_metadata(self, mock_chroma):
+        """Test document and chunk metadata are stored per chunk."""
+        chunks = [
+            {
+                "text": "First chunk",
+                "embedding": [0.1] * 1536,
+                "char_start": 0,
+                "char_end": 11,
+                "page": 2,
+            },
+        ]
+
+        upsert_chunks(
+            "doc-123",
+            chunks,
+            "owner-key",
+            metadata={"filename": "a.pdf", "uploaded_at": 1700000000},
+        )
+
+        mock_collection = mock_chroma.get_collection.return_value
+        meta = mock_collection.add.call_args.kwargs["metadatas"][0]
+        assert meta["filename"] == "a.pdf"
+        assert meta["ordinal"] == 0
+        assert meta["page"] == 2
+        assert "section" not in meta
+
+    def test_upsert_chunks_split_to_max_batch(self, mock_chroma):
+        """Test large documents are added in client-sized batches."""
+        mock_chroma.get_max_batch_size.return_value = 2
+        chunks = [
+            {"text": f"Chunk {i}", "embedding": [0.1] * 4} for i in range(5)
+        ]
+
+        upsert_chunks("doc-123", chunks, "owner-key")
+
+        mock_collection = mock_chroma.get_collection.return_value
+        sizes = [
+            len(call.kwargs["ids"])
+            for call in mock_collection.add.call_args_list
+        ]
+        assert sizes == [2, 2, 1]
+
+
+class TestQueryFilters:
+    """Test translation of query filters into Chroma clauses."""
+
+    def test_build_where_owner_only(self):
+        """Test owner isolation alone is a plain clause."""
+        assert build_where("owner-1") == {"owner_key": "owner-1"}
+        assert build_where(None) is None
+
+    def test_build_where_combines_filters(self):
+        """Test filters are combined with the owner clause."""
+        after = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        filters = QueryFilters(
+            document_ids=["doc-1", "doc-2"], uploaded_after=after
+        )
+
+        where = build_where("owner-1", filters)
+
+        assert where == {
+            "$and": [
+                {"owner_key": "owner-1"},
+                {"document_id": {"$in": ["doc-1", "doc-2"]}},
+                {"uploaded_at": {"$gte": int(after.timestamp())}},
+            ]
+        }
+
+    def test_naive_dates_read_as_utc(self):
+        """Test naive date filters mean UTC on every host."""
+        filters = QueryFilters(uploaded_before=datetime(2024, 1, 1))
+
+        where = build_where(None, filters)
+
+        assert filters.uploaded_before.tzinfo is timezone.utc
+        assert where == {
+            "uploaded_at": {
+                "$lte": int(
+                    datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+                )
+            }
+        }
+
+    def test_build_where_document(self):
+        """Test full-text filter becomes a where_document clause."""
+        assert build_where_document(QueryFilters(contains="term")) == {
+            "$contains": "term"
+        }
+        assert build_where_document(QueryFilters()) is None
+
+    def test_query_exact_scan_for_selective_filter(self, mock_chroma):
+        """Test a small filtered candidate set is scored exactly."""
+        mock_collection = mock_chroma.get_collection.return_value
+        mock_collection.get.side_effect = [
+            {"ids": ["a", "b"]},
+            {
+                "ids": ["a", "b"],
+                "embeddings": [[0.0, 1.0], [1.0, 0.0]],
+                "documents": ["doc a", "doc b"],
+                "metadatas": [{"document_id": "a"}, {"document_id": "b"}],
+            },
+        ]
+
+        result = query(
+            [1.0, 0.0],
+            top_k=1,
+            owner_key="owner-1",
+            filters=QueryFilters(document_ids=["a", "b"]),
+        )
+
+        mock_collection.query.assert_not_called()
+        assert result["ids"] == [["b"]]
+        assert result["distances"] == [[0.0]]
+
+    def test_query_falls_back_to_index_for_broad_filter(self, mock_chroma):
+        """Test a broad filter uses the ANN index without counting."""
+        mock_collection = mock_chroma.get_collection.return_value
+        mock_collection.get.return_value = {
+            "ids": [f"id-{i}" for i in range(1000)]
+        }
+
+        with patch.object(chroma_client.settings, "exact_scan_threshold", 10):
+            query(
+                [0.1] * 1536,
+                top_k=3,
+                owner_key="owner-1",
+                filters=QueryFilters(contains="term"),
+            )
+
+        mock_collection.get.assert_not_called()
+        call_kwargs = mock_collection.query.call_args.kwargs
+        assert call_kwargs["where_document"] == {"$contains": "term"}
+        assert call_kwargs["n_results"] == 3
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from chroma_knowledge_search.backend.app import chroma_writer
+from chroma_knowledge_search.backend.app.chroma_client import chunk_records
+from chroma_knowledge_search.backend.app.chroma_writer import ChromaWriter
+
+
+def _records(document_id: str, count: int) -> dict:
+    chunks = [
+        {"text": f"{document_id} chunk {i}", "embedding": [0.1, 0.2]}
+        for i in range(count)
+    ]
+    return chunk_records(document_id, chunks, "owner")
+
+
+def _added_ids(collection) -> list[list[str]]:
+    return [call.kwargs["ids"] for call in collection.add.call_args_list]
+
+
+class TestChromaWriter:
+    """Test batching of vector-store writes from concurrent uploads."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_adds_share_batch(self, mock_chroma):
+        """Test small concurrent adds go out in one call."""
+        collection = mock_chroma.get_collection.return_value
+        writer = ChromaWriter()
+
+        await asyncio.gather(
+            *(writer.add(_records(f"doc{i}", 2)) for i in range(3))
+        )
+        await writer.close()
+
+        assert _added_ids(collection) == [
+            [f"doc{i}-{j}" for i in range(3) for j in range(2)]
+        ]
+        assert writer.stats()["chunks"] == 6
+        assert writer.stats()["chunks_per_s"] > 0
+
+    @pytest.mark.asyncio
+    async def test_large_add_split_to_max_batch(self, mock_chroma):
+        """Test adds never exceed the client's reported batch size."""
+        mock_chroma.get_max_batch_size.return_value = 4
+        collection = mock_chroma.get_collection.return_value
+        writer = ChromaWriter()
+
+        await asyncio.gather(
+            writer.add(_records("big", 7)), writer.add(_records("small", 2))
+        )
+        await writer.close()
+
+        sizes = [len(ids) for ids in _added_ids(collection)]
+        assert sizes == [4, 3, 2]
+        assert sum(_added_ids(collection), []).count("big-6") == 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_blocks_callers(self, mock_chroma):
+        """Test callers wait for room while Chroma is behind."""
+        release = threading.Event()
+        collection = mock_chroma.get_collection.return_value
+        collection.add.side_effect = lambda **kwargs: release.wait(5)
+        writer = ChromaWriter(queue_size=1)
+
+        first = asyncio.ensure_future(writer.add(_records("a", 1)))
+        await asyncio.sleep(0.05)  # taken by the writer, add in progress
+        second = asyncio.ensure_future(writer.add(_records("b", 1)))
+        third = asyncio.ensure_future(writer.add(_records("c", 1)))
+        await asyncio.sleep(0.05)
+
+        assert writer.stats()["queued"] == 1
+        assert not third.done()
+        release.set()
+        await asyncio.gather(first, second, third)
+        await writer.close()
+        assert sorted(sum(_added_ids(collection), [])) == ["a-0", "b-0", "c-0"]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_retried_singly(self, mock_chroma):
+        """Test one bad upload does not fail the others in its batch."""
+        collection = mock_chroma.get_collection.return_value
+
+        def add(ids, **kwargs):
+            if "bad-0" in ids:
+                raise ValueError("bad record")
+
+        collection.add.side_effect = add
+        writer = ChromaWriter()
+
+        results = await asyncio.gather(
+            writer.add(_records("good", 1)),
+            writer.add(_records("bad", 1)),
+            return_exceptions=True,
+        )
+        await writer.close()
+
+        assert results[0] is None
+        assert isinstance(results[1], ValueError)
+        assert writer.stats()["retried"] == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_limit_resolved_off_loop(self, mock_chroma):
+        """Test the client's batch limit is asked for in a worker thread."""
+        threads = []
+
+        def max_batch_size():
+            threads.append(threading.get_ident())
+            return 4
+
+        writer = ChromaWriter()
+        with patch.object(chroma_writer, "max_batch_size", max_batch_size):
+            await asyncio.gather(
+                writer.add(_records("a", 1)), writer.add(_records("b", 1))
+            )
+        await writer.close()
+
+        assert len(threads) == 1
+        assert threads[0] != threading.get_ident()
@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from chroma_knowledge_search.backend.app import api
+from chroma_knowledge_search.backend.app.chunks import chunk_rows, content_hash
+from chroma_knowledge_search.backend.app.main import app
+from chroma_knowledge_search.backend.app.utils import (
+    annotate_chunks,
+    chunk_text,
+)
+
+HEADERS = {"x-api-key": "test-api-key"}
+
+
+class TestChunkRecords:
+    """Test chunk records in the relational store."""
+
+    def test_chunk_rows(self):
+        """Test rows carry ordinals, offsets, pages and hashes."""
+        text = "alpha beta gamma\fdelta epsilon zeta"
+        chunks = annotate_chunks(text, chunk_text(text, 3, 0))
+
+        rows = chunk_rows("doc", chunks)
+
+        assert [row.ordinal for row in rows] == [0, 1]
+        assert [row.page for row in rows] == [1, 2]
+        assert text[rows[1].char_start : rows[1].char_end] == (
+            "delta epsilon zeta"
+        )
+        assert rows[0].content_hash == content_hash("alpha beta gamma")
+        assert all(row.token_count > 0 for row in rows)
+
+    def test_upload_stores_chunks(self, mock_chroma):
+        """Test an upload's chunks can be listed by range and owner."""
+        text = " ".join(f"word{i}" for i in range(30))
+        with (
+            patch.object(api.settings, "chunk_size", 10),
+            patch.object(api.settings, "chunk_overlap", 0),
+            patch.object(
+                api, "get_embeddings", side_effect=lambda t: [[0.1]] * len(t)
+            ),
+            TestClient(app) as client,
+        ):
+            upload = client.post(
+                "/api/upload",
+                files={"file": ("words.txt", text, "text/plain")},
+                headers=HEADERS,
+            )
+            document_id = upload.json()["document_id"]
+            listed = client.get(
+                f"/api/documents/{document_id}/chunks",
+                params={"start": 1, "limit": 5},
+                headers=HEADERS,
+            )
+            missing = client.get(
+                "/api/documents/other/chunks", headers=HEADERS
+            )
+
+        assert upload.status_code == 200
+        assert listed.status_code == 200
+        chunks = listed.json()["chunks"]
+        assert [c["ordinal"] for c in chunks] == [1, 2]
+        assert chunks[0]["text"] == " ".join(f"word{i}" for i in range(10, 20))
+        assert missing.status_code == 404
@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from chroma_knowledge_search.backend.app.config import (
+    RELOADABLE,
+    Settings,
+    _reload_hooks,
+    get_settings,
+    reload_settings,
+)
+from chroma_knowledge_search.backend.app.ratelimit import get_limiter
+
+
+@pytest.fixture
+def reload_file(tmp_path):
+    """Point reloads at a temporary file and restore settings after."""
+    settings = get_settings()
+    saved = {name: getattr(settings, name) for name in RELOADABLE}
+    path = tmp_path / "reload.env"
+    with patch.object(settings, "settings_reload_file", str(path)):
+        yield path
+    for name, value in saved.items():
+        setattr(settings, name, value)
+    for hook in _reload_hooks:
+        hook(settings)
+
+
+class TestSettings:
+    """Test validation and hot reload of settings."""
+
+    def test_invalid_values_rejected(self):
+        """Test out-of-range and inconsistent values fail validation."""
+        with pytest.raises(ValidationError):
+            Settings(api_key_rpm=-1)
+        with pytest.raises(ValidationError):
+            Settings(chunk_size=100, chunk_overlap=100)
+
+    def test_normalizes_case(self):
+        """Test choice-like settings are lower-cased."""
+        assert Settings(embedding_provider="Hashing").embedding_provider == (
+            "hashing"
+        )
+
+    def test_reload_applies_safe_subset(self, reload_file):
+        """Test only reloadable settings change on reload."""
+        settings = get_settings()
+        db_url = settings.db_url
+        reload_file.write_text(
+            "SEARCH_MAX_RESULTS=50\n"
+            "OPENAI_MAX_QUEUE_WAIT_S=0.5\n"
+            "DB_URL=postgresql+asyncpg://elsewhere/db\n"
+        )
+
+        changed = reload_settings()
+
+        assert settings.search_max_results == 50
+        assert settings.db_url == db_url
+        assert set(changed) == {
+            "search_max_results",
+            "openai_max_queue_wait_s",
+        }
+        assert get_limiter("embed").max_wait == 0.5
+
+    def test_invalid_reload_keeps_settings(self, reload_file):
+        """Test a bad value leaves every setting untouched."""
+        settings = get_settings()
+        before = settings.search_max_results
+        reload_file.write_text("SEARCH_MAX_RESULTS=25\nCHUNK_SIZE=zero\n")
+
+        with pytest.raises(ValidationError):
+            reload_settings()
+
+        assert settings.search_max_results == before
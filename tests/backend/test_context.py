@@ -0,0 +1,97 @@
+from unittest.mock import patch
+
+import pytest
+
+from chroma_knowledge_search.backend.app import context
+from chroma_knowledge_search.backend.app.context import expand_context
+from chroma_knowledge_search.backend.app.utils import chunk_text
+
+TEXT = " ".join(f"w{i}" for i in range(40))
+
+
+@pytest.fixture
+def store():
+    """Chunks of TEXT (10 words, 3 overlapping) served by ID."""
+    chunks = chunk_text(TEXT, 10, 3)
+    records = {
+        f"doc-{i}": (
+            c["text"],
+            {
+                "document_id": "doc",
+                "ordinal": i,
+                "char_start": c["char_start"],
+                "char_end": c["char_end"],
+            },
+        )
+        for i, c in enumerate(chunks)
+    }
+
+    def get_by_ids(ids, owner_key=None):
+        found = [records[i] for i in ids if i in records]
+        return {
+            "documents": [text for text, _ in found],
+            "metadatas": [meta for _, meta in found],
+        }
+
+    with patch.object(context, "get_by_ids", side_effect=get_by_ids) as fetch:
+        fetch.records = records
+        yield fetch
+
+
+def _hits(store, *ids):
+    records = [store.records[i] for i in ids]
+    return [text for text, _ in records], [meta for _, meta in records]
+
+
+def _words(first: int, last: int) -> str:
+    return " ".join(f"w{i}" for i in range(first, last + 1))
+
+
+class TestExpandContext:
+    """Test query-time expansion of hits with neighboring chunks."""
+
+    def test_neighbors_merged_without_overlap(self, store):
+        """Test a hit and its neighbors become one de-duplicated passage."""
+        docs, metadatas = _hits(store, "doc-2")
+
+        passages, metas = expand_context(
+            docs, metadatas, neighbors=1, token_budget=1000
+        )
+
+        # Chunks start every 7 words: ordinals 1..3 cover w7..w30
+        assert passages == [_words(7, 30)]
+        assert metas == metadatas
+        store.assert_called_once()
+
+    def test_budget_limits_expansion(self, store):
+        """Test neighbors that do not fit the budget are left out."""
+        docs, metadatas = _hits(store, "doc-2")
+
+        passages, _ = expand_context(
+            docs, metadatas, neighbors=2, token_budget=25
+        )
+
+        assert passages == [_words(7, 23)]
+
+    def test_adjacent_hits_share_passage(self, store):
+        """Test overlapping expansions merge and keep the best rank."""
+        docs, metadatas = _hits(store, "doc-3", "doc-1")
+        docs.append("legacy chunk")
+        metadatas.append({"document_id": "old"})
+
+        passages, metas = expand_context(
+            docs, metadatas, neighbors=1, token_budget=1000
+        )
+
+        assert passages == [_words(0, 37), "legacy chunk"]
+        assert metas[0]["ordinal"] == 3
+
+    def test_disabled(self, store):
+        """Test zero neighbors returns the hits untouched."""
+        docs, metadatas = _hits(store, "doc-2")
+
+        assert expand_context(docs, metadatas, neighbors=0) == (
+            docs,
+            metadatas,
+        )
+        store.assert_not_called()
@@ -0,0 +1,83 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import inspect, text
+
+from chroma_knowledge_search.backend.app.db import build_engine
+from chroma_knowledge_search.backend.app.migrations import MIGRATIONS, migrate
+from chroma_knowledge_search.backend.app.models import Base
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    """File-backed SQLite engine built the way the app builds it."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path}/meta.db")
+    yield engine
+    await engine.dispose()
+
+
+class TestMetadataStore:
+    """Test engine tuning and versioned migrations."""
+
+    @pytest.mark.asyncio
+    async def test_sqlite_pragmas(self, engine):
+        """Test file-backed SQLite runs in WAL mode with NORMAL sync."""
+        async with engine.connect() as conn:
+            journal = await conn.scalar(text("PRAGMA journal_mode"))
+            synchronous = await conn.scalar(text("PRAGMA synchronous"))
+            busy_timeout = await conn.scalar(text("PRAGMA busy_timeout"))
+
+        assert journal == "wal"
+        assert synchronous == 1
+        assert busy_timeout > 0
+
+    @pytest.mark.asyncio
+    async def test_migrations_applied_once(self, engine):
+        """Test a fresh database is migrated and a re-run does nothing."""
+        async with engine.begin() as conn:
+            first = await conn.run_sync(migrate)
+        async with engine.begin() as conn:
+            second = await conn.run_sync(migrate)
+            versions = (
+                await conn.execute(
+                    text("SELECT version FROM schema_migrations")
+                )
+            ).scalars()
+
+        assert first == [version for version, _, _ in MIGRATIONS]
+        assert second == []
+        assert sorted(versions) == first
+
+    @pytest.mark.asyncio
+    async def test_migrated_schema_matches_models(self, engine):
+        """Test migrations build every table and column the models use."""
+        async with engine.begin() as conn:
+            await conn.run_sync(migrate)
+            schema = await conn.run_sync(
+                lambda sync_conn: {
+                    table: {
+                        column["name"]
+                        for column in inspect(sync_conn).get_columns(table)
+                    }
+                    for table in inspect(sync_conn).get_table_names()
+                }
+            )
+
+        for table in Base.metadata.sorted_tables:
+            assert set(table.columns.keys()) == schema[table.name]
+
+    @pytest.mark.asyncio
+    async def test_adopts_database_from_create_all(self, engine):
+        """Test a database built before migrations is upgraded in place."""
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                text(
+                    "INSERT INTO documents (id, owner_key, filename) "
+                    "VALUES ('d1', 'owner', 'a.txt')"
+                )
+            )
+        async with engine.begin() as conn:
+            await conn.run_sync(migrate)
+            count = await conn.scalar(text("SELECT COUNT(*) FROM documents"))
+
+        assert count == 1
@@ -1,6 +1,20 @@
 from unittest.mock import Mock, patch
 
-from chroma_knowledge_search.backend.app.embeddings import get_embeddings
+import numpy as np
+import pytest
+
+from chroma_knowledge_search.backend.app.config import get_settings
+from chroma_knowledge_search.backend.app.embeddings import (
+    EmbeddingProvider,
+    HashingEmbeddingProvider,
+    LocalEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    embed_queries,
+    embed_query,
+    get_embeddings,
+    get_provider,
+    set_provider,
+)
 
 
 class TestEmbeddings:
@@ -40,3 +54,126 @@ class TestEmbeddings:
 
             assert len(embeddings) == 1
             assert mock_client.embeddings.create.call_count == 2
+
+    def test_get_embeddings_reduced_dimensions(self):
+        """Test reduced dimensions are requested when configured."""
+        with (
+            patch(
+                "chroma_knowledge_search.backend.app.embeddings.client"
+            ) as mock_client,
+            patch.object(get_settings(), "openai_embed_dimensions", 256),
+        ):
+            mock_client.embeddings.create.return_value = Mock(
+                data=[Mock(embedding=[0.1] * 256)]
+            )
+
+            embeddings = get_embeddings(["test"])
+
+            assert len(embeddings[0]) == 256
+            call_kwargs = mock_client.embeddings.create.call_args.kwargs
+            assert call_kwargs["dimensions"] == 256
+
+    def test_embed_query_cached(self):
+        """Test repeated queries reuse the cached embedding."""
+        with patch(
+            "chroma_knowledge_search.backend.app.embeddings.client"
+        ) as mock_client:
+            mock_client.embeddings.create.return_value = Mock(
+                data=[Mock(embedding=[0.3] * 1536)]
+            )
+
+            first = embed_query("cached  query")
+            second = embed_query(" cached query ")
+
+            assert first == second
+            mock_client.embeddings.create.assert_called_once()
+
+    def test_embed_queries_embeds_misses_once(self):
+        """Test a batch embeds only uncached queries, each once."""
+        with patch(
+            "chroma_knowledge_search.backend.app.embeddings.get_embeddings",
+            side_effect=lambda texts: [[float(len(t))] for t in texts],
+        ) as mock_embed:
+            embed_query("known query")
+            embeddings = embed_queries(["new one", "known  query", "new one"])
+
+        assert embeddings == [[7.0], [11.0], [7.0]]
+        assert mock_embed.call_args_list[-1].args == (["new one"],)
+
+
+class TestEmbeddingProviders:
+    """Test pluggable embedding providers."""
+
+    def test_provider_without_embed_rejected(self):
+        """Test a provider type must implement embed."""
+
+        class Unfinished(EmbeddingProvider):
+            name = "unfinished"
+
+        with pytest.raises(TypeError):
+            Unfinished()
+
+    def test_hashing_provider_deterministic(self):
+        """Test hashing vectors are stable, normalized and word-based."""
+        provider = HashingEmbeddingProvider(dimensions=64)
+
+        first, same, related, other = provider.embed(
+            [
+                "refund the invoice",
+                "refund the invoice",
+                "invoice refund policy",
+                "router firewall",
+            ]
+        )
+
+        assert first == same
+        assert len(first) == 64
+        assert np.isclose(np.linalg.norm(first), 1.0)
+        assert np.dot(first, related) > np.dot(first, other)
+
+    def test_get_embeddings_uses_selected_provider(self):
+        """Test get_embeddings routes through the active provider."""
+        set_provider(HashingEmbeddingProvider(dimensions=32))
+        try:
+            with patch(
+                "chroma_knowledge_search.backend.app.embeddings.client"
+            ) as mock_client:
+                embeddings = get_embeddings(["local text"])
+
+            assert len(embeddings[0]) == 32
+            mock_client.embeddings.create.assert_not_called()
+        finally:
+            set_provider(None)
+
+    def test_unknown_provider_rejected(self):
+        """Test an unknown EMBEDDING_PROVIDER raises."""
+        set_provider(None)
+        with patch.object(
+            get_settings(), "embedding_provider", "carrier-pigeon"
+        ):
+            with pytest.raises(ValueError):
+                get_provider()
+        set_provider(None)
+
+    def test_openai_dimensions_from_model(self):
+        """Test native OpenAI dimensions are known per model."""
+        provider = OpenAIEmbeddingProvider(model="text-embedding-3-large")
+
+        assert provider.dimensions == 3072
+        assert provider.signature == "openai:text-embedding-3-large"
+
+    def test_local_provider_batches(self):
+        """Test local inference runs in fixed-size batches."""
+        provider = LocalEmbeddingProvider(model="test-model", batch_size=2)
+        batches = []
+
+        def encode(batch):
+            batches.append(list(batch))
+            return [[1.0, 0.0] for _ in batch]
+
+        provider.__dict__["_encoder"] = encode
+
+        vectors = provider.embed(["a", "b", "c"])
+
+        assert batches == [["a", "b"], ["c"]]
+        assert vectors == [[1.0, 0.0]] * 3
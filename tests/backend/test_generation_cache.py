@@ -0,0 +1,90 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from chroma_knowledge_search.backend.app import generation_cache, rag
+from chroma_knowledge_search.backend.app.generation_cache import (
+    GenerationCache,
+    fingerprint,
+)
+
+MESSAGES = [{"role": "user", "content": "What is this?"}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """A generation cache in a temporary file, used by rag."""
+    cache = GenerationCache(str(tmp_path / "generation.db"))
+    with (
+        patch.object(generation_cache, "_cache", cache),
+        patch.object(
+            generation_cache.settings, "generation_cache_path", cache.path
+        ),
+    ):
+        yield cache
+
+
+@pytest.fixture
+def chat():
+    """Chat client whose answers count the calls made."""
+    with (
+        patch.object(rag, "client") as mock_client,
+        patch.object(rag, "is_flagged", return_value=False),
+    ):
+        mock_client.chat.completions.create.side_effect = lambda **_: Mock(
+            choices=[
+                Mock(
+                    message=Mock(
+                        content="answer "
+                        f"{mock_client.chat.completions.create.call_count}"
+                    )
+                )
+            ],
+            usage=None,
+        )
+        yield mock_client.chat.completions.create
+
+
+class TestGenerationCache:
+    """Test caching of chat completions by prompt fingerprint."""
+
+    def test_fingerprint(self):
+        """Test the key covers model, temperature and messages."""
+        key = fingerprint("gpt", 0.2, MESSAGES)
+
+        assert key == fingerprint("gpt", 0.2, [dict(m) for m in MESSAGES])
+        assert key != fingerprint("gpt", 0.7, MESSAGES)
+        assert key != fingerprint("other", 0.2, MESSAGES)
+
+    def test_ttl_and_lru_eviction(self, tmp_path):
+        """Test stale entries miss and the least recently read go first."""
+        cache = GenerationCache(str(tmp_path / "g.db"), ttl=60, max_size=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        with patch("time.time", return_value=2e9):
+            assert cache.get("a") is None
+        cache.get("a")
+        cache.put("c", "C")
+
+        assert cache.get("a") == "A"
+        assert cache.get("b") is None
+        assert cache.size() == 2
+
+    def test_repeated_prompt_served_from_cache(self, cache, chat):
+        """Test the same prompt is only sent to the model once."""
+        first = rag.generate_answer(["context"], "question")
+        second = rag.generate_answer(["context"], "question")
+
+        assert first == second == "answer 1"
+        assert chat.call_count == 1
+
+    def test_fresh_and_high_temperature_bypass(self, cache, chat):
+        """Test fresh requests and hot sampling call the model."""
+        rag.generate_answer(["context"], "question")
+        fresh = rag.generate_answer(["context"], "question", fresh=True)
+        with patch.object(rag.settings, "openai_chat_temperature", 1.0):
+            hot = rag.generate_answer(["context"], "question")
+        cached = rag.generate_answer(["context"], "question")
+
+        assert (fresh, hot, cached) == ("answer 2", "answer 3", "answer 2")
+        assert chat.call_count == 3
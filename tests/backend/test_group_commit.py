@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from chroma_knowledge_search.backend.app.db import build_engine
+from chroma_knowledge_search.backend.app.group_commit import GroupCommitWriter
+from chroma_knowledge_search.backend.app.migrations import migrate
+from chroma_knowledge_search.backend.app.models import Document
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    """Session factory for a migrated, file-backed SQLite database."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path}/meta.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(migrate)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _doc(doc_id: str) -> Document:
+    return Document(id=doc_id, owner_key="owner", filename=f"{doc_id}.txt")
+
+
+async def _filenames(session_factory) -> dict:
+    async with session_factory() as session:
+        rows = await session.execute(select(Document.id, Document.filename))
+        return dict(rows.all())
+
+
+class TestGroupCommitWriter:
+    """Test grouping of concurrent metadata writes into one commit."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_share_commit(self, session_factory):
+        """Test writes queued within the window commit together."""
+        writer = GroupCommitWriter(session_factory, window_ms=50)
+
+        await asyncio.gather(*(writer.write(_doc(f"d{i}")) for i in range(20)))
+
+        assert len(await _filenames(session_factory)) == 20
+        assert writer.stats()["commits"] == 1
+        assert writer.stats()["writes"] == 20
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_write_only_fails_its_caller(self, session_factory):
+        """Test a bad row is retried alone and the rest commit."""
+        writer = GroupCommitWriter(session_factory, window_ms=50)
+        await writer.write(_doc("taken"))
+
+        results = await asyncio.gather(
+            writer.write(_doc("a")),
+            writer.write(_doc("taken")),
+            writer.write(_doc("b")),
+            return_exceptions=True,
+        )
+
+        assert results[0] is None and results[2] is None
+        assert isinstance(results[1], IntegrityError)
+        assert set(await _filenames(session_factory)) == {"taken", "a", "b"}
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_statements_applied_in_order(self, session_factory):
+        """Test updates run after the inserts queued before them."""
+        writer = GroupCommitWriter(session_factory, window_ms=50)
+
+        await asyncio.gather(
+            writer.write(_doc("d1")),
+            writer.write(
+                update(Document)
+                .where(Document.id == "d1")
+                .values(filename="renamed.txt")
+            ),
+        )
+
+        assert await _filenames(session_factory) == {"d1": "renamed.txt"}
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_row_limit_flushes_early(self, session_factory):
+        """Test reaching max_rows commits without waiting out the window."""
+        writer = GroupCommitWriter(
+            session_factory, window_ms=10000, max_rows=2
+        )
+
+        await asyncio.wait_for(
+            asyncio.gather(writer.write(_doc("a")), writer.write(_doc("b"))),
+            timeout=2,
+        )
+
+        async with session_factory() as session:
+            count = await session.scalar(
+                select(func.count()).select_from(Document)
+            )
+        assert count == 2
+        await writer.close()
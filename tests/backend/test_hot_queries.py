@@ -0,0 +1,73 @@
+from unittest.mock import patch
+
+from chroma_knowledge_search.backend.app import api, hot_queries
+from chroma_knowledge_search.backend.app.hot_queries import (
+    HeavyHitters,
+    HotQueries,
+)
+
+HEADERS = {"x-api-key": "test-api-key"}
+RESULTS = (["passage"], [{"document_id": "doc"}])
+
+
+class TestHotQueries:
+    """Test tracking and precomputation of recurring queries."""
+
+    def test_heavy_hitters_survive_churn(self):
+        """Test frequent items stay counted among many one-off items."""
+        hitters = HeavyHitters(capacity=10)
+        for i in range(500):
+            hitters.add("hot")
+            hitters.add(f"cold-{i}")
+            if i % 2:
+                hitters.add("warm")
+
+        top = [item for item, _ in hitters.top(2)]
+
+        assert top == ["hot", "warm"]
+
+    def test_hot_query_skips_embed_and_retrieve(self, client):
+        """Test a query that turns hot is served from precomputed work."""
+        tracker = HotQueries()
+        with (
+            patch.object(api, "get_hot_queries", return_value=tracker),
+            patch.object(api.settings, "hot_query_min_count", 2),
+            patch.object(api, "embed_query", return_value=[0.1]) as embed,
+            patch.object(
+                api, "retrieve_context", return_value=RESULTS
+            ) as retrieve,
+            patch.object(api, "generate_answer", return_value="answer"),
+        ):
+            responses = [
+                client.post(
+                    "/api/query", json={"query": "faq?"}, headers=HEADERS
+                )
+                for _ in range(4)
+            ]
+
+        assert all(r.json()["sources"] == ["doc"] for r in responses)
+        assert embed.call_count == 2
+        assert retrieve.call_count == 2
+
+    def test_corpus_change_refreshes_results(self):
+        """Test an upload invalidates results and refresh recomputes them."""
+        tracker = HotQueries()
+        for _ in range(3):
+            tracker.record("owner", "faq?", 5)
+        tracker.offer("owner", "faq?", 5, [0.1], RESULTS, 0)
+        tracker.corpus_changed("owner")
+
+        assert tracker.lookup("owner", "faq?", 5) == ([0.1], None)
+
+        updated = (["new passage"], [{"document_id": "new"}])
+        with (
+            patch.object(hot_queries, "embed_query") as embed,
+            patch.object(
+                hot_queries, "retrieve_context", return_value=updated
+            ) as retrieve,
+        ):
+            assert tracker.refresh("owner") == 1
+
+        assert tracker.lookup("owner", "faq?", 5) == ([0.1], updated)
+        embed.assert_not_called()
+        retrieve.assert_called_once_with([0.1], 5, "owner")
@@ -0,0 +1,158 @@
+import time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from chroma_knowledge_search.backend.app import api
+from chroma_knowledge_search.backend.app.lexical import BM25Index, supports
+from chroma_knowledge_search.backend.app.main import app
+from chroma_knowledge_search.backend.app.ratelimit import RateLimitExceeded
+from chroma_knowledge_search.backend.app.schemas import QueryFilters
+
+HEADERS = {"x-api-key": "test-api-key"}
+
+
+def _index() -> BM25Index:
+    docs = [
+        "the cat sat on the mat",
+        "quarterly revenue grew in the third quarter",
+        "revenue targets for the cat food line",
+    ]
+    metadatas = [
+        {"document_id": doc, "ordinal": 0, "page": page}
+        for doc, page in (("a", 1), ("b", 1), ("c", 2))
+    ]
+    return BM25Index(docs, metadatas)
+
+
+class TestLexicalFallback:
+    """Test BM25 retrieval used when query embeddings are late."""
+
+    def test_bm25_ranking_and_filters(self):
+        """Test term matches rank chunks and filters narrow them."""
+        index = _index()
+
+        docs, metadatas = index.search("quarterly revenue", top_k=2)
+        _, filtered = index.search(
+            "quarterly revenue", top_k=2, filters=QueryFilters(pages=[2])
+        )
+
+        assert docs[0] == "quarterly revenue grew in the third quarter"
+        assert [m["document_id"] for m in metadatas] == ["b", "c"]
+        assert [m["document_id"] for m in filtered] == ["c"]
+        assert supports(QueryFilters(pages=[2]))
+        assert not supports(QueryFilters(section="Intro"))
+
+    def test_slow_embedding_served_lexically(self, mock_chroma):
+        """Test a query whose embedding misses the deadline still answers."""
+
+        def slow_embed(text):
+            time.sleep(0.5)
+            return [0.1]
+
+        with (
+            patch.object(api.settings, "query_embed_deadline_s", 0.05),
+            patch.object(
+                api, "get_embeddings", side_effect=lambda t: [[0.1]] * len(t)
+            ),
+            patch.object(api, "embed_query", side_effect=slow_embed),
+            patch.object(api, "generate_answer", return_value="answer"),
+            TestClient(app) as client,
+        ):
+            upload = client.post(
+                "/api/upload",
+                files={
+                    "file": (
+                        "zebra.txt",
+                        "zebras migrate across the savanna",
+                        "text/plain",
+                    )
+                },
+                headers=HEADERS,
+            )
+            started = time.perf_counter()
+            response = client.post(
+                "/api/query",
+                json={"query": "where do zebras migrate"},
+                headers=HEADERS,
+            )
+            elapsed = time.perf_counter() - started
+
+        assert response.status_code == 200
+        assert response.json()["retrieval"] == "lexical"
+        assert response.json()["sources"] == [upload.json()["document_id"]]
+        assert elapsed < 0.5
+
+    def test_slow_batch_embedding_served_lexically(self, mock_chroma):
+        """Test a batch whose embeddings miss the deadline still answers."""
+
+        def slow_embed(texts):
+            time.sleep(0.5)
+            return [[0.1]] * len(texts)
+
+        with (
+            patch.object(api.settings, "query_embed_deadline_s", 0.05),
+            patch.object(
+                api, "get_embeddings", side_effect=lambda t: [[0.1]] * len(t)
+            ),
+            patch.object(api, "embed_queries", side_effect=slow_embed),
+            patch.object(api, "generate_answer", return_value="answer"),
+            TestClient(app) as client,
+        ):
+            upload = client.post(
+                "/api/upload",
+                files={
+                    "file": (
+                        "gnu.txt",
+                        "wildebeest graze on the plains",
+                        "text/plain",
+                    )
+                },
+                headers=HEADERS,
+            )
+            response = client.post(
+                "/api/query/batch",
+                json={"queries": ["where do wildebeest graze"]},
+                headers=HEADERS,
+            )
+
+        assert response.status_code == 200
+        item = response.json()["results"][0]
+        assert item["retrieval"] == "lexical"
+        assert item["sources"] == [upload.json()["document_id"]]
+        assert item["answer"] == "answer"
+
+    def test_failed_embedding_served_lexically(self, mock_chroma):
+        """Test a query whose embedding call is shed still answers."""
+        with (
+            patch.object(
+                api, "get_embeddings", side_effect=lambda t: [[0.1]] * len(t)
+            ),
+            patch.object(
+                api,
+                "embed_query",
+                side_effect=RateLimitExceeded("embeddings", 1.0),
+            ),
+            patch.object(api, "generate_answer", return_value="answer"),
+            TestClient(app) as client,
+        ):
+            upload = client.post(
+                "/api/upload",
+                files={
+                    "file": (
+                        "heron.txt",
+                        "herons wade in shallow water",
+                        "text/plain",
+                    )
+                },
+                headers=HEADERS,
+            )
+            response = client.post(
+                "/api/query",
+                json={"query": "where do herons wade"},
+                headers=HEADERS,
+            )
+
+        assert response.status_code == 200
+        assert response.json()["retrieval"] == "lexical"
+        assert response.json()["sources"] == [upload.json()["document_id"]]
@@ -0,0 +1,96 @@
+import json
+import logging
+import sys
+
+from chroma_knowledge_search.backend.app.logging_config import (
+    JsonFormatter,
+    RateLimitFilter,
+    RequestContextFilter,
+    request_id_var,
+)
+
+
+def make_record(msg, *args, level=logging.INFO, **extra):
+    record = logging.LogRecord(
+        "test.logger", level, __file__, 1, msg, args, None
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJsonFormatter:
+    """Test structured log output."""
+
+    def test_lazy_args_and_extra_fields(self):
+        """Test arguments are merged and extra fields are kept."""
+        record = make_record("Created %d chunks", 3, document_id="doc-1")
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["message"] == "Created 3 chunks"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "test.logger"
+        assert entry["document_id"] == "doc-1"
+
+    def test_exception_included(self):
+        """Test exception tracebacks are rendered into the entry."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = make_record("failed", level=logging.ERROR)
+            record.exc_info = sys.exc_info()
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert "ValueError: boom" in entry["exception"]
+
+
+class TestRequestContextFilter:
+    """Test request ID propagation onto records."""
+
+    def test_request_id_attached(self):
+        """Test the current request ID is stamped on records."""
+        token = request_id_var.set("req-123")
+        try:
+            record = make_record("hello")
+            RequestContextFilter().filter(record)
+        finally:
+            request_id_var.reset(token)
+
+        assert record.request_id == "req-123"
+
+    def test_request_id_header_echoed(self, client):
+        """Test the API echoes an incoming X-Request-ID."""
+        response = client.get("/health", headers={"X-Request-ID": "abc"})
+
+        assert response.headers["X-Request-ID"] == "abc"
+
+
+class TestRateLimitFilter:
+    """Test per-template rate limiting."""
+
+    def test_excess_dropped_and_counted(self):
+        """Test records past the burst are dropped and reported."""
+        limiter = RateLimitFilter(rate=0.001, burst=2)
+
+        passed = [limiter.filter(make_record("hot %d", i)) for i in range(5)]
+        assert passed == [True, True, False, False, False]
+
+        limiter._buckets[(logging.INFO, "hot %d")][0] = 1
+        record = make_record("hot %d", 5)
+        assert limiter.filter(record)
+        assert record.suppressed == 3
+
+    def test_templates_limited_independently(self):
+        """Test one noisy message does not starve another."""
+        limiter = RateLimitFilter(rate=0.001, burst=1)
+
+        assert limiter.filter(make_record("noisy"))
+        assert not limiter.filter(make_record("noisy"))
+        assert limiter.filter(make_record("quiet"))
+
+    def test_errors_always_pass(self):
+        """Test ERROR records bypass the limit."""
+        limiter = RateLimitFilter(rate=0.001, burst=0)
+
+        assert limiter.filter(make_record("bad", level=logging.ERROR))
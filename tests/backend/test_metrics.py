@@ -0,0 +1,140 @@
+import pytest
+
+from chroma_knowledge_search.backend.app.metrics import (
+    STAGE_LATENCY,
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    _Metric,
+    timed,
+)
+
+
+class TestMetrics:
+    """Test metric types and text rendering."""
+
+    def test_counter_and_gauge_render(self):
+        """Test counters and gauges render with labels."""
+        registry = Registry()
+        counter = Counter("requests_total", "Requests", ("route",), registry)
+        gauge = Gauge("in_flight", "In flight", registry=registry)
+
+        counter.labels(route="/api/query").inc()
+        counter.labels(route="/api/query").inc(2)
+        gauge.inc()
+        gauge.dec()
+
+        text = registry.render()
+
+        assert "# TYPE knowledge_search_requests_total counter" in text
+        assert (
+            'knowledge_search_requests_total{route="/api/query"} 3.0' in text
+        )
+        assert "knowledge_search_in_flight 0.0" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count."""
+        registry = Registry()
+        histogram = Histogram(
+            "latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry
+        )
+
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        text = registry.render()
+
+        assert 'knowledge_search_latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'knowledge_search_latency_seconds_bucket{le="1.0"} 2' in text
+        assert 'knowledge_search_latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "knowledge_search_latency_seconds_count 3" in text
+
+    def test_label_values_are_escaped(self):
+        """Test quotes in label values are escaped."""
+        registry = Registry()
+        counter = Counter("errors_total", "Errors", ("kind",), registry)
+
+        counter.labels(kind='bad "value"').inc()
+
+        assert 'kind="bad \\"value\\""' in registry.render()
+
+    def test_metric_without_child_type_rejected(self):
+        """Test a metric type must say what its children are."""
+
+        class Untyped(_Metric):
+            pass
+
+        with pytest.raises(TypeError):
+            Untyped("untyped", "Untyped", registry=Registry())
+
+
+class TestTimed:
+    """Test the stage timing API."""
+
+    def test_context_manager(self):
+        """Test timing a block records one observation."""
+        child = STAGE_LATENCY.labels(stage="test_block")
+        before = child.count()
+
+        with timed("test_block"):
+            pass
+
+        assert child.count() == before + 1
+
+    def test_sync_decorator(self):
+        """Test decorating a function times every call."""
+        child = STAGE_LATENCY.labels(stage="test_sync")
+        before = child.count()
+
+        @timed("test_sync")
+        def work(x):
+            return x + 1
+
+        assert work(1) == 2
+        assert child.count() == before + 1
+
+    @pytest.mark.asyncio
+    async def test_async_decorator(self):
+        """Test decorating a coroutine function keeps it awaitable."""
+        child = STAGE_LATENCY.labels(stage="test_async")
+        before = child.count()
+
+        @timed("test_async")
+        async def work(x):
+            return x * 2
+
+        assert await work(2) == 4
+        assert child.count() == before + 1
+
+    def test_exception_still_recorded(self):
+        """Test failures are timed too."""
+        child = STAGE_LATENCY.labels(stage="test_error")
+        before = child.count()
+
+        with pytest.raises(ValueError):
+            with timed("test_error"):
+                raise ValueError("boom")
+
+        assert child.count() == before + 1
+
+
+class TestMetricsEndpoint:
+    """Test the /metrics endpoint."""
+
+    def test_metrics_after_query(self, client, mock_openai, mock_chroma):
+        """Test stage histograms are exported after a query."""
+        client.post(
+            "/api/query",
+            json={"query": "metrics question"},
+            headers={"x-api-key": "test-api-key"},
+        )
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'stage="retrieve"' in response.text
+        assert 'stage="generate"' in response.text
+        assert "knowledge_search_http_requests_in_flight" in response.text
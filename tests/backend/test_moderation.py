@@ -1,6 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch
 
-from chroma_knowledge_search.backend.app.moderation import is_flagged
+from chroma_knowledge_search.backend.app.moderation import (
+    ModerationService,
+    is_flagged,
+)
 
 
 class TestModeration:
@@ -63,3 +67,91 @@ class TestModeration:
             result = is_flagged("Test content")
 
             assert result is False
+
+
+class TestModerationService:
+    """Test moderation caching and batching."""
+
+    def test_uses_configured_model(self):
+        """Test the configured moderation model is sent."""
+        with patch(
+            "chroma_knowledge_search.backend.app.moderation.client"
+        ) as mock_client:
+            mock_client.moderations.create.return_value = Mock(
+                results=[Mock(flagged=False)]
+            )
+            service = ModerationService(model="text-moderation-stable")
+
+            service.check("hello")
+
+            call_kwargs = mock_client.moderations.create.call_args.kwargs
+            assert call_kwargs["model"] == "text-moderation-stable"
+            assert call_kwargs["input"] == ["hello"]
+
+    def test_cache_hit_skips_api(self):
+        """Test a repeated text is served from the cache."""
+        with patch(
+            "chroma_knowledge_search.backend.app.moderation.client"
+        ) as mock_client:
+            mock_client.moderations.create.return_value = Mock(
+                results=[Mock(flagged=True)]
+            )
+            service = ModerationService(window_ms=0)
+
+            assert service.check("same text") is True
+            assert service.check("same text") is True
+
+            mock_client.moderations.create.assert_called_once()
+            stats = service.stats()
+            assert stats["cache_hits"] == 1
+            assert stats["cache_misses"] == 1
+
+    def test_expired_entry_is_refetched(self):
+        """Test entries older than the TTL are checked again."""
+        with patch(
+            "chroma_knowledge_search.backend.app.moderation.client"
+        ) as mock_client:
+            mock_client.moderations.create.return_value = Mock(
+                results=[Mock(flagged=False)]
+            )
+            service = ModerationService(ttl=-1, window_ms=0)
+
+            service.check("text")
+            service.check("text")
+
+            assert mock_client.moderations.create.call_count == 2
+
+    def test_check_many_batches_and_dedupes(self):
+        """Test list input is sent once with duplicates removed."""
+        with patch(
+            "chroma_knowledge_search.backend.app.moderation.client"
+        ) as mock_client:
+            mock_client.moderations.create.return_value = Mock(
+                results=[Mock(flagged=False), Mock(flagged=True)]
+            )
+            service = ModerationService(window_ms=0)
+
+            flags = service.check_many(["a", "b", "a"])
+
+            assert flags == [False, True, False]
+            call_kwargs = mock_client.moderations.create.call_args.kwargs
+            assert call_kwargs["input"] == ["a", "b"]
+
+    def test_concurrent_checks_are_coalesced(self):
+        """Test checks arriving within the window share one API call."""
+        with patch(
+            "chroma_knowledge_search.backend.app.moderation.client"
+        ) as mock_client:
+            mock_client.moderations.create.side_effect = lambda **kw: Mock(
+                results=[Mock(flagged=False) for _ in kw["input"]]
+            )
+            service = ModerationService(window_ms=200)
+
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                flags = list(
+                    pool.map(service.check, [f"text {i}" for i in range(8)])
+                )
+
+            assert flags == [False] * 8
+            assert mock_client.moderations.create.call_count < 8
+            assert service.stats()["api_inputs"] == 8
@@ -0,0 +1,162 @@
+import hashlib
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from chroma_knowledge_search.backend.app import quotas
+from chroma_knowledge_search.backend.app.quotas import (
+    MemoryQuotaStore,
+    QuotaExceeded,
+    SQLiteQuotaStore,
+    admit,
+    off_loop,
+)
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def store():
+    """Give each test an empty in-memory quota store."""
+    fresh = MemoryQuotaStore()
+    with patch.object(quotas, "_store", fresh):
+        yield fresh
+
+
+class TestQuotaStores:
+    """Test the in-memory and SQLite quota stores."""
+
+    @pytest.mark.parametrize("backend", ["memory", "sqlite"])
+    def test_bucket_and_slots(self, backend, tmp_path):
+        """Test buckets run dry and slots are capped and released."""
+        if backend == "sqlite":
+            store = SQLiteQuotaStore(str(tmp_path / "quotas.db"))
+        else:
+            store = MemoryQuotaStore()
+
+        assert store.take("k", "requests", 1, 1.0, 2) == 0
+        assert store.take("k", "requests", 1, 1.0, 2) == 0
+        assert store.take("k", "requests", 1, 1.0, 2) > 0
+        assert store.take("other", "requests", 1, 1.0, 2) == 0
+
+        first = store.acquire_slot("k", 2)
+        assert store.acquire_slot("k", 2) is not None
+        assert store.acquire_slot("k", 2) is None
+        store.release_slot("k", first)
+        assert store.acquire_slot("k", 2) is not None
+
+    def test_sqlite_shared_between_workers(self, tmp_path):
+        """Test two stores on one file share the same limits."""
+        path = str(tmp_path / "quotas.db")
+        worker_a = SQLiteQuotaStore(path)
+        worker_b = SQLiteQuotaStore(path)
+
+        assert worker_a.acquire_slot("k", 1) is not None
+        assert worker_b.acquire_slot("k", 1) is None
+
+
+class TestOffLoop:
+    """Test quota calls from the event loop."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend", ["memory", "sqlite"])
+    async def test_blocking_store_runs_in_thread(self, backend, tmp_path):
+        """Test only the SQLite store is called off the event loop."""
+        if backend == "sqlite":
+            store = SQLiteQuotaStore(str(tmp_path / "quotas.db"))
+        else:
+            store = MemoryQuotaStore()
+
+        with patch.object(quotas, "_store", store):
+            thread = await off_loop(threading.get_ident)
+
+        assert (thread != threading.get_ident()) == (backend == "sqlite")
+
+
+class TestAdmit:
+    """Test per-key admission decisions."""
+
+    def test_upload_requires_length(self, store):
+        """Test uploads without Content-Length are refused."""
+        with pytest.raises(QuotaExceeded) as exc_info:
+            admit("owner", None, is_upload=True)
+        assert exc_info.value.status_code == 411
+
+    def test_upload_too_large(self, store):
+        """Test oversized uploads are refused from the header."""
+        with pytest.raises(QuotaExceeded) as exc_info:
+            admit("owner", 100 * MB, is_upload=True)
+        assert exc_info.value.status_code == 413
+
+    def test_upload_bytes_weighted(self, store):
+        """Test large uploads drain the byte budget faster."""
+        with (
+            patch.object(quotas.settings, "api_key_upload_mb_per_min", 20),
+            patch.object(quotas.settings, "api_key_max_concurrent_uploads", 2),
+        ):
+            admit("owner", 15 * MB, is_upload=True)
+            with pytest.raises(QuotaExceeded) as exc_info:
+                admit("owner", 10 * MB, is_upload=True)
+            lease = admit("owner", 1 * MB, is_upload=True)
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.retry_after > 0
+        assert lease is not None
+
+    def test_rejected_upload_releases_slot(self, store):
+        """Test a budget rejection does not leak a concurrency slot."""
+        with (
+            patch.object(quotas.settings, "api_key_upload_mb_per_min", 1),
+            patch.object(quotas.settings, "api_key_max_concurrent_uploads", 2),
+        ):
+            admit("owner", 14 * MB, is_upload=True)
+            with pytest.raises(QuotaExceeded) as exc_info:
+                admit("owner", 14 * MB, is_upload=True)
+
+        assert exc_info.value.detail == "Upload volume limit exceeded"
+        assert len(store._leases["owner"]) == 1
+
+
+class TestQuotaMiddleware:
+    """Test quotas applied by the API before the body is read."""
+
+    def test_request_rate_limited(self, client, store, mock_chroma):
+        """Test a key over its request rate gets 429 with Retry-After."""
+        headers = {"x-api-key": "test-api-key"}
+        with (
+            patch.object(quotas.settings, "api_key_rpm", 60),
+            patch.object(quotas.settings, "api_key_burst", 1),
+        ):
+            first = client.post(
+                "/api/search", json={"query": "a"}, headers=headers
+            )
+            second = client.post(
+                "/api/search", json={"query": "a"}, headers=headers
+            )
+
+        assert first.status_code != 429
+        assert second.status_code == 429
+        assert int(second.headers["Retry-After"]) >= 1
+
+    def test_concurrent_uploads_capped(self, client, store):
+        """Test an upload over the slot cap is refused unprocessed."""
+        owner = hashlib.sha256(b"test-api-key").hexdigest()
+        store.acquire_slot(owner, 2)
+        store.acquire_slot(owner, 2)
+
+        with (
+            patch.object(quotas.settings, "api_key_max_concurrent_uploads", 2),
+            patch(
+                "chroma_knowledge_search.backend.app.api.extract_text_from_file"
+            ) as mock_extract,
+        ):
+            response = client.post(
+                "/api/upload",
+                files={"file": ("a.txt", b"some text", "text/plain")},
+                headers={"x-api-key": "test-api-key"},
+            )
+
+        assert response.status_code == 429
+        assert response.json()["detail"] == "Too many concurrent uploads"
+        mock_extract.assert_not_called()
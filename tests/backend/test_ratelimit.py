@@ -0,0 +1,157 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from chroma_knowledge_search.backend.app import ratelimit
+from chroma_knowledge_search.backend.app.ratelimit import (
+    AdaptiveLimiter,
+    RateLimitExceeded,
+    TokenBucket,
+    get_limiter,
+    retry_after_seconds,
+)
+
+
+class RateLimitError(Exception):
+    """Stand-in for openai.RateLimitError."""
+
+    status_code = 429
+
+    def __init__(self, retry_after="2"):
+        super().__init__("429")
+        self.response = Mock(headers={"retry-after": retry_after})
+
+
+class TestTokenBucket:
+    """Test the token bucket."""
+
+    def test_wait_time(self):
+        """Test the wait for an empty bucket follows the refill rate."""
+        bucket = TokenBucket(rate=10, capacity=10)
+        now = bucket.updated
+
+        bucket.take(10, now)
+
+        assert bucket.wait_time(5, now) == pytest.approx(0.5)
+        assert bucket.wait_time(5, now + 0.5) == pytest.approx(0.0)
+
+    def test_unlimited(self):
+        """Test a zero rate never waits."""
+        bucket = TokenBucket(rate=0, capacity=0)
+
+        bucket.take(1000, bucket.updated)
+
+        assert bucket.wait_time(1000, bucket.updated) == 0.0
+
+
+class TestAdaptiveLimiter:
+    """Test admission, shedding and AIMD adaptation."""
+
+    def test_sheds_when_budget_exhausted(self):
+        """Test a call that cannot be admitted in time fails fast."""
+        limiter = AdaptiveLimiter("test", rpm=60, max_wait=0.1)
+        with limiter.slot():
+            pass
+
+        with pytest.raises(RateLimitExceeded) as exc_info:
+            limiter.acquire()
+
+        assert exc_info.value.retry_after == pytest.approx(1.0, abs=0.05)
+
+    def test_sheds_when_concurrency_full(self):
+        """Test callers beyond the concurrency limit time out."""
+        limiter = AdaptiveLimiter("test", max_concurrency=1, max_wait=0.05)
+        limiter.acquire()
+
+        with pytest.raises(RateLimitExceeded):
+            limiter.acquire()
+
+        limiter.release(0.01)
+        limiter.acquire()
+
+    def test_429_halves_limit_and_pauses(self):
+        """Test a 429 halves concurrency and honours Retry-After."""
+        limiter = AdaptiveLimiter("test", max_concurrency=8, max_wait=0.1)
+
+        with pytest.raises(RateLimitError):
+            with limiter.slot():
+                raise RateLimitError(retry_after="2")
+
+        assert limiter.limit == 4
+        assert limiter.stats()["cooling_down"]
+        with pytest.raises(RateLimitExceeded):
+            limiter.acquire()
+
+    def test_additive_increase(self):
+        """Test fast successes grow the limit back towards the maximum."""
+        limiter = AdaptiveLimiter("test", max_concurrency=4)
+        limiter.limit = 2.0
+
+        for _ in range(20):
+            with limiter.slot():
+                pass
+
+        assert limiter.limit == 4
+
+    def test_slow_calls_decrease_limit(self):
+        """Test calls over the latency target shrink the limit."""
+        limiter = AdaptiveLimiter(
+            "test", max_concurrency=10, latency_target=0.0
+        )
+
+        with limiter.slot():
+            pass
+
+        assert limiter.limit == pytest.approx(9.0)
+
+    def test_actual_usage_corrects_estimate(self):
+        """Test reported token usage replaces the estimate."""
+        limiter = AdaptiveLimiter("test", tpm=6000)
+
+        with limiter.slot(tokens=10) as slot:
+            slot.used(60)
+
+        assert limiter.tokens.tokens == pytest.approx(40, abs=1)
+
+    def test_budget_split_between_workers(self):
+        """Test each worker paces itself to its share of the budget."""
+        with (
+            patch.dict(ratelimit._limiters, clear=True),
+            patch.object(ratelimit.settings, "web_concurrency", 4),
+            patch.object(ratelimit.settings, "openai_embed_rpm", 480),
+            patch.object(ratelimit.settings, "openai_embed_tpm", 240000),
+        ):
+            limiter = get_limiter("embed")
+
+        assert limiter.requests.rate == pytest.approx(2.0)
+        assert limiter.tokens.rate == pytest.approx(1000.0)
+
+    def test_retry_after_ms_header(self):
+        """Test millisecond Retry-After headers are preferred."""
+        error = RateLimitError()
+        error.response.headers = {"retry-after-ms": "250"}
+
+        assert retry_after_seconds(error) == 0.25
+
+
+class TestUpstreamSaturation:
+    """Test the API's response when OpenAI capacity is exhausted."""
+
+    def test_query_returns_503(self, client, mock_chroma):
+        """Test a shed call returns 503 when lexical search cannot help."""
+        with patch(
+            "chroma_knowledge_search.backend.app.api.embed_query",
+            side_effect=RateLimitExceeded("embed", 2.5),
+        ):
+            # Sections are only known to the vector store
+            response = client.post(
+                "/api/query",
+                json={
+                    "query": "saturated question",
+                    "filters": {"section": "Intro"},
+                },
+                headers={"x-api-key": "test-api-key"},
+            )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+from chroma_knowledge_search.backend.app.main import app
+from chroma_knowledge_search.backend.app.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent identical calls."""
+
+    @pytest.mark.asyncio
+    async def test_duplicates_share_one_call(self):
+        """Test concurrent callers with one key run fn once."""
+        flight = SingleFlight("test")
+        calls = []
+
+        async def work(value):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            return value * 2
+
+        results = await asyncio.gather(
+            *(flight.do("key", work, 21) for _ in range(10))
+        )
+
+        assert results == [42] * 10
+        assert calls == [21]
+        assert flight.stats() == {"executions": 1, "shared": 9, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_distinct_keys_run_separately(self):
+        """Test different keys are not coalesced."""
+        flight = SingleFlight("test")
+
+        async def work(value):
+            await asyncio.sleep(0)
+            return value
+
+        results = await asyncio.gather(
+            flight.do("a", work, 1), flight.do("b", work, 2)
+        )
+
+        assert results == [1, 2]
+        assert flight.stats()["executions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_all_waiters(self):
+        """Test a failure is raised to every waiting caller."""
+        flight = SingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            flight.do("key", fail),
+            flight.do("key", fail),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.stats()["in_flight"] == 0
+
+
+class TestQueryCoalescing:
+    """Load test duplicate queries against the API."""
+
+    @pytest.mark.asyncio
+    async def test_burst_of_duplicate_queries(self, mock_chroma):
+        """Test a burst of identical queries makes one call per stage."""
+
+        def slow_embedding(**kwargs):
+            time.sleep(0.05)
+            return Mock(data=[Mock(embedding=[0.1] * 1536)])
+
+        with (
+            patch(
+                "chroma_knowledge_search.backend.app.embeddings.client"
+            ) as mock_embed_client,
+            patch(
+                "chroma_knowledge_search.backend.app.rag.client"
+            ) as mock_chat_client,
+        ):
+            mock_embed_client.embeddings.create.side_effect = slow_embedding
+            mock_chat_client.chat.completions.create.return_value = Mock(
+                choices=[Mock(message=Mock(content="Shared answer"))]
+            )
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                responses = await asyncio.gather(
+                    *(
+                        client.post(
+                            "/api/query",
+                            json={"query": "What is the burst question?"},
+                            headers={"x-api-key": "test-api-key"},
+                        )
+                        for _ in range(20)
+                    )
+                )
+
+        assert all(r.status_code == 200 for r in responses)
+        assert {r.json()["answer"] for r in responses} == {"Shared answer"}
+        assert mock_embed_client.embeddings.create.call_count == 1
+        mock_collection = mock_chroma.get_collection.return_value
+        assert mock_collection.query.call_count == 1
+        assert mock_chat_client.chat.completions.create.call_count == 1
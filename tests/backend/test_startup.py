@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from chroma_knowledge_search.backend.app import main
+from chroma_knowledge_search.backend.app.config import load_config
+
+
+class TestStartup:
+    """Test worker start-up work is deferred or done once."""
+
+    def test_heavy_dependencies_not_imported(self):
+        """Test importing the app leaves SDKs and parsers unloaded."""
+        code = (
+            "import sys\n"
+            "import chroma_knowledge_search.backend.app.main\n"
+            "print(','.join(m for m in "
+            "('chromadb', 'openai', 'docx', 'pdfminer') "
+            "if m in sys.modules))"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+
+        assert proc.stdout.strip() == ""
+
+    def test_config_loaded_once(self):
+        """Test repeated load_config calls do not re-read the file."""
+        load_config()
+        with patch("pathlib.Path.exists") as mock_exists:
+            load_config()
+
+        mock_exists.assert_not_called()
+
+    def test_prewarm_in_lifespan(self, mock_chroma):
+        """Test PREWARM builds clients before the first request."""
+        with (
+            patch.object(main.settings, "prewarm", True),
+            patch.object(main, "get_openai_client") as mock_client,
+            patch.object(main, "load_parsers") as mock_parsers,
+        ):
+            with TestClient(main.app):
+                pass
+
+        mock_client.assert_called_once()
+        mock_parsers.assert_called_once()
+        mock_chroma.get_collection.assert_called()
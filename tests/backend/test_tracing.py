@@ -0,0 +1,98 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from chroma_knowledge_search.backend.app import tracing
+from chroma_knowledge_search.backend.app.main import app
+from chroma_knowledge_search.backend.app.metrics import timed
+
+
+@pytest.fixture
+def span_exporter():
+    """Route spans to an in-memory exporter for the test."""
+    exporter = tracing.configure_tracing(exporter="memory")
+    yield exporter
+    tracing.configure_tracing(exporter="none")
+
+
+class TestTracing:
+    """Test OpenTelemetry span creation."""
+
+    def test_disabled_tracing_is_noop(self):
+        """Test spans are no-ops when no exporter is configured."""
+        tracing.configure_tracing(exporter="none")
+
+        with tracing.span("noop") as current:
+            tracing.set_attributes({"ignored": 1})
+
+        assert current is None
+        assert tracing.current_trace_id() is None
+
+    def test_timed_stage_creates_span(self, span_exporter):
+        """Test timed stages are exported as spans with attributes."""
+        with timed("embed"):
+            tracing.set_attributes({"embedding.batch_size": 3})
+
+        spans = span_exporter.get_finished_spans()
+        assert [s.name for s in spans] == ["embed"]
+        assert spans[0].attributes["embedding.batch_size"] == 3
+
+    def test_sampled_out_spans_not_exported(self):
+        """Test a zero sample ratio records nothing."""
+        exporter = tracing.configure_tracing(
+            exporter="memory", sample_ratio=0.0
+        )
+        try:
+            with timed("retrieve"):
+                tracing.set_attributes({"retrieve.top_k": 5})
+
+            assert exporter.get_finished_spans() == ()
+        finally:
+            tracing.configure_tracing(exporter="none")
+
+    def test_unknown_exporter(self):
+        """Test an unknown exporter name is rejected."""
+        with pytest.raises(ValueError):
+            tracing.configure_tracing(exporter="carrier-pigeon")
+        tracing.configure_tracing(exporter="none")
+
+
+class TestRequestTracing:
+    """Test spans across the API pipelines."""
+
+    def test_upload_spans(self, mock_openai, mock_chroma, span_exporter):
+        """Test an upload produces stage spans under the request span."""
+        # Entering the client runs the lifespan, which creates the tables
+        with TestClient(app) as client:
+            response = client.post(
+                "/api/upload",
+                files={
+                    "file": ("notes.txt", b"some words to index", "text/plain")
+                },
+                headers={"x-api-key": "test-api-key"},
+            )
+
+        assert response.status_code == 200
+        spans = {s.name: s for s in span_exporter.get_finished_spans()}
+        assert {"extract", "chunk", "embed", "upsert"} <= set(spans)
+        request = spans["POST /api/upload"]
+        assert request.attributes["upload.chunks"] == 1
+        assert spans["upsert"].attributes["chunk.count"] == 1
+        assert spans["embed"].parent.span_id == request.context.span_id
+        assert response.headers["X-Trace-Id"] == (
+            f"{request.context.trace_id:032x}"
+        )
+
+    def test_query_spans(
+        self, client, mock_openai, mock_chroma, span_exporter
+    ):
+        """Test a query records retrieval and chat spans."""
+        client.post(
+            "/api/query",
+            json={"query": "traced question", "top_k": 4},
+            headers={"x-api-key": "test-api-key"},
+        )
+
+        spans = {s.name: s for s in span_exporter.get_finished_spans()}
+        assert spans["retrieve"].attributes["retrieve.top_k"] == 4
+        assert {"moderate", "generate"} <= set(spans)
+        assert spans["POST /api/query"].attributes["http.status_code"] == 200
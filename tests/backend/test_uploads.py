@@ -0,0 +1,107 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from chroma_knowledge_search.backend.app import api
+from chroma_knowledge_search.backend.app.main import app
+from chroma_knowledge_search.backend.app.ratelimit import RateLimitExceeded
+from chroma_knowledge_search.backend.app.uploads import document_id_for
+
+TEXT = " ".join(f"word{i}" for i in range(50))
+
+
+def _post(client, key: str, content: str = TEXT):
+    return client.post(
+        "/api/upload",
+        files={"file": ("words.txt", content, "text/plain")},
+        headers={"x-api-key": "test-api-key", "Idempotency-Key": key},
+    )
+
+
+class Embedder:
+    """Embedding stub recording its calls, failing after ``fail_after``."""
+
+    def __init__(self):
+        self.calls = []
+        self.fail_after = None
+
+    def __call__(self, texts):
+        self.calls.append(texts)
+        if self.fail_after is not None and len(self.calls) > self.fail_after:
+            raise RateLimitExceeded("embeddings", 1.0)
+        return [[0.1]] * len(texts)
+
+
+@pytest.fixture
+def embedder():
+    """Embedder over five 10-word chunks, stored two at a time."""
+    embed = Embedder()
+    with (
+        patch.object(api.settings, "chunk_size", 10),
+        patch.object(api.settings, "chunk_overlap", 0),
+        patch.object(api.settings, "upload_embed_batch_size", 2),
+        patch.object(api, "get_embeddings", side_effect=embed),
+    ):
+        yield embed
+
+
+def _stored_ids(mock_chroma) -> list[str]:
+    collection = mock_chroma.get_collection.return_value
+    return [
+        i for call in collection.add.call_args_list for i in call.kwargs["ids"]
+    ]
+
+
+class TestIdempotentUploads:
+    """Test uploads retried under an Idempotency-Key header."""
+
+    def test_retry_resumes_after_last_batch(self, mock_chroma, embedder):
+        """Test a failed upload resumes without re-embedding stored chunks."""
+        embedder.fail_after = 1
+        with TestClient(app) as client:
+            failed = _post(client, "resume-key")
+            embedder.fail_after = None
+            retried = _post(client, "resume-key")
+
+        assert failed.status_code == 503
+        assert retried.status_code == 200
+        document_id = retried.json()["document_id"]
+        assert retried.json()["chunks_indexed"] == 5
+        # Chunks 0-1 were stored before the failure and never redone
+        assert embedder.calls[2][0].startswith("word20 ")
+        assert _stored_ids(mock_chroma) == [
+            f"{document_id}-{i}" for i in range(5)
+        ]
+
+    def test_completed_upload_replayed(self, mock_chroma, embedder):
+        """Test a retry of a finished upload returns its original result."""
+        with TestClient(app) as client:
+            first = _post(client, "done-key")
+            calls = len(embedder.calls)
+            second = _post(client, "done-key")
+
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert len(embedder.calls) == calls
+
+    def test_key_reused_for_other_file(self, mock_chroma, embedder):
+        """Test a key cannot be reused for different content."""
+        with TestClient(app) as client:
+            _post(client, "reused-key")
+            response = _post(client, "reused-key", "something else")
+
+        assert response.status_code == 422
+
+
+class TestDocumentIds:
+    """Test document IDs derived from idempotency keys."""
+
+    def test_deterministic_per_owner(self):
+        """Test a key maps to one document ID per owner."""
+        assert document_id_for("owner", "key") == document_id_for(
+            "owner", "key"
+        )
+        assert document_id_for("owner", "key") != document_id_for(
+            "other", "key"
+        )
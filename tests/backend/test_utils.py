@@ -4,6 +4,7 @@ from unittest.mock import Mock, patch
 import pytest
 
 from chroma_knowledge_search.backend.app.utils import (
+    annotate_chunks,
     chunk_text,
     extract_text_from_file,
 )
@@ -34,9 +35,7 @@ class TestTextExtraction:
     @pytest.mark.asyncio
     async def test_extract_text_from_docx(self):
         """Test text extraction from DOCX file."""
-        with patch(
-            "chroma_knowledge_search.backend.app.utils.docx.Document"
-        ) as mock_doc:
+        with patch("docx.Document") as mock_doc:
             mock_paragraph = Mock()
             mock_paragraph.text = "DOCX content"
             mock_doc.return_value.paragraphs = [mock_paragraph]
@@ -67,3 +66,23 @@ class TestTextChunking:
         chunks = chunk_text("word", chunk_size=3, overlap=1)
         assert len(chunks) == 1
         assert chunks[0]["text"] == "word"
+
+    def test_chunk_text_offsets(self):
+        """Test chunks record character offsets into the original text."""
+        text = "word1  word2\nword3 word4"
+        chunks = chunk_text(text, chunk_size=2, overlap=0)
+
+        assert chunks[1]["text"] == "word3 word4"
+        assert text[chunks[1]["char_start"] : chunks[1]["char_end"]] == (
+            "word3 word4"
+        )
+
+    def test_annotate_chunks_pages_and_sections(self):
+        """Test page numbers and headings are attached to chunks."""
+        text = "# Intro\nfirst page\f## Details\nsecond page"
+        chunks = annotate_chunks(text, chunk_text(text, 2, 0))
+
+        assert chunks[0]["page"] == 1
+        assert chunks[0]["section"] == "Intro"
+        assert chunks[-1]["page"] == 2
+        assert chunks[-1]["section"] == "Details"
@@ -33,6 +33,8 @@ sys.modules["openai"] = mock_openai
 # os.environ["OPENAI_MODERATION_MODEL"] = "text-moderation-latest"
 # os.environ["CHROMA_COLLECTION"] = "test-collection"
 # os.environ["ALLOW_ORIGINS"] = "*"
+# Settings are read once at import, so test values must be set first
+os.environ["API_KEY"] = "test-api-key"
 
 import pytest  # noqa: E402
 from fastapi.testclient import TestClient  # noqa: E402
@@ -46,13 +48,6 @@ from chroma_knowledge_search.backend.app.main import app  # noqa: E402
 from chroma_knowledge_search.backend.app.models import Base  # noqa: E402
 
 
-# Load config to set environment variables
-# load_config()
-
-# Override with test values after config loading
-os.environ["API_KEY"] = "test-api-key"
-
-
 @pytest.fixture
 async def test_db():
     """Create test database."""